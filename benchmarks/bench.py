@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Runs a scraper end to end against a local mock CDN and reports its throughput, latencies and memory.
+
+Each run gets appended to a JSON lines file (as one line), so runs can be compared across versions, e.g.
+
+    python -m benchmarks.bench footpatrol -t50 -n 20000 --label baseline
+    python -m benchmarks.bench snipes --engine async -c 200 --ratelimit-rate 0.01
+"""
+import resource
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import datetime
+from json import dumps
+from os import path
+from platform import python_version
+from subprocess import DEVNULL, check_output
+from tempfile import TemporaryDirectory
+from time import monotonic
+from typing import Dict, List, Union
+
+from benchmarks.mock_cdn import MockCDN
+from craper.db import DatabaseWrapper
+from craper.models import SITES, load_site
+from craper.scraper import Scraper
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool, metrics, setup_logging
+
+# fine grained buckets (1ms - ~60s, 10% apart), so the percentiles of a run can be compared
+BUCKETS = tuple(round(0.001 * 1.1 ** i, 6) for i in range(116))
+
+
+def percentile(samples: List[float], q: float) -> Union[float, None]:
+    """Gets the `q` percentile (0 - 1) of the samples provided, None when there are none.
+
+    Args:
+        samples (List[float]): The samples
+        q (float): Percentile to get
+
+    Returns:
+        Union[float, None]: The percentile
+    """
+    if len(samples) == 0:
+        return None
+    samples = sorted(samples)
+    return round(samples[min(len(samples) - 1, int(q * len(samples)))], 6)
+
+
+def version() -> Union[str, None]:
+    """Gets the git commit the benchmark runs on (with a + when there are uncommitted changes)."""
+    cwd = path.dirname(path.dirname(path.abspath(__file__)))
+    try:
+        commit = check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd, stderr=DEVNULL, text=True).strip()
+        dirty = check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd, stderr=DEVNULL, text=True).strip()
+    except (OSError, ValueError):
+        return None
+    return commit + ('+' if dirty else '')
+
+
+def run(
+    site_name: str,
+    pids: int,
+    workers: int,
+    engine: str = 'threads',
+    batch_size: int = 20,
+    rate: float = 10_000,
+    cdn: MockCDN = None,
+    trace_memory: bool = False,
+) -> Dict:
+    """Scrapes `pids` PIDs of the site provided (against the mock CDN) and measures the run.
+
+    Args:
+        site_name (str): Name of the site to scrape
+        pids (int): Number of PIDs to check (starting at PID 1)
+        workers (int): Number of threads (or requests in flight, with the async engine)
+        engine (str, optional): 'threads' or 'async'. Defaults to 'threads'.
+        batch_size (int, optional): Number of PIDs handed out to a worker at a time. Defaults to 20.
+        rate (float, optional): Initial number of requests per second. Defaults to 10_000.
+        cdn (MockCDN, optional): The mock CDN, started (and stopped) here. Defaults to None (MockCDN's defaults).
+        trace_memory (bool, optional): Whether to trace the peak memory allocated by Python, slows the run down. Defaults to False.
+
+    Returns:
+        Dict: Results of the run
+    """
+    scraper_class = Scraper
+    if engine == 'async':
+        from craper.async_scraper import AsyncScraper
+        scraper_class = AsyncScraper
+
+    cdn = (cdn or MockCDN()).start()
+    cdn.redirect(load_site(site_name))
+    metrics.reset()
+    metrics.buckets = BUCKETS
+
+    with TemporaryDirectory() as tmp:
+        config = {'webhooks': {site_name: f'{cdn.url}/webhook'}}
+        shared = SharedResources(config, DatabaseWrapper(f'{tmp}/pids.db'), SessionPool(workers), ProxyPool([]), Sender())
+        try:
+            scraper = scraper_class(site_name, 1, pids, delay=0, rate=rate, pool_size=workers, shared=shared)
+
+            if trace_memory:
+                tracemalloc.start()
+            started = monotonic()
+            scraper.scrape(workers, batch_size=batch_size)
+            elapsed = monotonic() - started
+            traced_peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            tracemalloc.stop()
+            found = len(scraper.db.get_pids_int(site_name))
+            stats = cdn.stats()
+        finally:
+            cdn.stop()
+
+    probes = next(iter(metrics.summary()['histograms'].get('craper_probe_seconds', [])), {})
+    return {
+        'pids': pids,
+        'checked': scraper._pids_checked,
+        'found': found,
+        'elapsed': round(elapsed, 3),
+        'pids_per_sec': round(scraper._pids_checked / elapsed, 1),
+        'probe_p50': probes.get('p50'),
+        'probe_p99': probes.get('p99'),
+        'notify_p50': percentile(stats['notify_latencies'], 0.5),
+        'notify_p99': percentile(stats['notify_latencies'], 0.99),
+        'notify_max': percentile(stats['notify_latencies'], 1),
+        'webhooks': stats['webhooks'],
+        'statuses': stats['statuses'],
+        # kilobytes on Linux, the peak of the whole process
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'traced_peak_mb': round(traced_peak / 2 ** 20, 1) if traced_peak is not None else None,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description='Benchmarks a scraper against a local mock CDN')
+    parser.add_argument('site', metavar='<SITE_NAME>', type=str, choices=sorted(SITES.keys()), help='Name of the site to scrape')
+    parser.add_argument('-n', '--pids', metavar='<number>', type=int, default=10_000, help='Number of PIDs to check')
+    parser.add_argument('-t', '--threads', metavar='<number>', type=int, default=50, help='Number of threads to run')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads', help='Engine checking the PIDs')
+    parser.add_argument('-c', '--concurrency', metavar='<number>', type=int, default=200, help='Maximum number of requests in flight (async engine only)')
+    parser.add_argument('-b', '--batch', metavar='<number>', type=int, default=20, help='Number of PIDs handed out to a worker at a time')
+    parser.add_argument('-r', '--rate', metavar='<number>', type=float, default=10_000, help='Initial number of requests per second')
+    parser.add_argument('--hit-rate', metavar='<share>', type=float, default=0.01, help='Share of the PIDs which exist')
+    parser.add_argument('--latency', metavar='<seconds>', type=float, default=0.02, help='Mean response time of the mock CDN')
+    parser.add_argument('--jitter', metavar='<seconds>', type=float, default=0.005, help='Standard deviation of the response time')
+    parser.add_argument('--ratelimit-rate', metavar='<share>', type=float, default=0.0, help='Share of the requests answered with a 429')
+    parser.add_argument('--ban-rate', metavar='<share>', type=float, default=0.0, help='Share of the requests answered with a 403')
+    parser.add_argument('--webhook-latency', metavar='<seconds>', type=float, default=0.05, help='Response time of the mock webhook')
+    parser.add_argument('--repeat', metavar='<number>', type=int, default=1, help='Number of runs')
+    parser.add_argument('--trace-memory', action='store_true', help='Trace the peak memory allocated by Python (slows the run down)')
+    parser.add_argument('--label', metavar='<text>', type=str, default=None, help='Label of the runs, e.g. the name of a branch')
+    parser.add_argument('-o', '--output', metavar='<path>', type=str, default='benchmarks/results.jsonl', help='JSON lines file the results get appended to')
+    args = parser.parse_args()
+
+    # only problems get logged, the scrapers' output would slow the run down
+    setup_logging('WARNING')
+
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'label', 'repeat', 'trace_memory')}
+    workers = args.concurrency if args.engine == 'async' else args.threads
+    for i in range(args.repeat):
+        cdn = MockCDN(args.hit_rate, args.latency, args.jitter, args.ratelimit_rate, args.ban_rate, args.webhook_latency)
+        results = run(args.site, args.pids, workers, args.engine, args.batch, args.rate, cdn, args.trace_memory)
+        line = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'version': version(),
+            'label': args.label,
+            'python': python_version(),
+            'params': params,
+            'results': results,
+        }
+        with open(args.output, 'a') as f:
+            f.write(dumps(line) + '\n')
+
+        print(f"[{i + 1}/{args.repeat}] {results['pids_per_sec']} pids/s, probe p50/p99 {results['probe_p50']}/{results['probe_p99']}s, "
+              f"notify p50/p99 {results['notify_p50']}/{results['notify_p99']}s, found {results['found']}, max RSS {results['max_rss_mb']} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+from json import dumps, loads
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from random import gauss, random
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Type
+from urllib.parse import urlparse
+from urllib.request import urlopen
+from zlib import crc32
+
+from craper.models.site import Site, compile_template
+
+
+def redirect_site(site: Type[Site], url: str) -> Callable[[], None]:
+    """Points the image URLs of the `site` provided to the server at the `url` provided - e.g. in a process
+    other than the one which started the server (see `MockCDN.redirect`).
+
+    Args:
+        site (Type[Site]): Site to redirect
+        url (str): Base URL of the server, see `MockCDN.url`
+
+    Returns:
+        Callable[[], None]: Points the site back to its host
+    """
+    original = site.__dict__['_url_format']
+    site._url_format = staticmethod(compile_template(f'{url}{site.uri_template}'))
+    return lambda: setattr(site, '_url_format', original)
+
+
+class MockCDN:
+    """Local HTTP server standing in for the image hosts (`i1.adis.ws`, Demandware, ...) and Discord.
+
+    HEAD requests to any path are answered like the image hosts do - 200 when the product exists, 404 otherwise.
+    Which products exist is decided by a hash of the path, so every run (and every version) finds the same ones.
+    POST requests to /webhook are answered like Discord does, recording how long it took for a product found to get sent.
+
+    The server runs in a process of its own, so it doesn't compete with the scraper benchmarked for the GIL.
+
+    Args:
+        hit_rate: float
+            Share of the products which exist (0 - 1)
+        latency: float
+            Mean response time of a HEAD request (in seconds)
+        jitter: float
+            Standard deviation of the response time (in seconds)
+        ratelimit_rate: float
+            Share of the HEAD requests answered with a 429 (0 - 1)
+        ban_rate: float
+            Share of the HEAD requests answered with a 403 (0 - 1)
+        webhook_latency: float
+            Response time of a webhook (in seconds)
+
+    Methods:
+        start()
+        stop()
+        is_hit(path)
+        redirect(site)
+        stats()
+    """
+    def __init__(
+        self,
+        hit_rate: float = 0.01,
+        latency: float = 0.02,
+        jitter: float = 0.005,
+        ratelimit_rate: float = 0.0,
+        ban_rate: float = 0.0,
+        webhook_latency: float = 0.05,
+    ) -> None:
+        self.hit_rate = hit_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.ratelimit_rate = ratelimit_rate
+        self.ban_rate = ban_rate
+        self.webhook_latency = webhook_latency
+
+        # created in the server's process
+        self._lock: Lock = None
+        self._process: Process = None
+        self._port: int = None
+        self._restore: List[Callable[[], None]] = []
+        # path of a product found -> time (`time.monotonic`) it was first served with a 200
+        self._found_at: Dict[str, float] = {}
+        self.statuses: Dict[int, int] = {}
+        self.notify_latencies: List[float] = []
+        self.webhooks = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, e.g. http://127.0.0.1:5123"""
+        return f'http://127.0.0.1:{self._port}'
+
+    def is_hit(self, path: str) -> bool:
+        """Whether or not the product with the image `path` provided exists.
+
+        Args:
+            path (str): Path (and query) of the image
+
+        Returns:
+            bool: Whether or not the product exists
+        """
+        return crc32(path.encode()) % 1_000_000 < self.hit_rate * 1_000_000
+
+    def _respond_head(self, path: str) -> int:
+        sleep(max(0.0, gauss(self.latency, self.jitter)))
+
+        roll = random()
+        if roll < self.ban_rate:
+            status = 403
+        elif roll < self.ban_rate + self.ratelimit_rate:
+            status = 429
+        elif self.is_hit(path):
+            status = 200
+        else:
+            status = 404
+
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status == 200:
+                self._found_at.setdefault(path, monotonic())
+        return status
+
+    def _respond_webhook(self, body: bytes) -> None:
+        now = monotonic()
+        sleep(self.webhook_latency)
+        embeds = loads(body).get('embeds', [])
+
+        with self._lock:
+            self.webhooks += 1
+            for embed in embeds:
+                url = urlparse(embed['image']['url'])
+                path = url.path + (f'?{url.query}' if url.query else '')
+                if path in self._found_at:
+                    self.notify_latencies.append(now - self._found_at[path])
+
+    def _serve(self, conn: Connection) -> None:
+        """Runs the server (in the child process), sending its port through the `conn` provided."""
+        cdn = self
+        self._lock = Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive connections, like the real hosts
+            protocol_version = 'HTTP/1.1'
+
+            def do_HEAD(self) -> None:
+                self.send_response(cdn._respond_head(self.path))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                cdn._respond_webhook(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self) -> None:
+                # the stats, for the benchmark's process
+                body = dumps(cdn._stats()).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        conn.send(server.server_address[1])
+        server.serve_forever()
+
+    def start(self) -> 'MockCDN':
+        """Starts the server on a random port, in a process of its own.
+
+        Returns:
+            MockCDN: The server
+        """
+        parent, child = Pipe()
+        self._process = Process(target=self._serve, args=(child,), daemon=True)
+        self._process.start()
+        self._port = parent.recv()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server, pointing the sites redirected back to their hosts."""
+        for restore in self._restore:
+            restore()
+        self._restore.clear()
+        self._process.terminate()
+        self._process.join()
+
+    def redirect(self, site: Type[Site]) -> None:
+        """Points the image URLs of the `site` provided to the server, until it's stopped.
+        The requests are still rate limited (and pooled) by the site's real host.
+
+        Args:
+            site (Type[Site]): Site to redirect
+        """
+        self._restore.append(redirect_site(site, self.url))
+
+    def _stats(self) -> Dict:
+        with self._lock:
+            return {
+                'statuses': dict(self.statuses),
+                'webhooks': self.webhooks,
+                'notify_latencies': list(self.notify_latencies),
+            }
+
+    def stats(self) -> Dict:
+        """Gets the statuses served and the webhooks received so far, from the server.
+
+        Returns:
+            Dict: Number of responses per status code, number of webhooks & the time-to-notify of each product sent
+        """
+        with urlopen(f'{self.url}/stats') as r:
+            return loads(r.read())
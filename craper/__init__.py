@@ -1,4 +1,9 @@
-from craper.scraper import Scraper
-
 __version__ = "1.0.1"
-Scraper = Scraper
+
+
+def __getattr__(name: str):
+    # imported once used, so the CLI (e.g. `craper -h`) doesn't import requests up front
+    if name == 'Scraper':
+        from craper.scraper import Scraper
+        return Scraper
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -1,50 +1,187 @@
 #!/usr/bin/env python3
 
-from argparse import ArgumentParser
-from craper.scraper import Scraper
+from argparse import ArgumentParser, ArgumentTypeError
+from json import dump, dumps
 from sys import exit, path
+from typing import Tuple
 import os
 
+# the engines (and requests / aiohttp) get imported in main, once the arguments are parsed - `craper -h` stays fast
+
+def address(value: str) -> Tuple[str, int]:
+    """Parses a host:port address"""
+    host, _, port = value.rpartition(':')
+    if not port.isdigit():
+        raise ArgumentTypeError(f"'{value}' is not a host:port address")
+    return host or '127.0.0.1', int(port)
+
+def positive(value: str) -> float:
+    """Parses a number greater than 0"""
+    try:
+        number = float(value)
+    except ValueError:
+        raise ArgumentTypeError(f"'{value}' is not a number")
+    if number <= 0:
+        raise ArgumentTypeError(f"'{value}' has to be greater than 0")
+    return number
+
+# number of seconds to wait for the PIDs found to be saved, after Ctrl+C
+SHUTDOWN_TIMEOUT = 10
+
 parser = ArgumentParser(description='cScraper - new product scraper')
 
-parser.add_argument('site', metavar='<SITE_NAME>', type=str, help='Name of the site to scrape')
+parser.add_argument('site', metavar='<SITE_NAME>', type=str, nargs='*', help='Name of the site(s) to scrape, multiple sites share the threads, proxies and database')
+parser.add_argument('-w', '--weights', metavar='<number>', type=float, nargs='+', default=None, help='Share of the threads each site gets (when scraping multiple sites), e.g. -w 2 1')
 
 parser.add_argument('-t', '--threads', metavar='<number>', type=int, default=10, help='Number of threads to run')
-parser.add_argument('-n', '--perthread', metavar='<number>', type=int, help='Number of PIDs per thread')
+parser.add_argument('--engine', choices=['threads', 'async'], default='threads', help='Engine checking the PIDs - a thread per chunk of PIDs or coroutines on a single event loop')
+parser.add_argument('-c', '--concurrency', metavar='<number>', type=int, default=100, help='Maximum number of requests in flight (async engine only)')
+parser.add_argument('-n', '--perthread', metavar='<number>', type=int, help='Number of PIDs per thread, limits the run to threads * perthread PIDs when no end PID is set')
+parser.add_argument('-b', '--batch', metavar='<number>', type=int, default=20, help='Number of PIDs handed out to a thread at a time')
 parser.add_argument('-s', '--start', metavar='<pid>', type=str, default='1', help='Product ID to start from')
 parser.add_argument('-e', '--end', metavar='<pid>', type=str, default='-1', help='Product ID to end at')
 parser.add_argument('-d', '--delay', metavar='<number>', type=int, default=1, help='Delay which slows down the script (to prevent bans)')
+parser.add_argument('-r', '--rate', metavar='<number>', type=positive, default=1000, help='Maximum number of requests per second sent to the site, lowered for a while when ratelimited - raise it with many threads (or --concurrency)')
+parser.add_argument('--pool-size', metavar='<number>', type=int, default=None, help='Maximum number of (keep-alive) connections per host, defaults to the number of threads')
+parser.add_argument('--resume', action='store_true', help='Continue from where the previous run (for the same site) stopped')
+parser.add_argument('--frontier', action='store_true', help='Check the PIDs just above the newest products (and the gaps next to them) first, then sweep through the rest')
+parser.add_argument('--watch', action='store_true', help='Keep running, checking the PIDs above the newest products every --interval seconds')
+parser.add_argument('--interval', metavar='<seconds>', type=float, default=60, help='Number of seconds inbetween watch cycles, adapts to how often new products show up')
+parser.add_argument('--window', metavar='<number>', type=int, default=1000, help='Number of PIDs above the newest product checked every watch cycle')
+parser.add_argument('--processes', metavar='<number>', type=int, default=None, help='Check the PIDs with this many processes (of --threads threads each) to use all cores, the --rate gets split between them')
+parser.add_argument('--miss-ttl', metavar='<seconds>', type=float, default=0, help="Number of seconds a PID of the --frontier (or --watch window) which wasn't found doesn't get checked again for, doubling with every miss in a row - the PIDs right above the newest product still get checked every --watch cycle")
+parser.add_argument('--miss-max-ttl', metavar='<seconds>', type=float, default=3600, help="Maximum number of seconds a PID which keeps missing doesn't get checked for")
+parser.add_argument('--serve', metavar='<host:port>', type=address, default=None, help='Hand out the PIDs to workers (started with --connect) instead of checking them')
+parser.add_argument('--connect', metavar='<host:port>', type=address, default=None, help='Check PIDs handed out by a coordinator (started with --serve), no site needed')
+parser.add_argument('--authkey', metavar='<key>', type=str, default=None, help='Secret key workers authenticate to the coordinator with, required with --serve and --connect - anyone with it can run code on the coordinator and its workers')
+parser.add_argument('--lease-size', metavar='<number>', type=int, default=1000, help='Number of PIDs handed out to a worker (or process) at a time')
+parser.add_argument('--metrics', metavar='<host:port>', type=address, default=None, help='Serve Prometheus metrics (probes, status codes, latencies, ...) on http://<host:port>/metrics')
+parser.add_argument('--summary', metavar='<path>', type=str, default=None, help='Write a JSON summary of the metrics into a file at the end of the run, - prints it instead')
 parser.add_argument('-p', '--proxies', action='store_true', help='Use proxies')
 parser.add_argument('--db', metavar='<path>', type=str, default=None, help='Absolute path to a database to store the PIDs')
+parser.add_argument('--db-sync', choices=['OFF', 'NORMAL', 'FULL', 'EXTRA'], type=str.upper, default='NORMAL', help="SQLite's synchronous level, FULL is the safest and slowest")
 parser.add_argument('--debug', action='store_true', help='Turns on debugging mode, logs more info.')
+parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], type=str.upper, default='INFO', help='Lowest level of the messages logged, WARNING only logs problems (bans, ratelimits, errors)')
+parser.add_argument('--log-json', action='store_true', help='Log JSON lines (without colors) instead of text')
+parser.add_argument('--log-file', metavar='<path>', type=str, default=None, help='Log into a file instead of the console')
+parser.add_argument('--log-interval', metavar='<seconds>', type=float, default=10, help='Number of seconds repeated messages (404s, proxy errors, ...) get summarised for')
 
 args = parser.parse_args()
 
+def write_summary():
+    """Writes the JSON summary of the metrics, if asked for"""
+    if args.summary is None:
+        return
+    from craper.utils import logger, metrics
+    if args.summary == '-':
+        logger.info(dumps(metrics.summary(), indent=2))
+        return
+    with open(os.path.expanduser(args.summary), 'w') as f:
+        dump(metrics.summary(), f, indent=2)
+    logger.info(f'📊 Metrics summary saved into {args.summary}')
+
 def main():
+    from craper.utils import logger, serve_metrics, setup_logging, TermColors as c
+    from craper.orchestrator import Orchestrator
+    from craper.scraper import Scraper
+
+    setup_logging(
+        'DEBUG' if args.debug else args.log_level,
+        json_lines=args.log_json,
+        path=os.path.expanduser(args.log_file) if args.log_file is not None else None,
+        interval=args.log_interval,
+    )
+
     if args.db != None and args.db.startswith('.'):
-        print("ERROR: Wrong path provided. Make sure you provide an ABSOLUTE path.")
+        logger.error("ERROR: Wrong path provided. Make sure you provide an ABSOLUTE path.")
+        return
+
+    if args.connect is None and len(args.site) == 0:
+        parser.error('the following arguments are required: <SITE_NAME>')
+    if (args.serve is not None or args.connect is not None) and not args.authkey:
+        parser.error('--serve and --connect need a secret --authkey, anyone with it can run code on the coordinator and its workers')
+    if args.serve is not None and len(args.site) > 1:
+        parser.error('a coordinator hands out the PIDs of one site only')
+    if args.processes is not None and (len(args.site) > 1 or args.watch or args.engine == 'async' or args.serve is not None or args.connect is not None):
+        parser.error('--processes checks the PIDs of one site with the threads engine, without --watch, --serve or --connect')
+
+    scraper_class = Scraper
+    if args.engine == 'async':
+        # imported only when needed, so the threaded engine works without aiohttp loaded
+        from craper.async_scraper import AsyncScraper
+        scraper_class = AsyncScraper
+
+    if args.metrics is not None:
+        serve_metrics(args.metrics)
+        logger.info(f'📈 Serving metrics on http://{args.metrics[0]}:{args.metrics[1]}/metrics')
+
+    # the async engine is limited by the number of requests in flight instead of threads
+    workers = args.concurrency if args.engine == 'async' else args.threads
+
+    kwargs = dict(
+        start_pid=args.start,
+        stop_pid=args.end,
+        use_proxies=args.proxies,
+        debug=args.debug or args.log_level == 'DEBUG',
+        delay=args.delay,
+        db_path=args.db,
+        db_synchronous=args.db_sync,
+        pool_size=args.pool_size if args.pool_size is not None else workers,
+        rate=args.rate,
+        resume=args.resume,
+        frontier=args.frontier,
+        miss_ttl=args.miss_ttl,
+        miss_max_ttl=args.miss_max_ttl,
+    )
+
+    # the workers get their PIDs from the coordinator (or the pool)
+    worker_kwargs = {k: kwargs[k] for k in ('use_proxies', 'debug', 'delay', 'db_path', 'db_synchronous', 'pool_size', 'rate')}
+
+    if args.connect is not None:
+        from craper.distributed import Worker
+        try:
+            Worker(args.connect, args.authkey.encode(), args.threads, args.batch, **worker_kwargs).run()
+        except KeyboardInterrupt:
+            exit(1)
+        finally:
+            write_summary()
         return
 
+    s = None
     try:
-        s = Scraper(
-            site_name=args.site,
-            start_pid=args.start,   
-            stop_pid=args.end,
-            use_proxies=args.proxies,
-            debug=args.debug,
-            delay=args.delay,
-            db_path=args.db,
-        )
-
-        if args.perthread is not None:
-            s.scrape(
-                num_threads=args.threads,
-                pids_per_thread=args.perthread,
-            )
+        if args.serve is not None:
+            from craper.distributed import Coordinator
+            s = Scraper(site_name=args.site[0], **kwargs)
+            Coordinator(s, args.serve, args.authkey.encode(), args.lease_size).serve()
+            return
+
+        if args.processes is not None:
+            from craper.pool import ProcessPool
+            s = Scraper(site_name=args.site[0], **kwargs)
+            ProcessPool(s, args.processes, args.threads, args.batch, args.lease_size, **worker_kwargs).serve()
+            return
+
+        if len(args.site) > 1:
+            s = Orchestrator(args.site, weights=args.weights, scraper_class=scraper_class, **kwargs)
+        else:
+            s = scraper_class(site_name=args.site[0], **kwargs)
+
+        if args.watch:
+            s.watch(workers, interval=args.interval, window=args.window, batch_size=args.batch)
         else:
-            s.scrape(num_threads=args.threads)
+            s.scrape(workers, pids_per_thread=args.perthread, batch_size=args.batch)
     except KeyboardInterrupt:
+        if s is not None and not args.watch:
+            # the checkpoint moves past the PIDs found, so they have to be saved first
+            scrapers = s.scrapers if isinstance(s, Orchestrator) else [s]
+            if Scraper._stop_senders(scrapers, SHUTDOWN_TIMEOUT):
+                logger.info('🔖 Saving the progress, continue with --resume')
+                s.save_checkpoint()
+            else:
+                logger.warning(c.red + '⛔️ Not all PIDs could be saved in time, the progress was not saved' + c.reset)
         exit(1)
+    finally:
+        write_summary()
 
 if __name__ == '__main__':
     main()
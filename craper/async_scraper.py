@@ -0,0 +1,245 @@
+import asyncio
+from logging import WARNING
+from random import choice as rand_choice
+from time import monotonic
+from typing import List, Union
+
+from aiohttp import ClientConnectionError, ClientError, ClientProxyConnectionError, ClientSession, ClientTimeout, TCPConnector
+
+from craper.scraper import Scraper
+from craper.utils import logger, metrics, parse_retry_after, should_log, TermColors as c
+
+
+class AsyncScraper(Scraper):
+    """Scraper class, which checks PIDs as coroutines on a single event loop instead of a thread per chunk of PIDs.
+
+    Takes the same arguments as the `Scraper` class.
+
+    Methods:
+        get_proxy()
+        check_pid(pid)
+        check_pid_async(session, pid)
+        send_all()
+        save_checkpoint()
+        scrape(concurrency, pids_per_thread, batch_size)
+        scrape_many(scrapers, workers, pids_per_thread, batch_size)
+        watch(concurrency, interval, window, batch_size)
+        watch_many(scrapers, workers, interval, window, batch_size)
+
+    Raises:
+        ValueError
+            When the scraper input is malformed in any way
+        FileNotFoundError
+            When a required file(s) is missing
+    """
+
+    async def check_pid_async(self, session: ClientSession, pid: int) -> bool:
+        """Checks whether or not the `pid` provided exists.
+
+        Args:
+            session (ClientSession): Session to send the request with
+            pid (int): PID to check
+
+        Returns:
+            bool: Whether or not the PID is loaded, False when the check failed
+        """
+        return await self._check_pid_async(session, pid) or False
+
+    async def _check_pid_async(self, session: ClientSession, pid: int, url: str = None) -> Union[bool, None]:
+        """Sends a HEAD request, checking whether or not the `pid` provided exists.
+
+        Args:
+            session (ClientSession): Session to send the request with
+            pid (int): PID to check
+            url (str, optional): Image URL of the PID, when rendered already. Defaults to None.
+
+        Returns:
+            Union[bool, None]: Whether or not the PID is loaded, None when the check failed
+        """
+        if url is None:
+            url = self.site.url_for(pid)
+        proxy = self.get_proxy()
+
+        try:
+            if self.debug:
+                logger.debug(f"🧰 [{self.name.upper()}] [ASYNC] Checking {url}")
+
+            # wait for our turn, only this coroutine sleeps, the rest of them keeps on going
+            wait = self.limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            started = monotonic()
+            # aiohttp takes the proxy as an URL
+            async with session.head(url, proxy=proxy.get('http'), headers={"User-Agent": rand_choice(self.useragents)}) as r:
+                latency = monotonic() - started
+                self.proxy_pool.release(proxy, self.site.host, latency, r.status)
+                metrics.observe('craper_probe_seconds', latency, site=self.name, host=self.site.host)
+                return self._handle_status(pid, r.status, parse_retry_after(r.headers.get('Retry-After')))
+        except ClientProxyConnectionError as e:
+            self.proxy_pool.release(proxy, self.site.host)
+            metrics.inc('craper_probe_errors_total', site=self.name, host=self.site.host, error='proxy')
+            if should_log(f'{self.name}:proxy', c.orange + f'🔗 [{self.name.upper()}] Proxy failed {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name):
+                logger.warning(c.orange + f'🔗 [{self.name.upper()}] [ASYNC] Proxy failed - failed to check pid {pid} ({self.site.formatted_for(pid)})' + (f' - {e}' if self.debug else '') + c.reset, extra={'site': self.name, 'pid': pid})
+        except (ClientConnectionError, asyncio.TimeoutError):
+            self.proxy_pool.release(proxy, self.site.host)
+            metrics.inc('craper_probe_errors_total', site=self.name, host=self.site.host, error='connection')
+            if should_log(f'{self.name}:connection', c.orange + f'🔗 [{self.name.upper()}] Failed to connect {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name):
+                logger.warning(c.orange + f'🔗 [{self.name.upper()}] [ASYNC] Failed to connect - failed to check pid {pid} ({self.site.formatted_for(pid)})' + c.reset, extra={'site': self.name, 'pid': pid})
+        except ClientError as e:
+            # e.g. a malformed response - only this PID fails, not the whole run
+            self.proxy_pool.release(proxy, self.site.host)
+            metrics.inc('craper_probe_errors_total', site=self.name, host=self.site.host, error='client')
+            if should_log(f'{self.name}:client', c.orange + f'🔗 [{self.name.upper()}] Requests failed {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name):
+                logger.warning(c.orange + f'🔗 [{self.name.upper()}] [ASYNC] Request failed - failed to check pid {pid} ({self.site.formatted_for(pid)})' + (f' - {e}' if self.debug else '') + c.reset, extra={'site': self.name, 'pid': pid})
+
+        return None
+
+    async def _worker(self, session: ClientSession) -> None:
+        """Keeps checking batches of PIDs from the scheduler until there are no PIDs left.
+
+        Args:
+            session (ClientSession): Session to send the requests with
+        """
+        while True:
+            pids = self.scheduler.next_batch()
+            if len(pids) == 0:
+                break
+
+            # render the URLs of the whole batch at once
+            local_failed_pids = [pid for pid, url in zip(pids, self.site.urls_for(pids)) if await self._check_pid_async(session, pid, url) is None]
+
+            # retry the pids which failed in this batch (once), the ones failing again get reported with the batch
+            local_failed_pids = [pid for pid in local_failed_pids if await self._check_pid_async(session, pid) is None]
+
+            self.scheduler.done(pids, local_failed_pids)
+
+    @staticmethod
+    async def _checkpointer(scrapers: List['AsyncScraper']) -> None:
+        """Periodically saves the scraping progress of the `scrapers` provided, without blocking the event loop."""
+        while True:
+            await asyncio.sleep(Scraper.CHECKPOINT_INTERVAL)
+            for scraper in scrapers:
+                await asyncio.to_thread(scraper.save_checkpoint)
+
+    @classmethod
+    def _create_session(cls, scrapers: List['AsyncScraper'], concurrency: List[int]) -> ClientSession:
+        """Creates a session shared by the `scrapers` provided, with at most `sum(concurrency)` connections open.
+
+        Args:
+            scrapers (List[AsyncScraper]): Scrapers using the session
+            concurrency (List[int]): Maximum number of requests in flight for each of the scrapers
+
+        Returns:
+            ClientSession: The session
+        """
+        # connections are kept alive and reused, pooled per host (and proxy)
+        connector = TCPConnector(limit=sum(concurrency), limit_per_host=max(s.pool_size for s in scrapers), keepalive_timeout=30)
+        return ClientSession(connector=connector, timeout=ClientTimeout(total=cls.TIMEOUT))
+
+    @classmethod
+    async def _scrape_async(cls, scrapers: List['AsyncScraper'], concurrency: List[int]) -> None:
+        """Checks PIDs from the schedulers of the `scrapers` provided, with at most `concurrency[i]` requests in flight for `scrapers[i]`.
+        All scrapers share one session (and its connections).
+
+        Args:
+            scrapers (List[AsyncScraper]): Scrapers to run
+            concurrency (List[int]): Maximum number of requests in flight for each of the scrapers
+        """
+        async with cls._create_session(scrapers, concurrency) as session:
+            checkpointer = asyncio.create_task(cls._checkpointer(scrapers))
+            await asyncio.gather(*[s._worker(session) for s, n in zip(scrapers, concurrency) for _ in range(n)])
+            checkpointer.cancel()
+
+    @classmethod
+    def scrape_many(cls, scrapers: List['AsyncScraper'], workers: List[int], pids_per_thread: int = None, batch_size: int = 20) -> None:
+        """Runs multiple scrapers on one event loop, with at most `workers[i]` requests in flight for `scrapers[i]`,
+        until there are no PIDs left.
+
+        Args:
+            scrapers (List[AsyncScraper]): Scrapers to run
+            workers (List[int]): Maximum number of requests in flight for each of the scrapers
+            pids_per_thread (int, optional): When scraping without a stop PID, only `workers[i] * pids_per_thread` PIDs get checked by each scraper. Defaults to None (no limit).
+            batch_size (int, optional): Number of PIDs handed out to a coroutine at a time. Defaults to 20.
+        """
+        for scraper, n in zip(scrapers, workers):
+            scraper.scheduler = scraper._build_scheduler(n, pids_per_thread, batch_size)
+            logger.info(c.yellow + f'🚧 [{scraper.name.upper()}] Starting the async engine (up to {n} requests in flight)' + c.reset)
+
+        cls._start_senders(scrapers)
+        asyncio.run(cls._scrape_async(scrapers, workers))
+
+        for scraper in scrapers:
+            logger.info(c.orange + f'🚧 [{scraper.name.upper()}] All workers finished' + c.reset)
+            scraper.save_checkpoint()
+
+        cls._stop_senders(scrapers)
+        cls._print_summaries(scrapers)
+
+    def scrape(self, concurrency: int, pids_per_thread: int = None, batch_size: int = 20) -> None:
+        """Checks PIDs (in batches of `batch_size`) with at most `concurrency` requests in flight, until there are none left.
+
+        Args:
+            concurrency (int): Maximum number of requests in flight
+            pids_per_thread (int, optional): When scraping without a stop PID, only `concurrency * pids_per_thread` PIDs get checked. Defaults to None (no limit).
+            batch_size (int, optional): Number of PIDs handed out to a coroutine at a time. Defaults to 20.
+        """
+        self.scrape_many([self], [concurrency], pids_per_thread, batch_size)
+
+    @classmethod
+    async def _watch_async(cls, scrapers: List['AsyncScraper'], concurrency: List[int], interval: float, window: int, batch_size: int) -> None:
+        """Runs watch cycles until cancelled, keeping one session (and its connections) open inbetween them.
+
+        Args:
+            scrapers (List[AsyncScraper]): Scrapers to run
+            concurrency (List[int]): Maximum number of requests in flight for each of the scrapers
+            interval (float): Number of seconds inbetween cycles
+            window (int): Number of PIDs above the highest known PID to check every cycle
+            batch_size (int): Number of PIDs handed out to a coroutine at a time
+        """
+        wait = interval
+        cycle = 0
+        async with cls._create_session(scrapers, concurrency) as session:
+            while True:
+                cycle += 1
+                before = cls._watch_cycle(scrapers, window, batch_size)
+                started = monotonic()
+                await asyncio.gather(*[s._worker(session) for s, n in zip(scrapers, concurrency) for _ in range(n)])
+                wait = cls._watch_cycle_done(scrapers, cycle, before, started, wait, interval)
+                await asyncio.sleep(wait)
+
+    @classmethod
+    def watch_many(cls, scrapers: List['AsyncScraper'], workers: List[int], interval: float = 60, window: int = None, batch_size: int = 20) -> None:
+        """Keeps checking the PIDs above the highest known PID of each of the `scrapers` provided, every `interval` seconds (or so), until interrupted.
+        The event loop, connections and known PIDs stay around inbetween the cycles.
+
+        Args:
+            scrapers (List[AsyncScraper]): Scrapers to run
+            workers (List[int]): Maximum number of requests in flight for each of the scrapers
+            interval (float, optional): Number of seconds inbetween cycles, shortened while products keep showing up and lengthened when they don't. Defaults to 60.
+            window (int, optional): Number of PIDs above the highest known PID to check every cycle. Defaults to None (`FRONTIER_AHEAD`).
+            batch_size (int, optional): Number of PIDs handed out to a coroutine at a time. Defaults to 20.
+        """
+        window = window if window is not None else cls.FRONTIER_AHEAD
+        for scraper, n in zip(scrapers, workers):
+            scraper._watching = True
+            logger.info(c.yellow + f'👁  [{scraper.name.upper()}] Watching {window} PIDs above the newest product (up to {n} requests in flight)' + c.reset)
+
+        cls._start_senders(scrapers)
+        try:
+            asyncio.run(cls._watch_async(scrapers, workers, interval, window, batch_size))
+        finally:
+            cls._stop_senders(scrapers)
+            for scraper in scrapers:
+                scraper.save_misses()
+
+    def watch(self, concurrency: int, interval: float = 60, window: int = None, batch_size: int = 20) -> None:
+        """Keeps checking the PIDs above the highest known PID every `interval` seconds (or so), with at most `concurrency` requests in flight, until interrupted.
+
+        Args:
+            concurrency (int): Maximum number of requests in flight
+            interval (float, optional): Number of seconds inbetween cycles, shortened while products keep showing up and lengthened when they don't. Defaults to 60.
+            window (int, optional): Number of PIDs above the highest known PID to check every cycle. Defaults to None (`FRONTIER_AHEAD`).
+            batch_size (int, optional): Number of PIDs handed out to a coroutine at a time. Defaults to 20.
+        """
+        self.watch_many([self], [concurrency], interval, window, batch_size)
@@ -0,0 +1,2 @@
+from craper.db.db import DatabaseWrapper
+from craper.db.index import PidIndex, SharedPidIndex
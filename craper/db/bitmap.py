@@ -0,0 +1,135 @@
+import mmap
+import os
+from struct import Struct
+from typing import Iterable, Union
+
+from craper.db.index import PidIndex
+
+
+class BitmapFile:
+    """Known PIDs of a site, saved as a bitmap in a file next to the database - so they don't have to be loaded
+    from the database (a row at a time) on every start.
+
+    The file is memory mapped, opening it costs the same no matter how many PIDs there are - only the pages of the bitmap
+    which get looked up are read from the disk. Its header holds the highest rowid of the site's table it's up to date with
+    and the number of PIDs in it - when rows got added without updating the bitmap (e.g. by an older version, or by hand),
+    the table's highest rowid doesn't match anymore and the bitmap has to be rebuilt from it.
+
+    Args:
+        path: str
+            Path to the file
+        max_pid_digits: int
+            Maximum number of digits a product ID can have, the bitmap has 10^max_pid_digits bits
+
+    Methods:
+        open()
+        rebuild(pids, rowid)
+        __contains__(pid)
+        add(pids, rowid)
+        index(max_pid, overflow)
+        close()
+    """
+    MAGIC = b'CRPIDX03'
+    # magic, max PID digits, highest rowid of the table the bitmap is up to date with, number of PIDs in the bitmap
+    HEADER = Struct('<8sI4xqq')
+
+    def __init__(self, path: str, max_pid_digits: int) -> None:
+        self.path = path
+        self.max_pid_digits = max_pid_digits
+        self.size = 10 ** max_pid_digits
+
+        self._file = None
+        self._map: Union[mmap.mmap, None] = None
+
+    @property
+    def rowid(self) -> int:
+        """Highest rowid of the table the bitmap is up to date with"""
+        return self.HEADER.unpack_from(self._map)[2]
+
+    @property
+    def count(self) -> int:
+        """Number of PIDs in the bitmap"""
+        return self.HEADER.unpack_from(self._map)[3]
+
+    def __contains__(self, pid: int) -> bool:
+        return pid < self.size and bool(self._map[self.HEADER.size + (pid >> 3)] & (1 << (pid & 7)))
+
+    def open(self) -> bool:
+        """Maps the file, if there's a valid one.
+
+        Returns:
+            bool: Whether or not the file was opened, False when it doesn't exist or is for a different number of PID digits
+        """
+        self.close()
+        length = self.HEADER.size + (self.size + 7) // 8
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != length:
+            return False
+
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, max_pid_digits = self.HEADER.unpack_from(self._map)[:2]
+        if magic != self.MAGIC or max_pid_digits != self.max_pid_digits:
+            self.close()
+            return False
+        return True
+
+    def rebuild(self, pids: Iterable[int], rowid: int) -> None:
+        """Writes the file from scratch (replacing it at once, once it's written) and maps it.
+
+        Args:
+            pids (Iterable[int]): All PIDs of the site, e.g. from `DatabaseWrapper.iter_pids`
+            rowid (int): Highest rowid of the site's table
+        """
+        bits = bytearray((self.size + 7) // 8)
+        count = 0
+        for pid in pids:
+            if pid < self.size and not bits[pid >> 3] & (1 << (pid & 7)):
+                bits[pid >> 3] |= 1 << (pid & 7)
+                count += 1
+
+        self.close()
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.max_pid_digits, rowid, count))
+            f.write(bits)
+        os.replace(tmp, self.path)
+        self.open()
+
+    def add(self, pids: Iterable[int], rowid: int) -> None:
+        """Sets the `pids` provided in the bitmap, once their rows are committed.
+
+        Args:
+            pids (Iterable[int]): PIDs added to the site's table
+            rowid (int): Highest rowid of the site's table, after adding them
+        """
+        bitmap, offset = self._map, self.HEADER.size
+        added = 0
+        for pid in pids:
+            if pid < self.size and not bitmap[offset + (pid >> 3)] & (1 << (pid & 7)):
+                bitmap[offset + (pid >> 3)] |= 1 << (pid & 7)
+                added += 1
+        # the header goes last - if the process dies before, the bitmap gets rebuilt on the next start
+        self.HEADER.pack_into(bitmap, 0, self.MAGIC, self.max_pid_digits, rowid, self.count + added)
+
+    def index(self, max_pid: int = -1, overflow: Iterable[int] = ()) -> PidIndex:
+        """Creates an index on top of a private (copy-on-write) mapping of the bitmap - the PIDs added to the index
+        don't end up in the file, only the ones saved into the database do (see `add`).
+
+        Args:
+            max_pid (int, optional): Highest PID of the site. Defaults to -1.
+            overflow (Iterable[int], optional): PIDs which don't fit into the bitmap. Defaults to ().
+
+        Returns:
+            PidIndex: The index
+        """
+        private = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY)
+        return PidIndex.from_bitmap(self.max_pid_digits, memoryview(private)[self.HEADER.size:], self.count, max_pid, overflow)
+
+    def close(self) -> None:
+        """Unmaps the file (indexes created from it keep their mapping)."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,6 +1,10 @@
 import sqlite3
 from datetime import datetime
-from typing import List, Set, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+from craper.db.bitmap import BitmapFile
+from craper.db.index import PidIndex
+from craper.utils.log import logger
 
 
 class DatabaseWrapper:
@@ -9,6 +13,8 @@ class DatabaseWrapper:
     Args:
         path_to_db: str
             Path where the database is/ will be saved
+        synchronous: str
+            SQLite's synchronous level (OFF, NORMAL, FULL or EXTRA), NORMAL is safe with the WAL journal mode
     
     Attributes:
         None
@@ -18,33 +24,92 @@ class DatabaseWrapper:
             Creates a table in our database
         add_data(site, pid, formatted_pid, image_url)
             Adds a product ID to our database
+        add_many(site, rows)
+            Adds multiple product IDs to our database, in one transaction
         get_pids_int(site)
             Gets all pids (as integers)
+        iter_pids(site)
+            Streams all pids (as integers)
+        load_index(site, max_pid_digits)
+            Gets all pids as an index, from the bitmap saved next to the database
+        get_recent_pids(site, limit)
+            Gets the pids added most recently (as integers)
         get_pids_formatted(site)
             Gets all pids (formatted, as strings)
         get_all_data(site)
             Gets all data
+        save_checkpoint(site, low_water, pids)
+            Saves the scraping progress for a site
+        get_checkpoint(site)
+            Gets the scraping progress saved for a site
+        save_misses(site, entries, dropped)
+            Saves the pids not found lately for a site
+        get_misses(site, since)
+            Gets the pids not found lately for a site
     
     Raises:
         sqlite3.OperationalError
             When the a method calls a table that doesn't match any existing table.
+        ValueError
+            When the synchronous level isn't supported
     """
-    def __init__(self, path_to_db: str) -> None:
+    SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+    def __init__(self, path_to_db: str, synchronous: str = 'NORMAL') -> None:
         self._path = path_to_db
 
         self._connection = None
         self._cursor = None
+        # bitmaps of the known PIDs per site, kept up to date with the PIDs added - see `load_index`
+        self._bitmaps: Dict[str, BitmapFile] = {}
+
+        if synchronous.upper() not in self.SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Synchronous level '{synchronous}' is not supported, use one of {', '.join(self.SYNCHRONOUS_LEVELS)}.")
+        self._synchronous = synchronous.upper()
 
         self._initialize()
 
+    @property
+    def path(self) -> str:
+        """Path to the database file"""
+        return self._path
+
     def __del__(self) -> None:
+        for bitmap in getattr(self, '_bitmaps', {}).values():
+            bitmap.close()
         if self._connection:
             self._connection.close()
 
     def _initialize(self):
-        self._connection = sqlite3.connect(self._path)
+        # the connection is shared between the scraper's threads, which guard it with their own lock
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
         self._cursor = self._connection.cursor()
 
+        # with a write-ahead log, readers don't block the writer and commits don't have to rewrite the database file
+        self._cursor.execute("PRAGMA journal_mode=WAL")
+        self._cursor.execute(f"PRAGMA synchronous={self._synchronous}")
+
+        # scraping progress, one row per site, along with the PIDs which still have to be checked
+        self._cursor.execute(''' CREATE TABLE IF NOT EXISTS _checkpoints (
+                        site            TEXT PRIMARY KEY,
+                        lowWater        NUMBER,
+                        dateUpdated     TIMESTAMP
+                    ); ''')
+        self._cursor.execute(''' CREATE TABLE IF NOT EXISTS _checkpoint_pids (
+                        site            TEXT,
+                        productId       NUMBER,
+                        UNIQUE (site, productId)
+                    ); ''')
+        # PIDs checked and not found lately, so checking them again can wait (see `MissCache`)
+        self._cursor.execute(''' CREATE TABLE IF NOT EXISTS _misses (
+                        site            TEXT,
+                        productId       NUMBER,
+                        lastMissed      TIMESTAMP,
+                        misses          NUMBER,
+                        UNIQUE (site, productId)
+                    ); ''')
+        self._connection.commit()
+
     def create_table_safe(self, site: str) -> None:
         """Creates a table specified by the `site` parameter, if it doesn't already exists.
 
@@ -63,6 +128,8 @@ class DatabaseWrapper:
                         UNIQUE (productId)
                     ); '''
         self._cursor.execute(query)
+        # the most recent PIDs get read on startup, without the index that's a sort of the whole table
+        self._cursor.execute(f"CREATE INDEX IF NOT EXISTS {site}_dateAdded ON {site} (dateAdded, productId)")
         self._connection.commit()
 
     def add_data(self, site: str, pid: int, formatted_pid: str, image_url: str) -> bool:
@@ -87,15 +154,105 @@ class DatabaseWrapper:
         ```
         """
         try:
-            self._cursor.execute(f"INSERT INTO {site} VALUES ({pid}, '{formatted_pid}', '{image_url}', {datetime.now().timestamp()});")
+            self._cursor.execute(f"INSERT INTO {site} VALUES (?, ?, ?, ?);", (pid, formatted_pid, image_url, datetime.now().timestamp()))
             self._connection.commit()
+            self._update_bitmap(site, [pid])
             return True
             
         except sqlite3.IntegrityError:
-            print(f'Failed to add {pid} ({formatted_pid}) - PID already exists in table "{site}".')
+            logger.warning(f'🪣 Failed to add {pid} ({formatted_pid}) - PID already exists in table "{site}".')
         
         return False
 
+    def add_many(self, site: str, rows: Iterable[Tuple[int, str, str]]) -> int:
+        """Adds multiple rows of data into a table, identified by the `site` parameter, in a single transaction.
+        Rows with a product ID which already exists in the table are skipped.
+
+        Args:
+            site (str): Name of the site
+            rows (Iterable[Tuple[int, str, str]]): (pid, formatted_pid, image_url) tuples
+
+        Returns:
+            int: Number of rows added
+
+        Example:
+        ```py3
+            db.add_many('solebox', [
+                (1929255, '01929255', 'https://www.solebox.com/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-solebox-master-de/default/dw1220ea0d/1929255_PS.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'),
+                (1929256, '01929256', 'https://www.solebox.com/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-solebox-master-de/default/dw1220ea0d/1929256_PS.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'),
+            ])
+        ```
+        """
+        timestamp = datetime.now().timestamp()
+        rows = list(rows)
+        # the connection's context manager commits (or rolls back) the whole transaction at once
+        with self._connection:
+            cursor = self._connection.executemany(
+                f"INSERT OR IGNORE INTO {site} VALUES (?, ?, ?, ?);",
+                ((pid, formatted_pid, image_url, timestamp) for pid, formatted_pid, image_url in rows),
+            )
+        self._update_bitmap(site, [row[0] for row in rows])
+        return cursor.rowcount
+
+    def _max_rowid(self, site: str) -> int:
+        return self._connection.execute(f"SELECT max(rowid) FROM {site}").fetchone()[0] or 0
+
+    def _bitmap_current(self, site: str, bitmap: BitmapFile, rowid: int) -> bool:
+        """Checks whether or not the site's bitmap is up to date with the table, without reading all of its rows.
+
+        Rows added since the bitmap was saved move the highest rowid past the bitmap's. The row with the highest rowid
+        deleted & replaced shows up as a PID missing from the bitmap. Rows deleted inbetween go unnoticed -
+        deleting the bitmap file gets it rebuilt.
+        """
+        if bitmap.rowid != rowid:
+            return False
+        if rowid == 0:
+            return True
+        pid = self._connection.execute(f"SELECT productId FROM {site} WHERE rowid = ?", (rowid,)).fetchone()[0]
+        return pid >= bitmap.size or pid in bitmap
+
+    def _update_bitmap(self, site: str, pids: List[int]) -> None:
+        """Sets the PIDs just committed in the site's bitmap, if it's loaded."""
+        bitmap = self._bitmaps.get(site)
+        if bitmap is not None and len(pids) > 0:
+            bitmap.add(pids, self._max_rowid(site))
+
+    def load_index(self, site: str, max_pid_digits: int) -> PidIndex:
+        """Gets all product IDs in a database table, specified by the `site` parameter, as an index - mapped from a bitmap
+        saved next to the database (<database>.<site>.bitmap), instead of reading all rows. The bitmap gets rebuilt from
+        the table when it's missing or out of date, and kept up to date with the product IDs added afterwards.
+
+        Args:
+            site (str): Name of the site to get product IDs for
+            max_pid_digits (int): Maximum number of digits a product ID of the site can have
+
+        Returns:
+            PidIndex: Index of the (integer) product IDs
+
+        Raises:
+            sqlite3.OperationalError
+                When the `site` parameter doesn't match any existing table.
+        """
+        try:
+            rowid = self._max_rowid(site)
+        except sqlite3.OperationalError:
+            raise sqlite3.OperationalError(f"Table '{site}' does not exist. You can create it with the `create_table_safe` method.")
+        if self._path == ':memory:':
+            return PidIndex.from_pids(max_pid_digits, self.iter_pids(site))
+
+        bitmap = self._bitmaps.get(site)
+        if bitmap is None:
+            bitmap = BitmapFile(f'{self._path}.{site}.bitmap', max_pid_digits)
+            self._bitmaps[site] = bitmap
+            # a few lookups on every start, the whole table only gets read when the bitmap has to be rebuilt
+            if not bitmap.open() or not self._bitmap_current(site, bitmap, rowid):
+                bitmap.rebuild(self.iter_pids(site), rowid)
+
+        # both use the productId's index, instead of reading all rows
+        max_pid = self._connection.execute(f"SELECT max(productId) FROM {site}").fetchone()[0]
+        overflow = self._connection.execute(f"SELECT productId FROM {site} WHERE productId >= ?", (bitmap.size,)).fetchall()
+        return bitmap.index(max_pid if max_pid is not None else -1, (row[0] for row in overflow))
+
     def get_pids_int(self, site: str) -> List[int]:
         """Gets all product IDs (as integers) in a database table, specified by the `site` parameter 
 
@@ -116,6 +273,47 @@ class DatabaseWrapper:
         rows: List[Tuple[int]] = self._cursor.fetchall()
         return [row[0] for row in rows]
 
+    def iter_pids(self, site: str) -> Iterator[int]:
+        """Streams all product IDs (as integers) in a database table, specified by the `site` parameter,
+        without loading all of them into a list first.
+
+        Args:
+            site (str): Name of the site to get product IDs for
+
+        Returns:
+            Iterator[int]: Iterator of (integer) product IDs
+
+        Raises:
+            sqlite3.OperationalError
+                When the `site` parameter doesn't match any existing table.
+        """
+        try:
+            # use a separate cursor, so the shared one can be used while streaming
+            cursor = self._connection.execute(f"SELECT productId FROM {site}")
+        except sqlite3.OperationalError:
+            raise sqlite3.OperationalError(f"Table '{site}' does not exist. You can create it with the `create_table_safe` method.")
+        return (row[0] for row in cursor)
+
+    def get_recent_pids(self, site: str, limit: int = 50) -> List[int]:
+        """Gets the product IDs (as integers) added into a database table, specified by the `site` parameter, most recently
+
+        Args:
+            site (str): Name of the site to get product IDs for
+            limit (int, optional): Maximum number of product IDs to get. Defaults to 50.
+
+        Returns:
+            List[int]: List of (integer) product IDs, the most recent first
+
+        Raises:
+            sqlite3.OperationalError
+                When the `site` parameter doesn't match any existing table.
+        """
+        try:
+            cursor = self._connection.execute(f"SELECT productId FROM {site} ORDER BY dateAdded DESC, productId DESC LIMIT ?", (limit,))
+        except sqlite3.OperationalError:
+            raise sqlite3.OperationalError(f"Table '{site}' does not exist. You can create it with the `create_table_safe` method.")
+        return [row[0] for row in cursor.fetchall()]
+
     def get_pids_formatted(self, site: str) -> List[str]:
         """Gets all formatted product IDs (as strings) in a database table, specified by the `site` parameter 
 
@@ -157,6 +355,58 @@ class DatabaseWrapper:
             raise sqlite3.OperationalError(f"Table '{site}' does not exist. You can create it by the `create_table_safe` method.")
         return self._cursor.fetchall()
 
+    def save_checkpoint(self, site: str, low_water: int, pids: Iterable[int]) -> None:
+        """Saves the scraping progress for the `site` provided, replacing the previous one.
+
+        Args:
+            site (str): Name of the site
+            low_water (int): Every PID up to (and including) this one has been checked
+            pids (Iterable[int]): PIDs up to `low_water` which still have to be checked (failed or were being checked)
+        """
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO _checkpoints VALUES (?, ?, ?);", (site, low_water, datetime.now().timestamp()))
+            self._connection.execute("DELETE FROM _checkpoint_pids WHERE site = ?;", (site,))
+            self._connection.executemany("INSERT OR IGNORE INTO _checkpoint_pids VALUES (?, ?);", ((site, pid) for pid in pids))
+
+    def get_checkpoint(self, site: str) -> Union[Tuple[int, List[int]], None]:
+        """Gets the scraping progress saved for the `site` provided.
+
+        Args:
+            site (str): Name of the site
+
+        Returns:
+            Union[Tuple[int, List[int]], None]: Low-water mark & PIDs which still have to be checked, None when there's no progress saved
+        """
+        row = self._connection.execute("SELECT lowWater FROM _checkpoints WHERE site = ?;", (site,)).fetchone()
+        if row is None:
+            return None
+        rows = self._connection.execute("SELECT productId FROM _checkpoint_pids WHERE site = ? ORDER BY productId;", (site,)).fetchall()
+        return row[0], [r[0] for r in rows]
+
+    def save_misses(self, site: str, entries: Iterable[Tuple[int, float, int]], dropped: Iterable[int] = ()) -> None:
+        """Saves the PIDs not found lately for the `site` provided, as returned by `MissCache.take_changes`.
+
+        Args:
+            site (str): Name of the site
+            entries (Iterable[Tuple[int, float, int]]): (pid, time of the last miss, number of misses in a row) tuples to save
+            dropped (Iterable[int], optional): PIDs to remove. Defaults to ().
+        """
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO _misses VALUES (?, ?, ?, ?);", ((site, pid, missed_at, misses) for pid, missed_at, misses in entries))
+            self._connection.executemany("DELETE FROM _misses WHERE site = ? AND productId = ?;", ((site, pid) for pid in dropped))
+
+    def get_misses(self, site: str, since: float = 0) -> List[Tuple[int, float, int]]:
+        """Gets the PIDs not found lately for the `site` provided.
+
+        Args:
+            site (str): Name of the site
+            since (float, optional): Only PIDs which missed after this time (`time.time`). Defaults to 0.
+
+        Returns:
+            List[Tuple[int, float, int]]: (pid, time of the last miss, number of misses in a row) tuples
+        """
+        return self._connection.execute("SELECT productId, lastMissed, misses FROM _misses WHERE site = ? AND lastMissed >= ?;", (site, since)).fetchall()
+
 
 if __name__ == '__main__':
     db = DatabaseWrapper('./data/pids.db')
@@ -0,0 +1,273 @@
+import re
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import Iterable, Iterator, Set, Union
+
+
+class PidIndex:
+    """Compact, thread-safe set of (integer) product IDs, stored as a bitmap over all PIDs a site can have.
+
+    Membership checks are lock-free (a single byte read), only adding PIDs takes a lock.
+    PIDs that don't fit into the bitmap are kept in a regular set.
+
+    Args:
+        max_pid_digits: int
+            Maximum number of digits a product ID can have, the bitmap has 10^max_pid_digits bits
+        bits: Union[bytearray, memoryview]
+            Bitmap to use instead of a new (empty) one, e.g. a memory mapped file - see `from_bitmap`
+
+    Methods:
+        from_pids(max_pid_digits, pids)
+        from_bitmap(max_pid_digits, bits, count, max_pid, overflow)
+        add(pid)
+        max()
+        missing_ranges(start, stop)
+        subtract(ranges)
+        share()
+        unshare()
+
+    Example:
+    ```py3
+        index = PidIndex.from_pids(Snipes.max_pid_digits, db.iter_pids('snipes'))
+        1929255 in index
+    ```
+    """
+    # any byte with at least one PID in it
+    _NONZERO = re.compile(rb'[^\x00]')
+
+    def __init__(self, max_pid_digits: int, bits: Union[bytearray, memoryview] = None) -> None:
+        self.size = 10 ** max_pid_digits
+        self._bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self._overflow: Set[int] = set()
+
+        self._lock = Lock()
+        self._count = 0
+        self._max = -1
+        # holds the bitmap while it's shared with other processes, see `share`
+        self._shm: Union[SharedMemory, None] = None
+
+    @classmethod
+    def from_pids(cls, max_pid_digits: int, pids: Iterable[int]) -> 'PidIndex':
+        """Creates a new index, containing the `pids` provided.
+
+        Args:
+            max_pid_digits (int): Maximum number of digits a product ID can have
+            pids (Iterable[int]): Product IDs to add
+
+        Returns:
+            PidIndex: The index created
+        """
+        index = cls(max_pid_digits)
+        for pid in pids:
+            index.add(pid)
+        return index
+
+    @classmethod
+    def from_bitmap(
+        cls,
+        max_pid_digits: int,
+        bits: Union[bytearray, memoryview],
+        count: int,
+        max_pid: int = -1,
+        overflow: Iterable[int] = (),
+    ) -> 'PidIndex':
+        """Creates an index on top of an existing bitmap, without copying it.
+
+        Args:
+            max_pid_digits (int): Maximum number of digits a product ID can have
+            bits (Union[bytearray, memoryview]): The bitmap, (10^max_pid_digits + 7) // 8 bytes - writable, PIDs added to the index get set in it
+            count (int): Number of PIDs in the bitmap
+            max_pid (int, optional): Highest PID in the index. Defaults to -1.
+            overflow (Iterable[int], optional): PIDs which don't fit into the bitmap. Defaults to ().
+
+        Returns:
+            PidIndex: The index created
+        """
+        index = cls(max_pid_digits, bits)
+        index._overflow = set(overflow)
+        index._count = count + len(index._overflow)
+        index._max = max_pid
+        return index
+
+    def __contains__(self, pid: int) -> bool:
+        if pid < self.size:
+            return bool(self._bits[pid >> 3] & (1 << (pid & 7)))
+        return pid in self._overflow
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over all PIDs in the index, in ascending order."""
+        bits = self._bits
+        for i, byte in enumerate(bits):
+            # skip empty bytes as fast as possible, most of them are
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield (i << 3) | bit
+
+        yield from sorted(self._overflow)
+
+    def add(self, pid: int) -> bool:
+        """Adds the `pid` provided into the index.
+
+        Args:
+            pid (int): Product ID to add
+
+        Returns:
+            bool: True when the PID was added, False when it already was in the index
+        """
+        with self._lock:
+            if pid in self:
+                return False
+
+            if pid < self.size:
+                self._bits[pid >> 3] |= 1 << (pid & 7)
+            else:
+                self._overflow.add(pid)
+
+            self._count += 1
+            self._max = max(self._max, pid)
+            return True
+
+    def max(self) -> int:
+        """Gets the highest PID in the index.
+
+        Returns:
+            int: Highest PID, -1 when the index is empty
+        """
+        return self._max
+
+    def missing_ranges(self, start: int, stop: int) -> Iterator[range]:
+        """Subtracts the index from `range(start, stop)` in bulk - the bitmap gets scanned for known PIDs
+        a byte at a time (in C), instead of looking every PID up.
+
+        Args:
+            start (int): First PID of the range
+            stop (int): PID after the last one of the range
+
+        Returns:
+            Iterator[range]: Contiguous ranges of PIDs which aren't in the index, in ascending order
+        """
+        current = start
+        bitmap_stop = min(stop, self.size)
+
+        if current < bitmap_stop:
+            bits = self._bits
+            for match in self._NONZERO.finditer(bits, current >> 3, (bitmap_stop + 7) >> 3):
+                byte, base = bits[match.start()], match.start() << 3
+                for bit in range(8):
+                    if not byte & (1 << bit):
+                        continue
+                    pid = base | bit
+                    if pid < current:
+                        continue
+                    if pid >= bitmap_stop:
+                        break
+                    if pid > current:
+                        yield range(current, pid)
+                    current = pid + 1
+
+        # PIDs which don't fit into the bitmap
+        for pid in sorted(p for p in self._overflow if current <= p < stop):
+            if pid > current:
+                yield range(current, pid)
+            current = pid + 1
+
+        if current < stop:
+            yield range(current, stop)
+
+    def subtract(self, ranges: Iterable[range]) -> Iterator[int]:
+        """Streams the PIDs of the `ranges` provided, which aren't in the index.
+
+        Args:
+            ranges (Iterable[range]): Contiguous ranges of PIDs, e.g. from `Site.pid_ranges`
+
+        Returns:
+            Iterator[int]: PIDs which aren't in the index
+        """
+        for r in ranges:
+            for missing in self.missing_ranges(r.start, r.stop):
+                yield from missing
+
+    def share(self) -> str:
+        """Moves the bitmap into shared memory, so other processes can read it (see `SharedPidIndex`)
+        without a copy of their own. PIDs added to the index afterwards are seen by them right away.
+
+        Returns:
+            str: Name of the shared memory block
+        """
+        with self._lock:
+            if self._shm is None:
+                size = len(self._bits)
+                self._shm = SharedMemory(create=True, size=size)
+                self._shm.buf[:size] = self._bits
+                self._bits = self._shm.buf[:size]
+            return self._shm.name
+
+    def unshare(self) -> None:
+        """Moves the bitmap back into this process' memory and frees the shared memory block.
+        Everything reading the bitmap (e.g. the streams of `missing_ranges`) has to be closed before.
+
+        Raises:
+            BufferError: When the bitmap is still being read, the block gets freed once it isn't anymore
+        """
+        with self._lock:
+            if self._shm is None:
+                return
+            shm, shared = self._shm, self._bits
+            self._bits, self._shm = bytearray(shared), None
+            # the block goes away once it's unmapped - even when it can't be unmapped below, because its memory is still in use
+            shm.unlink()
+            shared.release()
+            shm.close()
+
+
+class SharedPidIndex(PidIndex):
+    """Read-only view of an index shared by another process (see `PidIndex.share`), without a copy of the bitmap.
+
+    PIDs added to the shared index show up in the view right away. PIDs added to the view are only kept in this process
+    (and not taken into account by `missing_ranges`), `len` and `max` aren't tracked.
+
+    Args:
+        max_pid_digits: int
+            Maximum number of digits a product ID can have, as passed to the shared index
+        name: str
+            Name of the shared memory block, as returned by `PidIndex.share`
+
+    Methods:
+        add(pid)
+        close()
+    """
+    def __init__(self, max_pid_digits: int, name: str) -> None:
+        self.size = 10 ** max_pid_digits
+        self._view = SharedMemory(name)
+        self._bits = self._view.buf[:(self.size + 7) // 8].toreadonly()
+        self._overflow: Set[int] = set()
+
+        self._lock = Lock()
+        self._count = 0
+        self._max = -1
+        self._shm = None
+
+    def __contains__(self, pid: int) -> bool:
+        if pid < self.size and self._bits[pid >> 3] & (1 << (pid & 7)):
+            return True
+        return pid in self._overflow
+
+    def add(self, pid: int) -> bool:
+        with self._lock:
+            if pid in self:
+                return False
+            self._overflow.add(pid)
+            return True
+
+    def share(self) -> str:
+        return self._view.name
+
+    def close(self) -> None:
+        """Detaches from the shared memory block."""
+        self._bits.release()
+        self._view.close()
@@ -0,0 +1,522 @@
+from collections import deque
+from itertools import count
+from multiprocessing.connection import Client, Connection, Listener
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Deque, Dict, List, Tuple, Union
+
+from craper.scheduler import PidScheduler
+from craper.scraper import Scraper
+from craper.utils import logger, metrics, TermColors as c
+
+
+class Lease:
+    """Batch of PIDs handed out to a worker.
+
+    Attributes:
+        id: int
+            ID of the lease
+        pids: List[int]
+            PIDs leased, as returned by `PidScheduler.next_batch`
+        owner: int
+            ID of the worker (connection) holding the lease
+        expires: float
+            Time (`time.monotonic`) the lease expires at, unless renewed
+    """
+    def __init__(self, lease_id: int, pids: List[int], owner: int, expires: float) -> None:
+        self.id = lease_id
+        self.pids = pids
+        self.owner = owner
+        self.expires = expires
+
+
+class LeaseTable:
+    """Hands out batches of PIDs from a scheduler as leases. Leases which expire (or whose worker disconnects)
+    get handed out again, so no PID gets lost when a worker dies.
+
+    Args:
+        scheduler: PidScheduler
+            Scheduler to take the batches of PIDs from
+        timeout: float
+            Number of seconds a lease expires after, unless renewed
+
+    Methods:
+        acquire(owner)
+        renew(lease_id)
+        complete(lease_id)
+        release(owner)
+        finished()
+    """
+    def __init__(self, scheduler: PidScheduler, timeout: float = 60) -> None:
+        self.scheduler = scheduler
+        self.timeout = timeout
+
+        self._lock = Lock()
+        self._ids = count(1)
+        self._leases: Dict[int, Lease] = {}
+        # batches of PIDs to hand out again, before taking new ones from the scheduler
+        self._reissue: Deque[List[int]] = deque()
+        # batches of expired leases, so a late report still counts
+        self._expired: Dict[int, List[int]] = {}
+
+    def _revoke(self, lease: Lease) -> None:
+        self._leases.pop(lease.id)
+        self._expired[lease.id] = lease.pids
+        self._reissue.append(lease.pids)
+
+    def _expire(self, now: float) -> None:
+        for lease in [l for l in self._leases.values() if l.expires <= now]:
+            self._revoke(lease)
+
+    def acquire(self, owner: int) -> Union[Lease, None]:
+        """Leases the next batch of PIDs.
+
+        Args:
+            owner (int): ID of the worker the batch is leased to
+
+        Returns:
+            Union[Lease, None]: The lease, None when there are no PIDs left to lease (for now)
+        """
+        with self._lock:
+            now = monotonic()
+            self._expire(now)
+
+            if len(self._reissue) > 0:
+                pids = self._reissue.popleft()
+            else:
+                pids = self.scheduler.next_batch()
+                if len(pids) == 0:
+                    return None
+
+            lease = Lease(next(self._ids), pids, owner, now + self.timeout)
+            self._leases[lease.id] = lease
+            return lease
+
+    def renew(self, lease_id: int) -> bool:
+        """Pushes the expiry of a lease back by `timeout` seconds.
+
+        Args:
+            lease_id (int): ID of the lease
+
+        Returns:
+            bool: Whether or not the lease was renewed, False when it expired already
+        """
+        with self._lock:
+            now = monotonic()
+            self._expire(now)
+            if lease_id not in self._leases:
+                return False
+            self._leases[lease_id].expires = now + self.timeout
+            return True
+
+    def complete(self, lease_id: int, failed: List[int] = ()) -> bool:
+        """Marks all PIDs of a lease as checked.
+
+        Args:
+            lease_id (int): ID of the lease
+            failed (List[int], optional): PIDs of the lease which failed to be checked. Defaults to ().
+
+        Returns:
+            bool: Whether or not the lease was completed, False when the lease doesn't exist (anymore)
+        """
+        with self._lock:
+            if lease_id in self._leases:
+                pids = self._leases.pop(lease_id).pids
+            elif lease_id in self._expired:
+                pids = self._expired.pop(lease_id)
+                # the batch might not have been handed out again yet
+                if any(batch is pids for batch in self._reissue):
+                    self._reissue = deque(batch for batch in self._reissue if batch is not pids)
+            else:
+                return False
+
+            # the batch was leased before (and expired), a report for one of those leases doesn't count anymore
+            self._expired = {i: batch for i, batch in self._expired.items() if batch is not pids}
+            self.scheduler.done(pids, failed)
+            return True
+
+    def release(self, owner: int) -> int:
+        """Hands out all leases of a worker again, e.g. after it disconnected.
+
+        Args:
+            owner (int): ID of the worker
+
+        Returns:
+            int: Number of leases released
+        """
+        with self._lock:
+            leases = [l for l in self._leases.values() if l.owner == owner]
+            for lease in leases:
+                self._revoke(lease)
+            return len(leases)
+
+    def finished(self) -> bool:
+        """Whether or not all PIDs have been leased and checked"""
+        with self._lock:
+            return self.scheduler.exhausted and len(self._leases) == 0 and len(self._reissue) == 0
+
+
+class Coordinator:
+    """Hands out the PIDs of a scraper's site to workers (see `Worker`), which can run on other machines, in leases of `lease_size` PIDs.
+    The PIDs the workers find get deduplicated, saved and sent (webhooks) by the coordinator.
+
+    Workers talk to the coordinator over a TCP connection (`multiprocessing.connection`), authenticated with the `authkey`.
+    The messages get unpickled - anyone with the key can run code on the coordinator (and its workers), there's no default one.
+
+    Args:
+        scraper: Scraper
+            Scraper of the site to hand out the PIDs for, only its PID stream, database and sender get used
+        address: Tuple[str, int]
+            Host & port to listen on
+        authkey: bytes
+            Key the workers have to authenticate with, required to accept workers
+        lease_size: int
+            Number of PIDs leased to a worker at a time
+        lease_timeout: float
+            Number of seconds after which PIDs leased to an unresponsive worker get handed out again
+
+    Methods:
+        serve()
+
+    Raises:
+        ValueError
+            When serving without an `authkey`
+    """
+    # number of seconds the workers get to pick up the news that all PIDs are checked, before the coordinator goes away
+    SHUTDOWN_TIMEOUT = 5
+
+    def __init__(
+        self,
+        scraper: Scraper,
+        address: Tuple[str, int] = ('127.0.0.1', 6000),
+        authkey: bytes = None,
+        lease_size: int = 1000,
+        lease_timeout: float = 60,
+    ) -> None:
+        self.scraper = scraper
+        self.address = address
+        self.authkey = authkey
+        self.lease_size = lease_size
+        self.lease_timeout = lease_timeout
+
+        self.leases: Union[LeaseTable, None] = None
+        self._owners = count(1)
+        self._listener: Union[Listener, None] = None
+        self._closed = False
+        # number of workers connected
+        self._connected = 0
+        self._connected_lock = Lock()
+
+    def _accept(self, listener: Listener) -> None:
+        """Accepts workers' connections until the listener gets closed."""
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError as e:
+                if self._closed:
+                    return
+                logger.error(c.red + f'🔌 [{self.scraper.name.upper()}] Failed to accept a worker - {e}' + c.reset)
+                continue
+            except Exception as e:
+                # e.g. a worker with a wrong authkey
+                logger.error(c.red + f'🔌 [{self.scraper.name.upper()}] Refused a worker - {e}' + c.reset)
+                continue
+            Thread(target=self._handle, args=(conn, next(self._owners)), daemon=True).start()
+
+    def _handle(self, conn: Connection, owner: int) -> None:
+        """Answers requests of one worker until it disconnects.
+
+        Args:
+            conn (Connection): Connection to the worker
+            owner (int): ID of the worker
+        """
+        name = self.scraper.name.upper()
+        logger.info(c.yellow + f'🔌 [{name}] Worker {owner} connected' + c.reset)
+        with self._connected_lock:
+            self._connected += 1
+        try:
+            while True:
+                msg: Dict = conn.recv()
+                op = msg.get('op')
+
+                if op == 'hello':
+                    conn.send({'site': self.scraper.name})
+                elif op == 'lease':
+                    lease = self.leases.acquire(owner)
+                    if lease is not None:
+                        # known PIDs don't have to be checked by anyone
+                        pids = [pid for pid in lease.pids if pid not in self.scraper.current_pids]
+                        conn.send({'lease': lease.id, 'pids': pids, 'timeout': self.lease_timeout})
+                    elif self.leases.finished():
+                        conn.send({'lease': None})
+                    else:
+                        # the PIDs left are leased to other workers, which may still die
+                        conn.send({'wait': 1})
+                elif op == 'renew':
+                    conn.send({'ok': self.leases.renew(msg['lease'])})
+                elif op == 'report':
+                    self._report(msg)
+                    conn.send({'ok': self.leases.complete(msg['lease'], msg.get('failed', []))})
+                else:
+                    conn.send({'error': f'Unknown operation {op}'})
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+            with self._connected_lock:
+                self._connected -= 1
+            released = self.leases.release(owner)
+            if released > 0:
+                logger.warning(c.orange + f'🔌 [{name}] Worker {owner} disconnected - handing out its {released} leases again' + c.reset)
+            else:
+                logger.info(c.yellow + f'🔌 [{name}] Worker {owner} disconnected' + c.reset)
+
+    def _report(self, msg: Dict) -> None:
+        """Processes the results of a lease, reported by a worker.
+
+        Args:
+            msg (Dict): The report - PIDs found, the number of PIDs checked & the worker's metrics, if it sends them
+                (the PIDs which failed to be checked get marked with the lease)
+        """
+        scraper = self.scraper
+        if 'metrics' in msg:
+            metrics.merge(msg['metrics'])
+        for pid in msg.get('found', []):
+            # PIDs of re-issued leases can get found twice
+            if not scraper.current_pids.add(pid):
+                continue
+            logger.info(c.green + f'👀 [{scraper.name.upper()}] [WORKER] Found a new pid {pid} ({scraper.site.formatted_for(pid)})' + c.reset)
+            scraper._recent_pids.appendleft(pid)
+            scraper.sender.put(scraper, pid)
+            metrics.inc('craper_found_total', site=scraper.name)
+            with scraper.cnt_lock:
+                scraper._pids_found += 1
+
+        with scraper.cnt_lock:
+            scraper._pids_checked += msg.get('checked', 0)
+
+    def _start_workers(self) -> None:
+        """Starts accepting workers' connections, on a background thread."""
+        if not self.authkey:
+            raise ValueError('An authkey is required to accept workers.')
+        self._listener = Listener(self.address, authkey=self.authkey)
+        Thread(target=self._accept, args=(self._listener,), daemon=True).start()
+        logger.info(c.yellow + f'📡 [{self.scraper.name.upper()}] Waiting for workers on {self.address[0]}:{self.address[1]} ({self.lease_size} PIDs per lease)' + c.reset)
+
+    def _stop_workers(self) -> None:
+        """Stops accepting workers' connections - once all PIDs are checked, after the workers asking for more got told so (and disconnected)."""
+        if self.leases.finished():
+            deadline = monotonic() + self.SHUTDOWN_TIMEOUT
+            while self._connected > 0 and monotonic() < deadline:
+                sleep(0.1)
+        self._closed = True
+        self._listener.close()
+
+    def _workers_alive(self) -> bool:
+        """Whether or not there can still be workers to check the PIDs left - remote workers can always connect later."""
+        return True
+
+    def serve(self) -> None:
+        """Hands out PIDs to workers until all of them are checked, saving the progress periodically."""
+        scraper = self.scraper
+        scraper.scheduler = scraper._build_scheduler(1, None, self.lease_size)
+        self.leases = LeaseTable(scraper.scheduler, self.lease_timeout)
+
+        Scraper._start_senders([scraper])
+        self._start_workers()
+
+        try:
+            last_checkpoint = monotonic()
+            while not self.leases.finished():
+                sleep(1)
+                if not self._workers_alive() and not self.leases.finished():
+                    logger.error(c.red + f'📡 [{scraper.name.upper()}] All workers exited before checking all PIDs - continue with --resume' + c.reset)
+                    break
+                if monotonic() - last_checkpoint >= scraper.CHECKPOINT_INTERVAL:
+                    scraper.save_checkpoint()
+                    last_checkpoint = monotonic()
+        finally:
+            try:
+                self._stop_workers()
+            finally:
+                # the progress & the PIDs found get saved even when stopping the workers failed
+                scraper.save_checkpoint()
+                Scraper._stop_senders([scraper])
+
+        Scraper._print_summaries([scraper])
+
+
+class ReportSender:
+    """Stands in for the `Sender` on a worker - instead of saving & sending the PIDs found, keeps them to be reported to the coordinator.
+
+    Methods:
+        start()
+        put(scraper, pid)
+        take()
+        flush()
+        stop()
+    """
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._found: List[int] = []
+
+    def start(self) -> None:
+        pass
+
+    def put(self, scraper: Scraper, pid: int) -> None:
+        with self._lock:
+            self._found.append(pid)
+
+    def take(self) -> List[int]:
+        """Gets the PIDs found since the last call.
+
+        Returns:
+            List[int]: PIDs found
+        """
+        with self._lock:
+            found, self._found = self._found, []
+            return found
+
+    def flush(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class Worker:
+    """Checks PIDs leased from a `Coordinator`, reporting the results back to it.
+
+    Args:
+        address: Tuple[str, int]
+            Host & port of the coordinator
+        authkey: bytes
+            Key to authenticate with, required to connect
+        num_threads: int
+            Number of threads checking the PIDs
+        batch_size: int
+            Number of PIDs handed out to a thread at a time
+        **kwargs
+            Passed to the scraper (use_proxies, rate, db_path, ...)
+
+    Methods:
+        run()
+
+    Raises:
+        ValueError
+            When connecting without an `authkey`
+    """
+    # number of seconds to keep trying to connect for, the coordinator may not be up yet
+    CONNECT_TIMEOUT = 30
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 6000), authkey: bytes = None, num_threads: int = 10, batch_size: int = 20, **kwargs) -> None:
+        self.address = address
+        self.authkey = authkey
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.kwargs = kwargs
+
+        self._conn: Union[Connection, None] = None
+        self._conn_lock = Lock()
+        self._lease: Union[int, None] = None
+
+    def _request(self, msg: Dict) -> Dict:
+        """Sends a request to the coordinator and waits for the answer."""
+        with self._conn_lock:
+            self._conn.send(msg)
+            return self._conn.recv()
+
+    def _renew(self, interval: float) -> None:
+        """Keeps renewing the current lease every `interval` seconds, so the coordinator knows we're still working on it."""
+        while True:
+            sleep(interval)
+            lease = self._lease
+            if lease is not None:
+                try:
+                    self._request({'op': 'renew', 'lease': lease})
+                except (EOFError, OSError):
+                    return
+
+    def _connect(self) -> None:
+        """Connects to the coordinator, waiting up to `CONNECT_TIMEOUT` seconds for it to come up."""
+        if not self.authkey:
+            raise ValueError('An authkey is required to connect to a coordinator.')
+        deadline = monotonic() + self.CONNECT_TIMEOUT
+        while True:
+            try:
+                self._conn = Client(self.address, authkey=self.authkey)
+                return
+            except ConnectionRefusedError:
+                if monotonic() >= deadline:
+                    raise
+                sleep(1)
+
+    def _scraper(self, site_name: str) -> Scraper:
+        """Creates the scraper checking the PIDs leased, which reports the PIDs it finds instead of saving & sending them."""
+        scraper = Scraper(site_name, **self.kwargs)
+        scraper.sender = ReportSender()
+        return scraper
+
+    def _report(self, scraper: Scraper, lease_id: int, checked: int) -> Dict:
+        """Builds the report of a lease.
+
+        Args:
+            scraper (Scraper): The worker's scraper
+            lease_id (int): ID of the lease
+            checked (int): Number of PIDs checked
+
+        Returns:
+            Dict: The report
+        """
+        return {
+            'op': 'report',
+            'lease': lease_id,
+            'found': scraper.sender.take(),
+            'failed': scraper.scheduler.failed(),
+            'checked': checked,
+        }
+
+    def run(self) -> None:
+        """Connects to the coordinator and checks leased PIDs until there are none left (or the coordinator goes away).
+
+        Raises:
+            ValueError: When there's no `authkey`
+            ConnectionRefusedError: When the coordinator isn't up within `CONNECT_TIMEOUT` seconds
+        """
+        self._connect()
+        site_name = self._request({'op': 'hello'})['site']
+        scraper = self._scraper(site_name)
+
+        start_cycle, end_cycle = Scraper._start_cycle_workers([scraper], [self.num_threads])
+        renewer: Union[Thread, None] = None
+        leases = 0
+
+        try:
+            while True:
+                r = self._request({'op': 'lease'})
+                if 'wait' in r:
+                    sleep(r['wait'])
+                    continue
+                if r['lease'] is None:
+                    break
+
+                if renewer is None:
+                    renewer = Thread(name='renewer', target=self._renew, args=(r['timeout'] / 3,), daemon=True)
+                    renewer.start()
+
+                self._lease = r['lease']
+                checked = scraper._pids_checked
+
+                scraper.scheduler = PidScheduler(iter(r['pids']), self.batch_size)
+                start_cycle.wait()
+                end_cycle.wait()
+
+                self._lease = None
+                self._request(self._report(scraper, r['lease'], scraper._pids_checked - checked))
+                leases += 1
+        except (EOFError, OSError):
+            logger.error(c.red + f'📡 [{site_name.upper()}] Lost the connection to the coordinator' + c.reset)
+        finally:
+            self._conn.close()
+
+        logger.info(c.green + f'✅ [{site_name.upper()}] {c.bold}Worker done!{c.reset}{c.green} Checked {c.bold}{leases}{c.reset}{c.green} leases ({scraper._pids_checked} pids).' + c.reset)
@@ -1,2 +1,70 @@
-from craper.models.mesh import Footpatrol, Size, JDSports, TheHipStore
-from craper.models.demandware import *
+from importlib import import_module
+from typing import TYPE_CHECKING, Dict, List, Type
+
+if TYPE_CHECKING:
+    from craper.models.site import Site
+
+# name of a site -> '<module>:<class>' of its model, the module only gets imported once the site is used
+SITES: Dict[str, str] = {
+    'footpatrol': 'craper.models.mesh:Footpatrol',
+    'size': 'craper.models.mesh:Size',
+    'jdsports': 'craper.models.mesh:JDSports',
+    'thehipstore': 'craper.models.mesh:TheHipStore',
+    'solebox': 'craper.models.demandware.solebox:Solebox',
+    'snipes': 'craper.models.demandware.snipes:Snipes',
+    'onygo': 'craper.models.demandware.onygo:Onygo',
+    'courir': 'craper.models.demandware.courir:Courir',
+}
+
+# `from craper.models import *` imports every model (through `__getattr__`), like it did before they got imported lazily
+__all__ = ['SITES', 'ENTRY_POINT_GROUP', 'load_site', 'site_names'] + [path.partition(':')[2] for path in SITES.values()]
+
+# sites can be added by other packages, with an entry point in this group, e.g.
+# entry_points={'craper.sites': ['mysite = mypackage.models:MySite']}
+ENTRY_POINT_GROUP = 'craper.sites'
+
+
+def _plugin_sites() -> Dict[str, str]:
+    # importlib.metadata is slow to import, it's only needed for sites which aren't built in
+    from importlib.metadata import entry_points
+    return {ep.name.lower(): ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def site_names() -> List[str]:
+    """Gets the names of all supported sites, including the ones added by other packages.
+
+    Returns:
+        List[str]: Names of the sites
+    """
+    return sorted({**_plugin_sites(), **SITES})
+
+
+def load_site(name: str) -> Type['Site']:
+    """Imports the model of the site provided - and only that one.
+
+    Args:
+        name (str): Name of the site (case insensitive)
+
+    Raises:
+        ValueError: When the site isn't supported
+
+    Returns:
+        Type[Site]: The model
+    """
+    path = SITES.get(name.lower())
+    if path is None:
+        path = _plugin_sites().get(name.lower())
+    if path is None:
+        raise ValueError(f"Scaper for '{name}' is not supported.")
+
+    module, _, attr = path.partition(':')
+    return getattr(import_module(module), attr)
+
+
+def __getattr__(name: str) -> Type['Site']:
+    # keeps `from craper.models import Footpatrol` working, without importing every model up front
+    for path in SITES.values():
+        module, _, attr = path.partition(':')
+        if attr == name:
+            return getattr(import_module(module), attr)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -1,4 +1,15 @@
-from craper.models.demandware.onygo import Onygo
-from craper.models.demandware.snipes import Snipes
-from craper.models.demandware.solebox import Solebox
-from craper.models.demandware.courir import Courir
+from importlib import import_module
+
+_MODELS = {
+    'Onygo': 'craper.models.demandware.onygo',
+    'Snipes': 'craper.models.demandware.snipes',
+    'Solebox': 'craper.models.demandware.solebox',
+    'Courir': 'craper.models.demandware.courir',
+}
+
+
+def __getattr__(name: str):
+    # the models get imported one by one, once used (see `craper.models.load_site`)
+    if name in _MODELS:
+        return getattr(import_module(_MODELS[name]), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
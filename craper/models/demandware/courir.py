@@ -13,6 +13,8 @@ class Courir(Demandware):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
 
     Static Methods:
         parse_pid(pid)
@@ -35,6 +37,8 @@ class Courir(Demandware):
     # def host() -> str:
     #     return 'www.courir.com'
 
+    uri_template = '/on/demandware.static/-/Sites-master-catalog-courir/default/dw227c85ea/images/hi-res/{:09}_101.png'
+
     @staticmethod
     def parse_pid(pid: Union[str, int]) -> int:
         # removeprefix only works on Python 3.9+ !!!
@@ -42,12 +46,12 @@ class Courir(Demandware):
 
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'https://{Courir.host}{Courir.image_uri(pid)}'
+        return Courir._url_format(Courir.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/on/demandware.static/-/Sites-master-catalog-courir/default/dw227c85ea/images/hi-res/{Courir.parse_pid(pid):09}_101.png'
+        return Courir._uri_format(Courir.parse_pid(pid))
     
     @staticmethod
     def format_pid(pid: Union[str, int]) -> str:
-        return f'{int(pid)}'
+        return Courir._pid_format(int(pid))
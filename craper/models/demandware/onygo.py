@@ -13,6 +13,10 @@ class Onygo(Demandware):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
+        pid_template: str
+            Template of the formatted product ID
 
     Static Methods:
         parse_pid(pid)
@@ -35,6 +39,9 @@ class Onygo(Demandware):
     # def host() -> str:
     #     return 'www.onygo.com'
 
+    uri_template = '/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-ong-master-de/default/dw4cb104b1/{}_P.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'
+    pid_template = '000157{:08}'
+
     @staticmethod
     def parse_pid(pid: Union[str, int]) -> int:
         # removeprefix only works on Python 3.9+ !!!
@@ -42,12 +49,12 @@ class Onygo(Demandware):
 
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'https://{Onygo.host}{Onygo.image_uri(pid)}'
+        return Onygo._url_format(Onygo.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-ong-master-de/default/dw4cb104b1/{Onygo.parse_pid(pid)}_P.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'
+        return Onygo._uri_format(Onygo.parse_pid(pid))
     
     @staticmethod
     def format_pid(pid: Union[str, int]) -> str:
-        return f'000157{int(pid):08}'
+        return Onygo._pid_format(int(pid))
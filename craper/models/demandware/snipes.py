@@ -13,6 +13,10 @@ class Snipes(Demandware):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
+        pid_template: str
+            Template of the formatted product ID
 
     Static Methods:
         parse_pid(pid)
@@ -34,6 +38,9 @@ class Snipes(Demandware):
     # @staticmethod
     # def host() -> str:
     #     return 'www.snipes.com'
+
+    uri_template = '/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-snse-master-eu/default/dw538cba39/{}_P.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'
+    pid_template = '000138{:08}'
     
     @staticmethod
     def parse_pid(pid: Union[str, int]) -> int:
@@ -42,12 +49,12 @@ class Snipes(Demandware):
 
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'https://{Snipes.host}{Snipes.image_uri(pid)}'
+        return Snipes._url_format(Snipes.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-snse-master-eu/default/dw538cba39/{Snipes.parse_pid(pid)}_P.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'
+        return Snipes._uri_format(Snipes.parse_pid(pid))
     
     @staticmethod
     def format_pid(pid: Union[str, int]) -> str:
-        return f'000138{int(pid):08}'
+        return Snipes._pid_format(int(pid))
@@ -13,6 +13,10 @@ class Solebox(Demandware):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
+        pid_template: str
+            Template of the formatted product ID
 
     Static Methods:
         parse_pid(pid)
@@ -35,18 +39,21 @@ class Solebox(Demandware):
     # def host() -> str:
     #     return 'www.solebox.com'
 
+    uri_template = '/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-solebox-master-de/default/dw1220ea0d/{}_PS.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'
+    pid_template = '{:08}'
+
     @staticmethod
     def parse_pid(pid: Union[str, int]) -> int:
         return int(pid)
 
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'https://{Solebox.host}{Solebox.image_uri(pid)}'
+        return Solebox._url_format(Solebox.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/dw/image/v2/BDCB_PRD/on/demandware.static/-/Sites-solebox-master-de/default/dw1220ea0d/{Solebox.parse_pid(pid)}_PS.jpg?sw=3000&sh=3000&sm=fit&sfrm=png'
+        return Solebox._uri_format(Solebox.parse_pid(pid))
     
     @staticmethod
     def format_pid(pid: Union[str, int]) -> str:
-        return f'{Solebox.parse_pid(pid):08}'
+        return Solebox._pid_format(Solebox.parse_pid(pid))
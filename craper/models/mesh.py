@@ -1,6 +1,5 @@
-from typing import Callable, Iterator, Union
+from typing import Union
 from craper.models.site import Site
-from math import log10
 
 class Mesh(Site):
     """Abstract Class representing a Mesh site
@@ -13,6 +12,10 @@ class Mesh(Site):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        scheme: str
+            Scheme of the image URLs
+        pid_template: str
+            Template of the formatted product ID
 
     Static Methods:
         parse_pid(pid)
@@ -38,6 +41,9 @@ class Mesh(Site):
     # @staticmethod
     # def host() -> str:
     #     return 'i1.adis.ws'
+
+    scheme = 'http'
+    pid_template = '{:06}'
     
     @staticmethod
     def parse_pid(pid: Union[str, int]) -> int:
@@ -45,24 +51,7 @@ class Mesh(Site):
 
     @staticmethod
     def format_pid(pid: Union[str, int]) -> str:
-        return f'{int(pid):06}'
-    
-    @staticmethod
-    def pid_stream(start: int = 1, stop: int = -1) -> Iterator[int]:
-        curr_pid = start
-        # print(f'Starting stream from {start} to {stop}')
-
-        # Checks if the PID provided is within the range provided in the method parameters
-        in_range : Callable[[int], bool] = lambda pid: (pid <= stop) if (stop != -1) else True
-        # print(f'in_range is {in_range(curr_pid)}')
-
-        # Checks if the number of digits in the PID provided is smaller or equal to the maximum provided
-        max_pid_reached : Callable[[int], bool] = lambda pid: (int(log10(pid)) + 1) > Mesh.max_pid_digits
-        # print(f'max_pid_reached is {max_pid_reached(curr_pid)}')
-        
-        while(in_range(curr_pid) and not max_pid_reached(curr_pid)):
-            yield curr_pid
-            curr_pid += 1
+        return Mesh._pid_format(int(pid))
 
 class Footpatrol(Mesh):
     """Class representing footpatrol.com
@@ -75,6 +64,10 @@ class Footpatrol(Mesh):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
+        pid_template: str
+            Template of the formatted product ID
 
     Static Methods:
         parse_pid(pid)
@@ -91,21 +84,24 @@ class Footpatrol(Mesh):
             When required method(s) / attributes are not implemented
     """
 
+    uri_template = '/i/jpl/fp_{:06}_a'
+    pid_template = '{:06}_footpatrolcom'
+
     @staticmethod
     def parse_pid(pid: Union[str, int]) -> int:
         return int(str(pid).replace('_footpatrolcom', ''))
 
     @staticmethod
     def format_pid(pid: Union[str, int]) -> str:
-        return f'{Footpatrol.parse_pid(pid):06}_footpatrolcom'
+        return Footpatrol._pid_format(Footpatrol.parse_pid(pid))
 
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'http://i1.adis.ws/i/jpl/fp_{Footpatrol.parse_pid(pid):06}_a'
+        return Footpatrol._url_format(Footpatrol.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/i/jpl/fp_{Footpatrol.parse_pid(pid):06}_a'
+        return Footpatrol._uri_format(Footpatrol.parse_pid(pid))
 
 class Size(Mesh):
     """Class representing size.co.uk
@@ -118,6 +114,8 @@ class Size(Mesh):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
 
     Static Methods:
         parse_pid(pid)
@@ -134,13 +132,15 @@ class Size(Mesh):
             When required method(s) / attributes are not implemented
     """
 
+    uri_template = '/i/jpl/sz_{:06}_a'
+
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'http://i1.adis.ws/i/jpl/sz_{Size.parse_pid(pid):06}_a'
+        return Size._url_format(Size.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/i/jpl/sz_{Size.parse_pid(pid):06}_a'
+        return Size._uri_format(Size.parse_pid(pid))
 
 class JDSports(Mesh):
     """Class representing jdsports.co.uk
@@ -153,6 +153,8 @@ class JDSports(Mesh):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
 
     Static Methods:
         parse_pid(pid)
@@ -169,13 +171,15 @@ class JDSports(Mesh):
             When required method(s) / attributes are not implemented
     """
 
+    uri_template = '/i/jpl/jd_{:06}_a'
+
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'http://i1.adis.ws/i/jpl/jd_{JDSports.parse_pid(pid):06}_a'
+        return JDSports._url_format(JDSports.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/i/jpl/jd_{JDSports.parse_pid(pid):06}_a'
+        return JDSports._uri_format(JDSports.parse_pid(pid))
 
 class TheHipStore(Mesh):
     """Class representing thehipstore.co.uk
@@ -188,6 +192,8 @@ class TheHipStore(Mesh):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        uri_template: str
+            Template of the image URI
 
     Static Methods:
         parse_pid(pid)
@@ -203,11 +209,13 @@ class TheHipStore(Mesh):
         ValueError
             When required method(s) / attributes are not implemented
     """
+
+    uri_template = '/i/jpl/hp_{:06}_a'
     
     @staticmethod
     def image_url(pid: Union[str, int]) -> str:
-        return f'http://i1.adis.ws/i/jpl/hp_{TheHipStore.parse_pid(pid):06}_a'
+        return TheHipStore._url_format(TheHipStore.parse_pid(pid))
     
     @staticmethod
     def image_uri(pid: Union[str, int]) -> str:
-        return f'/i/jpl/hp_{TheHipStore.parse_pid(pid):06}_a'
+        return TheHipStore._uri_format(TheHipStore.parse_pid(pid))
@@ -1,5 +1,32 @@
 from abc import ABC, abstractmethod, abstractproperty
-from typing import Dict, Iterator, Union
+from itertools import chain
+from string import Formatter
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+
+def compile_template(template: str) -> Callable[[int], str]:
+    """Checks a `str.format` template with a single field (`{}`, `{:08}`, ...) and returns a function filling it in
+    - the template's bound `str.format`, so nothing gets looked up (or parsed into a format call) per PID.
+
+    Args:
+        template (str): Template to compile
+
+    Raises:
+        ValueError: When the template has a named or positional field, or more than one field
+
+    Returns:
+        Callable[[int], str]: Function filling the (integer) product ID into the template
+    """
+    fields = 0
+    for _, field, _, conversion in Formatter().parse(template):
+        if field is None:
+            continue
+        if field != '' or conversion is not None:
+            raise ValueError(f"Template '{template}' can only have anonymous fields, e.g. '{{}}' or '{{:08}}'.")
+        fields += 1
+    if fields > 1:
+        raise ValueError(f"Template '{template}' can only have a single field.")
+    return template.format
 
 class Site(ABC):
     """Abstract class representing a website
@@ -12,13 +39,28 @@ class Site(ABC):
             Maximum number of digits a product ID can have
         host: str
             Hostname of the website
+        scheme: str
+            Scheme of the image URLs
+        uri_template: str
+            Template of the image URI, with a single `str.format` field for the (integer) product ID
+        pid_template: str
+            Template of the formatted product ID, with a single `str.format` field for the (integer) product ID
 
     Static Methods:
         parse_pid(pid)
         image_url(pid)
         image_uri(pid)
         format_pid(pid)
+
+    Class Methods:
+        max_pid()
+        pid_ranges(start, stop)
         pid_stream(start, stop)
+        url_for(pid)
+        uri_for(pid)
+        formatted_for(pid)
+        urls_for(pids)
+        render(pids)
 
     Methods:
         build_embed(color, author_name, footer_text, pid)
@@ -28,6 +70,23 @@ class Site(ABC):
             When required method(s) / attributes are not implemented
     """
 
+    scheme = 'https'
+    uri_template: str = None
+    pid_template: str = '{}'
+
+    # the templates compiled, see `__init_subclass__`
+    _uri_format: Callable[[int], str]
+    _url_format: Callable[[int], str]
+    _pid_format: Callable[[int], str]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # check the templates once per site, so rendering an URL for a PID is a single (bound) `str.format` call
+        if cls.uri_template is not None:
+            cls._uri_format = staticmethod(compile_template(cls.uri_template))
+            cls._url_format = staticmethod(compile_template(f'{cls.scheme}://{cls.host}{cls.uri_template}'))
+        cls._pid_format = staticmethod(compile_template(cls.pid_template))
+
     @property
     @abstractmethod
     def max_pid_digits(self = None) -> int:
@@ -86,19 +145,126 @@ class Site(ABC):
         """
         raise ValueError("The format_pid method is not defined on the child class.")
    
-    @staticmethod
-    @abstractmethod
-    def pid_stream(start: int = 1, stop: int = -1) -> Iterator[int]:
+    @classmethod
+    def max_pid(cls) -> int:
+        """Returns the highest product ID the site can have, based on `max_pid_digits`"""
+        return 10 ** cls.max_pid_digits - 1
+
+    @classmethod
+    def pid_ranges(cls, start: int = 1, stop: int = -1) -> Iterator[range]:
+        """Creates a stream of contiguous PID ranges, the bounds computed once instead of on every PID
+
+        Args:
+            start (int, optional): The beginning of the stream. Defaults to 1.
+            stop (int, optional): The end of the stream (included). Defaults to -1, which means up to the highest PID the site can have.
+
+        Returns:
+            Iterator[range]: An iterator which will yield ranges of PIDs.
+        """
+        last = cls.max_pid() if stop == -1 else min(stop, cls.max_pid())
+        if start <= last:
+            yield range(start, last + 1)
+
+    @classmethod
+    def pid_stream(cls, start: int = 1, stop: int = -1) -> Iterator[int]:
         """Creates a stream which generates PIDs
 
         Args:
             start (int, optional): The beginning of the stream. Defaults to 1.
-            stop (int, optional): The end of the stream. Defaults to -1, which means it generate PIDs to infinity.
+            stop (int, optional): The end of the stream. Defaults to -1, which means it generate PIDs up to the highest PID the site can have.
 
         Returns:
             Iterator[int]: An iterator which will yiled PIDs.
         """
-        raise ValueError("The pid_stream method is not defined on the child class.")
+        return chain.from_iterable(cls.pid_ranges(start, stop))
+
+    @classmethod
+    def url_for(cls, pid: int) -> str:
+        """Fast path of `image_url` for an (already parsed) integer product ID
+
+        Args:
+            pid (int): Product ID
+
+        Returns:
+            str: Image URL
+        """
+        return cls._url_format(pid)
+
+    @classmethod
+    def uri_for(cls, pid: int) -> str:
+        """Fast path of `image_uri` for an (already parsed) integer product ID
+
+        Args:
+            pid (int): Product ID
+
+        Returns:
+            str: Image URI
+        """
+        return cls._uri_format(pid)
+
+    @classmethod
+    def formatted_for(cls, pid: int) -> str:
+        """Fast path of `format_pid` for an (already parsed) integer product ID
+
+        Args:
+            pid (int): Product ID
+
+        Returns:
+            str: Formatted product ID
+        """
+        return cls._pid_format(pid)
+
+    @classmethod
+    def urls_for(cls, pids: Iterable[int]) -> List[str]:
+        """Renders the image URLs for a batch of (integer) product IDs at once
+
+        Args:
+            pids (Iterable[int]): Product IDs
+
+        Returns:
+            List[str]: Image URLs, in the same order
+        """
+        return list(map(cls._url_format, pids))
+
+    @classmethod
+    def render(cls, pids: Iterable[int]) -> List[Tuple[int, str, str]]:
+        """Renders a batch of (integer) product IDs into database rows at once
+
+        Args:
+            pids (Iterable[int]): Product IDs
+
+        Returns:
+            List[Tuple[int, str, str]]: (pid, formatted_pid, image_url) tuples, as expected by `DatabaseWrapper.add_many`
+        """
+        url_format, pid_format = cls._url_format, cls._pid_format
+        return [(pid, pid_format(pid), url_format(pid)) for pid in pids]
+
+    def build_embed(self, color: int, author_name: str, footer_text: str, pid: int) -> Dict:
+        """Builds an embed with the properties provided.
+
+        Args:
+            color (int): HEX Color
+            author_name (str): Author name
+            footer_text (str): Footer text
+            pid (int): Product ID
+
+        Returns:
+            Dict: Discord embed dictionary
+        """
+        pid = self.parse_pid(pid)
+        return {
+            "description": f'```{self.formatted_for(pid)}```',
+            "color": color,
+            "image": {
+                "url": self.url_for(pid),
+            },
+            "author": {
+                "name": author_name,
+            },
+            "footer": {
+                "text": footer_text, 
+            },
+        }
 
     def build_webhook(self, color: int, author_name: str, footer_text: str, pid: int) -> Dict:
         """Builds and embed for the with the properties provided.
@@ -114,18 +280,6 @@ class Site(ABC):
         """
         return {
             'embeds': [
-                {
-                    "description": f'```{self.format_pid(pid)}```',
-                    "color": color,
-                    "image": {
-                        "url": self.image_url(pid),
-                    },
-                    "author": {
-                        "name": author_name,
-                    },
-                    "footer": {
-                        "text": footer_text, 
-                    },
-                }
+                self.build_embed(color, author_name, footer_text, pid),
             ]
         }
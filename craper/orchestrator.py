@@ -0,0 +1,129 @@
+from typing import List, Type
+
+from craper.scraper import Scraper
+from craper.shared import SharedResources
+from craper.utils import logger, TermColors as c
+
+
+class Orchestrator:
+    """Scrapes multiple sites at once, in a single process.
+
+    All scrapers share one database (and its writer), one proxy pool, one connection pool per host
+    and one rate limiter per host, so sites living on the same CDN don't ratelimit each other.
+    The workers are split between the sites by their weights.
+
+    Args:
+        site_names: List[str]
+            Names of the sites to scrape
+        weights: List[float]
+            Share of the workers each site gets, all sites get the same share when None
+        scraper_class: Type[Scraper]
+            Engine to scrape with, `Scraper` (threads) or `AsyncScraper`
+        use_proxies: bool
+            Whether or not to use proxies
+        db_path: str
+            Path to a database where to save found PIDs
+        db_synchronous: str
+            SQLite's synchronous level
+        pool_size: int
+            Maximum number of (keep-alive) connections per host
+        shared: SharedResources
+            Resources to share between the scrapers instead of loading new ones, `use_proxies` and the `db_*` & `pool_size` arguments are ignored when provided
+        **kwargs
+            Passed to each of the scrapers (start_pid, stop_pid, rate, resume, ...)
+
+    Methods:
+        split(workers)
+        save_checkpoint()
+        scrape(workers, pids_per_thread, batch_size)
+        watch(workers, interval, window, batch_size)
+
+    Raises:
+        ValueError
+            When the weights are malformed
+    """
+    def __init__(
+        self,
+        site_names: List[str],
+        weights: List[float] = None,
+        scraper_class: Type[Scraper] = Scraper,
+        use_proxies: bool = False,
+        db_path: str = None,
+        db_synchronous: str = 'NORMAL',
+        pool_size: int = 10,
+        shared: SharedResources = None,
+        **kwargs,
+    ) -> None:
+        if weights is None:
+            weights = [1] * len(site_names)
+
+        if len(weights) != len(site_names):
+            raise ValueError(f'Got {len(weights)} weights for {len(site_names)} sites.')
+        if any(w <= 0 for w in weights):
+            raise ValueError('All weights have to be greater than 0.')
+
+        self.weights = weights
+        self.scraper_class = scraper_class
+        self.shared = shared if shared is not None else SharedResources.create(use_proxies, db_path, db_synchronous, pool_size)
+        self.scrapers = [
+            scraper_class(name, use_proxies=use_proxies, pool_size=pool_size, shared=self.shared, **kwargs)
+            for name in site_names
+        ]
+
+    def split(self, workers: int) -> List[int]:
+        """Splits the `workers` provided between the sites, by their weights (largest remainder first), so they add up to `workers`.
+        Every site gets at least one worker - when there are more sites than workers, the sites get one each.
+
+        Args:
+            workers (int): Number of workers (threads or requests in flight) in total
+
+        Returns:
+            List[int]: Number of workers for each of the sites
+        """
+        total = sum(self.weights)
+        quotas = [workers * w / total for w in self.weights]
+        shares = [int(q) for q in quotas]
+
+        # the workers left over go to the sites with the largest remainders (the first ones, on a tie)
+        by_remainder = sorted(range(len(quotas)), key=lambda i: quotas[i] - shares[i], reverse=True)
+        for i in by_remainder[:workers - sum(shares)]:
+            shares[i] += 1
+
+        # a site without workers would never finish, it gets one of the site with the most
+        for i in range(len(shares)):
+            if shares[i] == 0:
+                shares[i] = 1
+                most = max(range(len(shares)), key=lambda j: shares[j])
+                if shares[most] > 1:
+                    shares[most] -= 1
+        return shares
+
+    def save_checkpoint(self) -> None:
+        """Saves the scraping progress of all sites."""
+        for scraper in self.scrapers:
+            scraper.save_checkpoint()
+
+    def scrape(self, workers: int, pids_per_thread: int = None, batch_size: int = 20) -> None:
+        """Scrapes all sites until there are no PIDs left, with `workers` workers in total.
+
+        Args:
+            workers (int): Number of workers (threads or requests in flight) in total
+            pids_per_thread (int, optional): When scraping without a stop PID, only `workers[i] * pids_per_thread` PIDs get checked for each site, `workers[i]` being its share of the workers (see `split`). Defaults to None (no limit).
+            batch_size (int, optional): Number of PIDs handed out to a worker at a time. Defaults to 20.
+        """
+        shares = self.split(workers)
+        sites = ', '.join(f'{s.name.upper()} ({n})' for s, n in zip(self.scrapers, shares))
+        logger.info(c.yellow + f'🚧 Scraping {len(self.scrapers)} sites: {sites}' + c.reset)
+
+        self.scraper_class.scrape_many(self.scrapers, shares, pids_per_thread, batch_size)
+
+    def watch(self, workers: int, interval: float = 60, window: int = None, batch_size: int = 20) -> None:
+        """Keeps checking the PIDs above the highest known PID of each site, every `interval` seconds (or so), until interrupted.
+
+        Args:
+            workers (int): Number of workers (threads or requests in flight) in total
+            interval (float, optional): Number of seconds inbetween cycles. Defaults to 60.
+            window (int, optional): Number of PIDs above the highest known PID to check every cycle. Defaults to None.
+            batch_size (int, optional): Number of PIDs handed out to a worker at a time. Defaults to 20.
+        """
+        self.scraper_class.watch_many(self.scrapers, self.split(workers), interval, window, batch_size)
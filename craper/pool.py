@@ -0,0 +1,167 @@
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from threading import Thread
+from typing import Any, Dict, List, Type, Union
+
+from craper.db import SharedPidIndex
+from craper.distributed import Coordinator, Worker
+from craper.scraper import Scraper
+from craper.utils import flush_logs, forward_logs, logger, metrics, receive_logs, TermColors as c
+from craper.utils.log import aggregator
+
+# new processes instead of forks - forking a process with threads running (sender, logging, ...) isn't safe
+_context = get_context('spawn')
+
+
+class ProcessWorker(Worker):
+    """Checks PIDs leased from a `ProcessPool`, in a process of its own - talks to it through a pipe instead of TCP,
+    and looks the known PIDs up in the pool's index (in shared memory) instead of loading them from the database.
+
+    Args:
+        conn: Connection
+            Pipe to the pool
+        index_name: str
+            Name of the shared memory block holding the known PIDs, see `PidIndex.share`
+        num_threads: int
+            Number of threads checking the PIDs
+        batch_size: int
+            Number of PIDs handed out to a thread at a time
+        **kwargs
+            Passed to the scraper (use_proxies, rate, db_path, ...)
+
+    Methods:
+        run()
+    """
+    def __init__(self, conn: Connection, index_name: str, num_threads: int = 10, batch_size: int = 20, **kwargs) -> None:
+        super().__init__(num_threads=num_threads, batch_size=batch_size, **kwargs)
+        self._conn = conn
+        self.index_name = index_name
+
+    def _connect(self) -> None:
+        # the pipe is connected already
+        pass
+
+    def _scraper(self, site_name: str) -> Scraper:
+        scraper = super()._scraper(site_name)
+        scraper._current_pids = SharedPidIndex(scraper.site.max_pid_digits, self.index_name)
+        return scraper
+
+    def _report(self, scraper: Scraper, lease_id: int, checked: int) -> Dict:
+        report = super()._report(scraper, lease_id, checked)
+        # the probes go into the pool's metrics, the PIDs found get counted by the pool (once the duplicates are dropped)
+        report['metrics'] = metrics.take(exclude=('craper_found_total',))
+        return report
+
+
+def _work(
+    worker_class: Type[ProcessWorker],
+    conn: Connection,
+    index_name: str,
+    log_queue: Any,
+    log_level: int,
+    log_interval: float,
+    num_threads: int,
+    batch_size: int,
+    kwargs: Dict,
+) -> None:
+    """Runs a `ProcessWorker` - the entry point of the pool's processes."""
+    forward_logs(log_queue, log_level, log_interval)
+    try:
+        worker_class(conn, index_name, num_threads, batch_size, **kwargs).run()
+    except KeyboardInterrupt:
+        # the pool saves the progress
+        pass
+    finally:
+        # atexit handlers don't run in the processes of a pool
+        flush_logs()
+
+
+class ProcessPool(Coordinator):
+    """Checks the PIDs of a scraper's site with `num_processes` worker processes on this machine, each running `num_threads` threads.
+    A single process is limited to one core (by the GIL), no matter how many threads it runs.
+
+    Works like a `Coordinator` with its `Worker`s, connected through pipes instead of TCP - the PIDs get leased to the processes
+    in sub-ranges of `lease_size` PIDs and the PIDs found are saved & sent (webhooks) by this process only.
+    The known PIDs are shared with the processes through shared memory, instead of being loaded into every one of them.
+
+    Args:
+        scraper: Scraper
+            Scraper of the site, only its PID stream, database and sender get used in this process
+        num_processes: int
+            Number of worker processes
+        num_threads: int
+            Number of threads checking the PIDs in each process
+        batch_size: int
+            Number of PIDs handed out to a thread at a time
+        lease_size: int
+            Number of PIDs leased to a process at a time
+        worker_class: Type[ProcessWorker]
+            Worker run by the processes, has to be importable by them
+        **kwargs
+            Passed to the scrapers of the processes (use_proxies, rate, db_path, ...), the `rate` gets split between them
+
+    Methods:
+        serve()
+    """
+    def __init__(
+        self,
+        scraper: Scraper,
+        num_processes: int,
+        num_threads: int = 10,
+        batch_size: int = 20,
+        lease_size: int = 1000,
+        worker_class: Type[ProcessWorker] = ProcessWorker,
+        **kwargs,
+    ) -> None:
+        super().__init__(scraper, lease_size=lease_size)
+        self.num_processes = num_processes
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.worker_class = worker_class
+        # each process has a rate limiter of its own
+        if 'rate' in kwargs:
+            kwargs['rate'] = kwargs['rate'] / num_processes
+        self.kwargs = kwargs
+
+        self._processes: List[Any] = []
+        self._log_listener = None
+        self._index_name: Union[str, None] = None
+
+    def _start_workers(self) -> None:
+        """Starts the worker processes, with a thread answering each one's requests."""
+        self._index_name = self.scraper.current_pids.share()
+        log_queue = _context.Queue()
+        self._log_listener = receive_logs(log_queue)
+
+        for _ in range(self.num_processes):
+            conn, child_conn = _context.Pipe()
+            process = _context.Process(
+                target=_work,
+                args=(self.worker_class, child_conn, self._index_name, log_queue, logger.getEffectiveLevel(), aggregator.interval, self.num_threads, self.batch_size, self.kwargs),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._processes.append(process)
+            Thread(target=self._handle, args=(conn, next(self._owners)), daemon=True).start()
+
+        logger.info(c.yellow + f'🧵 [{self.scraper.name.upper()}] Started {self.num_processes} processes with {self.num_threads} threads each ({self.lease_size} PIDs per lease)' + c.reset)
+
+    def _workers_alive(self) -> bool:
+        return any(process.is_alive() for process in self._processes)
+
+    def _stop_workers(self) -> None:
+        """Waits for the worker processes to exit (they do once there are no PIDs left), stopping the ones which don't."""
+        self._closed = True
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._processes.clear()
+
+        # the processes' logs are all in the queue once they exited
+        self._log_listener.stop()
+        # the PID stream scans the shared bitmap, it has to let go of it first (e.g. when interrupted in the middle of the sweep)
+        self.scraper.scheduler.close()
+        self.scraper.current_pids.unshare()
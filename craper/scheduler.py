@@ -0,0 +1,302 @@
+from array import array
+from itertools import islice
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Set, Tuple
+
+if TYPE_CHECKING:
+    from craper.db import PidIndex
+
+
+def frontier_pids(known: 'PidIndex', recent: Iterable[int], start: int = 1, stop: int = -1, ahead: int = 1000, radius: int = 50) -> List[int]:
+    """Picks the PIDs most likely to belong to new products - new products get PIDs just above
+    the highest PID known, or fill in the gaps next to the PIDs found recently.
+
+    The PIDs are ordered by priority: `ahead` PIDs above the highest known PID (or from `start`, when it's higher) first, then
+    up to `radius` PIDs on each side of every recent PID (nearest first). Known PIDs are left out.
+
+    Args:
+        known (PidIndex): PIDs already found
+        recent (Iterable[int]): PIDs found recently, the most recent first
+        start (int, optional): Lowest PID to pick. Defaults to 1.
+        stop (int, optional): Highest PID to pick. Defaults to -1 (no limit, besides the PIDs the index can hold).
+        ahead (int, optional): Number of PIDs to pick above the highest known PID. Defaults to 1000.
+        radius (int, optional): Number of PIDs to pick on each side of a recent PID. Defaults to 50.
+
+    Returns:
+        List[int]: PIDs to check first
+    """
+    highest = known.size - 1 if stop == -1 else min(stop, known.size - 1)
+    in_range = lambda pid: start <= pid <= highest
+
+    picked: List[int] = []
+    seen: Set[int] = set()
+
+    def pick(pid: int) -> None:
+        if in_range(pid) and pid not in seen and pid not in known:
+            seen.add(pid)
+            picked.append(pid)
+
+    # with nothing known (yet) at or above `start`, the window starts at `start` instead
+    lowest = max(known.max(), start - 1) + 1
+    for pid in range(lowest, lowest + ahead):
+        pick(pid)
+
+    for hit in recent:
+        for distance in range(1, radius + 1):
+            pick(hit + distance)
+            pick(hit - distance)
+
+    return picked
+
+
+def exclude_pids(ranges: Iterable[range], pids: Iterable[int]) -> Iterator[range]:
+    """Subtracts the `pids` provided from contiguous ranges of PIDs - a merge of two sorted sequences,
+    instead of looking every PID of the ranges up.
+
+    Args:
+        ranges (Iterable[range]): Contiguous ranges of PIDs, in ascending order
+        pids (Iterable[int]): PIDs to leave out, in ascending order
+
+    Returns:
+        Iterator[range]: Contiguous ranges of the PIDs left, in ascending order
+    """
+    pids = iter(pids)
+    excluded = next(pids, None)
+    for r in ranges:
+        current = r.start
+        while excluded is not None and excluded < r.stop:
+            if excluded >= current:
+                if excluded > current:
+                    yield range(current, excluded)
+                current = excluded + 1
+            excluded = next(pids, None)
+        if current < r.stop:
+            yield range(current, r.stop)
+
+
+class PidScheduler:
+    """Thread-safe work queue, handing out small batches of PIDs from a PID stream to workers on demand.
+
+    Workers keep asking for a new batch as soon as they're done with the previous one,
+    so a single slow worker (ratelimited, slow proxy, ...) never holds up a large chunk of PIDs.
+
+    Workers report back each batch they're done with, which lets the scheduler keep track of the low-water mark -
+    the PID up to which all PIDs handed out have been checked (assuming the stream is ascending).
+
+    Prioritised PIDs (e.g. from `frontier_pids`) are handed out before the stream and don't move the low-water mark.
+
+    PIDs which failed to be checked get reported back with their batch, and are kept in a compact array (8 bytes per PID)
+    - memory stays flat no matter how large the stream is, unless the checks keep failing.
+
+    Args:
+        pids: Iterator[int]
+            Stream of PIDs to hand out, e.g. `Site.pid_stream(start, stop)`
+        batch_size: int
+            Maximum number of PIDs handed out at a time
+        low_water: int
+            Low-water mark to start with, usually the PID before the first one in the stream
+        priority: Iterable[int]
+            PIDs to hand out before the stream, in any order
+
+    Methods:
+        next_batch()
+        done(batch, failed)
+        in_flight()
+        failed()
+        close()
+    """
+    def __init__(self, pids: Iterator[int], batch_size: int = 20, low_water: int = 0, priority: Iterable[int] = ()) -> None:
+        if batch_size < 1:
+            raise ValueError('The batch_size has to be greater or equal to 1.')
+
+        self.batch_size = batch_size
+        self._pids = iter(pids)
+        self._priority = iter(priority)
+        self._lock = Lock()
+        self._exhausted = False
+
+        self._low_water = low_water
+        self._last = low_water
+        # batches handed out, but not done yet
+        self._outstanding: Dict[int, List[int]] = {}
+        self._outstanding_priority: Dict[int, List[int]] = {}
+        self._failed = array('q')
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether or not all PIDs have been handed out"""
+        return self._exhausted
+
+    def next_batch(self) -> List[int]:
+        """Gets the next batch of PIDs to check.
+
+        Returns:
+            List[int]: Up to `batch_size` PIDs, an empty list when there are no PIDs left
+        """
+        with self._lock:
+            batch = list(islice(self._priority, self.batch_size))
+            if len(batch) > 0:
+                self._outstanding_priority[id(batch)] = batch
+                return batch
+
+            batch = list(islice(self._pids, self.batch_size))
+            if len(batch) < self.batch_size:
+                self._exhausted = True
+            if len(batch) > 0:
+                self._outstanding[id(batch)] = batch
+                self._last = max(self._last, batch[-1])
+            return batch
+
+    def done(self, batch: List[int], failed: Iterable[int] = ()) -> None:
+        """Marks a batch (returned by `next_batch`) as checked.
+
+        Args:
+            batch (List[int]): The batch
+            failed (Iterable[int], optional): PIDs of the batch which failed to be checked. Defaults to ().
+        """
+        with self._lock:
+            self._outstanding.pop(id(batch), None)
+            self._outstanding_priority.pop(id(batch), None)
+            self._failed.extend(failed)
+
+    @property
+    def low_water(self) -> int:
+        """The PID up to (and including) which all PIDs handed out have been checked"""
+        with self._lock:
+            if len(self._outstanding) == 0:
+                low_water = self._last
+            else:
+                low_water = min(batch[0] for batch in self._outstanding.values()) - 1
+            # never goes back, even when PIDs lower than the mark get handed out (e.g. retries of failed PIDs)
+            self._low_water = max(self._low_water, low_water)
+            return self._low_water
+
+    def in_flight(self) -> List[int]:
+        """Gets all PIDs handed out, which haven't been checked yet.
+
+        Returns:
+            List[int]: PIDs in batches which aren't done yet
+        """
+        with self._lock:
+            return [pid for batches in (self._outstanding, self._outstanding_priority) for batch in batches.values() for pid in batch]
+
+    def failed(self) -> List[int]:
+        """Gets all PIDs which failed to be checked (as reported with their batch).
+
+        Returns:
+            List[int]: The PIDs, in ascending order
+        """
+        with self._lock:
+            return sorted(set(self._failed))
+
+    def close(self) -> None:
+        """Stops handing out PIDs from the stream and drops it - a stream scanning a bitmap (see `PidIndex.missing_ranges`)
+        holds on to the bitmap's memory until then."""
+        with self._lock:
+            pids, self._pids = self._pids, iter(())
+            self._exhausted = True
+        close = getattr(pids, 'close', None)
+        if close is not None:
+            close()
+
+
+class MissCache:
+    """Remembers which PIDs were checked and not found (404) lately, so checking them again can wait -
+    while watching, the same PIDs above the newest product get checked over and over.
+
+    A PID doesn't get checked for `ttl` seconds after it wasn't found, every miss in a row doubles that (up to `max_ttl` seconds).
+
+    Args:
+        ttl: float
+            Number of seconds a PID doesn't get checked for after its first miss
+        max_ttl: float
+            Maximum number of seconds a PID doesn't get checked for
+        entries: Iterable[Tuple[int, float, int]]
+            (pid, time of the last miss, number of misses in a row) tuples to start with, e.g. from `DatabaseWrapper.get_misses`
+
+    Methods:
+        miss(pid, now)
+        forget(pids)
+        skips(pid, now)
+        take_changes()
+    """
+    def __init__(self, ttl: float, max_ttl: float = 3600, entries: Iterable[Tuple[int, float, int]] = ()) -> None:
+        if ttl <= 0:
+            raise ValueError('The ttl has to be greater than 0.')
+
+        self.ttl = ttl
+        self.max_ttl = max(ttl, max_ttl)
+
+        self._lock = Lock()
+        # pid -> (time (`time.time`) of the last miss, number of misses in a row)
+        self._entries: Dict[int, Tuple[float, int]] = {pid: (missed_at, misses) for pid, missed_at, misses in entries}
+        # PIDs whose entries changed (or were forgotten) since the last `take_changes`
+        self._changed: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expires(self, missed_at: float, misses: int) -> float:
+        # the exponent is capped - the TTL reaches max_ttl long before that anyway
+        return missed_at + min(self.ttl * 2 ** min(misses - 1, 32), self.max_ttl)
+
+    def miss(self, pid: int, now: float = None) -> None:
+        """Records a PID which wasn't found.
+
+        Args:
+            pid (int): The PID
+            now (float, optional): Time (`time.time`) of the miss. Defaults to None (now).
+        """
+        now = time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(pid)
+            self._entries[pid] = (now, entry[1] + 1 if entry is not None else 1)
+            self._changed.add(pid)
+
+    def forget(self, pids: Iterable[int]) -> None:
+        """Drops the misses of the `pids` provided, so they get checked right away - e.g. the PIDs next to a new product.
+
+        Args:
+            pids (Iterable[int]): PIDs to forget
+        """
+        with self._lock:
+            for pid in pids:
+                if self._entries.pop(pid, None) is not None:
+                    self._changed.add(pid)
+
+    def skips(self, pid: int, now: float = None) -> bool:
+        """Whether or not checking the PID can wait, because it missed lately.
+
+        Args:
+            pid (int): The PID
+            now (float, optional): Current time (`time.time`). Defaults to None (now).
+
+        Returns:
+            bool: True while the PID's TTL isn't over
+        """
+        entry = self._entries.get(pid)
+        if entry is None:
+            return False
+        return (time() if now is None else now) < self._expires(*entry)
+
+    def take_changes(self, now: float = None) -> Tuple[List[Tuple[int, float, int]], List[int]]:
+        """Gets the entries changed since the last call, e.g. to save them into the database.
+        Entries which expired more than `max_ttl` seconds ago get dropped (their next miss counts as the first one again).
+
+        Args:
+            now (float, optional): Current time (`time.time`). Defaults to None (now).
+
+        Returns:
+            Tuple[List[Tuple[int, float, int]], List[int]]: (pid, time of the last miss, number of misses in a row) tuples changed & PIDs dropped
+        """
+        now = time() if now is None else now
+        with self._lock:
+            for pid in [pid for pid, (missed_at, _) in self._entries.items() if missed_at < now - 2 * self.max_ttl]:
+                del self._entries[pid]
+                self._changed.add(pid)
+
+            changed, self._changed = self._changed, set()
+            entries = [(pid, *self._entries[pid]) for pid in sorted(changed) if pid in self._entries]
+            dropped = [pid for pid in sorted(changed) if pid not in self._entries]
+            return entries, dropped
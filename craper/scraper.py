@@ -1,33 +1,24 @@
 #!/usr/local/bin/python3
 
-from json import loads
-from math import ceil
-from os import makedirs, path
-from pathlib import Path
-from queue import Queue
+from collections import deque
+from itertools import chain, islice
+from logging import INFO, WARNING
 from random import choice as rand_choice
-from threading import Condition, Lock, Thread, current_thread
-# TODO add a conditional variable for sending pids
+from threading import Barrier, Lock, Thread, current_thread
 
-from time import sleep
-from typing import Dict, List, Union
+from time import monotonic, sleep, time
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
 
-from requests import exceptions, head, post
+from urllib.parse import urlparse
 
-from craper.db.db import DatabaseWrapper
-from craper.models import *
-from craper.utils import load_proxies, TermColors as c
+from requests import Response, exceptions
 
-SITES = {
-    'footpatrol': Footpatrol,
-    'size': Size,
-    'jdsports': JDSports,
-    'thehipstore': TheHipStore,
-    'solebox': Solebox,
-    'snipes': Snipes,
-    'onygo': Onygo,
-    'courir': Courir,
-}
+from craper.db import PidIndex
+from craper.models import load_site
+from craper.scheduler import MissCache, PidScheduler, exclude_pids, frontier_pids
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import flush_logs, get_limiter, logger, metrics, parse_retry_after, should_log, TermColors as c
 
 class Scraper:
     """Scraper class, implementing a scraper for one of the supported websites.
@@ -50,12 +41,27 @@ class Scraper:
         debug
         delay
         db_path
+        db_synchronous
+        pool_size
+        rate
+        resume
+        frontier
+        miss_ttl
+        miss_max_ttl
+        shared
 
     Methods:
         get_proxy()
         check_pid(pid)
         send_all()
-        scrape(num_threads, pids_per_thread)
+        save_checkpoint()
+        save_misses()
+        start(num_threads, pids_per_thread, batch_size)
+        join(timeout)
+        scrape(num_threads, pids_per_thread, batch_size)
+        scrape_many(scrapers, workers, pids_per_thread, batch_size)
+        watch(num_threads, interval, window, batch_size)
+        watch_many(scrapers, workers, interval, window, batch_size)
     
     Raises:
         ValueError
@@ -63,6 +69,15 @@ class Scraper:
         FileNotFoundError
             When a required file(s) is missing
     """
+    # number of seconds inbetween saving the scraping progress
+    CHECKPOINT_INTERVAL = 30
+    # frontier scanning - number of PIDs above the highest known one, recent PIDs to look around & PIDs on each side of them
+    FRONTIER_AHEAD = 1000
+    FRONTIER_HITS = 50
+    FRONTIER_RADIUS = 50
+    # number of seconds a request can take (connecting included), before its PID counts as failed
+    TIMEOUT = 30
+
     def __init__(
         self,
         site_name: str,
@@ -72,6 +87,14 @@ class Scraper:
         debug: bool = False,
         delay: int = 1,
         db_path: str = None,
+        db_synchronous: str = 'NORMAL',
+        pool_size: int = 10,
+        rate: float = 1000,
+        resume: bool = False,
+        frontier: bool = False,
+        miss_ttl: float = 0,
+        miss_max_ttl: float = 3600,
+        shared: SharedResources = None,
     ) -> None:
         """Initializes a new Scraper instance.
 
@@ -80,73 +103,72 @@ class Scraper:
             start_pid (Union[int, str], optional): PID the scraper starts with. Defaults to 1.
             stop_pid (Union[int, str], optional): PID the scraper starts with. Defaults to -1.
             use_proxies (bool, optional): Whether or not to use proxies. Defaults to False.
-            debug (bool, optional): Prints additional messages to the console when set to True. Defaults to False.
+            debug (bool, optional): Logs additional messages when set to True, with the logging set up at the DEBUG level (see `setup_logging`). Defaults to False.
             delay (int, optional): Delay inbetween requests in each thread. Defaults to 1.
             db_path (str, optional): Path to a database where to save found PIDs. Defaults to None.
+            db_synchronous (str, optional): SQLite's synchronous level (OFF, NORMAL, FULL or EXTRA). Defaults to 'NORMAL'.
+            pool_size (int, optional): Maximum number of (keep-alive) connections per host. Defaults to 10.
+            rate (float, optional): Maximum number of requests per second sent to the site's host, lowered (for a while) when ratelimited. Defaults to 1000.
+            resume (bool, optional): Continue from the progress saved by the previous run (instead of the `start_pid`). Defaults to False.
+            frontier (bool, optional): Check the PIDs above the highest known PID and next to the PIDs found recently first, before sweeping through the rest. Defaults to False.
+            miss_ttl (float, optional): Number of seconds a PID of the frontier (or watch window) doesn't get checked again for after it wasn't found (404), doubling with every miss in a row - see `MissCache`. Defaults to 0 (always checked).
+            miss_max_ttl (float, optional): Maximum number of seconds a PID which keeps missing doesn't get checked for. Defaults to 3600.
+            shared (SharedResources, optional): Resources shared with other scrapers, `use_proxies` and the `db_*` & `pool_size` arguments are ignored when provided. Defaults to None.
 
         Raises:
             FileNotFoundError: When the config.json file isn't found in the config folder
             ValueError: When a scraper for a non-supported site is initalized
             ValueError: When the `start_pid` is lower than 1
             ValueError: When the `stop_pid` is lower than -1
+            ValueError: When the `rate` isn't greater than 0
             ValueError: When there are no webhooks set in the config.json file
             ValueError: When a webhook isn't found for the site provided
             ValueError: When a webhook is empty
         """
 
-        print(c.bold + f"ℹ️  [{site_name.upper()}] Initializing a scraper" + c.reset)
-        print(f"ℹ️  [{site_name.upper()}] Starting from PID {start_pid} and ending {'never' if int(stop_pid) == -1 else f'at {stop_pid}'}")
-        print(f"ℹ️  [{site_name.upper()}] {'Using proxies' if use_proxies else 'Not using proxies'} on a {delay}s delay.")
+        logger.info(c.bold + f"ℹ️  [{site_name.upper()}] Initializing a scraper" + c.reset)
+        logger.info(f"ℹ️  [{site_name.upper()}] Starting from PID {start_pid} and ending {'never' if int(stop_pid) == -1 else f'at {stop_pid}'}")
+        logger.info(f"ℹ️  [{site_name.upper()}] {'Using proxies' if use_proxies else 'Not using proxies'} on a {delay}s delay.")
 
         self.running_threads: List[Thread] = []
         self.debug = debug
         self.delay = delay
-        
-        self.db_lock = Lock()
-        self.curr_lock = Lock()
-        self.print_lock = Lock()
-        
+
         self.cnt_lock = Lock()
         self._pids_checked = 0
+        self._pids_found = 0
 
-        self.send_queue = Queue()
-
-        # Get the absotule path of the current file
-        self._absolute_path = Path(__file__).parent.absolute()
-        data_folder_path = f"{self._absolute_path}/data"
-        
-        # create a data/ folder if it doesn't exist
-        if not path.exists(data_folder_path):
-            makedirs(data_folder_path)
-        
-        config_path = f"{self._absolute_path}/config/config.json"
-        if not path.exists(config_path):
-            raise FileNotFoundError(f"File 'config.json' not found in: {self._absolute_path}/config")
-        
-        proxies_path = f'{self._absolute_path}/config/proxies.txt'
-        
-        # Make sure the site is supported
-        supported_sites = map(lambda site: site.lower(), SITES.keys())
-        if site_name.lower() not in supported_sites:
-            raise ValueError(f"Scaper for '{site_name}' is not supported.")
-        
+        # Make sure the site is supported, only its model gets imported
+        self.site = load_site(site_name)()
         self.name = site_name
-        self.site = SITES[site_name.lower()]()
+
+        # shared by all scrapers (and their workers) sending requests to the same host
+        self.limiter = get_limiter(self.site.host, rate)
 
         self.start_pid = self.site.parse_pid(start_pid)
         self.stop_pid = self.site.parse_pid(stop_pid)
         if self.debug: 
-            print(f"🧰 [{site_name.upper()}] Parsed '{start_pid}' into '{self.site.parse_pid(start_pid)}'")
-            print(f"🧰 [{site_name.upper()}] Parsed '{stop_pid}' into '{self.site.parse_pid(stop_pid)}'")
+            logger.debug(f"🧰 [{site_name.upper()}] Parsed '{start_pid}' into '{self.site.parse_pid(start_pid)}'")
+            logger.debug(f"🧰 [{site_name.upper()}] Parsed '{stop_pid}' into '{self.site.parse_pid(stop_pid)}'")
 
         if self.start_pid < 1:
             raise ValueError(f'The start_pid has to be greater or equal to 1.')
         elif self.stop_pid < -1:
             raise ValueError(f'The stop_pid has to be greater or equal to -1.')
 
-        # Load in config
-        with open(config_path) as config_f:
-            self.config = loads(config_f.read())
+        # config, database, connections, proxies & the sender - either our own, or shared with other scrapers
+        if shared is None:
+            shared = SharedResources.create(use_proxies, db_path, db_synchronous, pool_size)
+        self.shared = shared
+        self.config = shared.config
+        self.db = shared.db
+        self.db_lock = shared.db_lock
+        # saves & sends the pids found, on its own threads
+        self.sender = shared.sender
+        # connections are kept alive and reused for each host (and proxy)
+        self.sessions = shared.sessions
+        self.pool_size = shared.sessions.pool_size
+        self.proxy_pool = shared.proxy_pool
 
         if 'webhooks' not in self.config:
             raise ValueError(f"No 'webhooks' attribute found in the config.json file.")
@@ -157,11 +179,11 @@ class Scraper:
             # check if there's a webhook for rest
             if "rest" in webhook_config:
                 self.webhook: str = webhook_config["rest"]
-                print(c.red + f"🎛  [{self.name.upper()}] Webhook for '{self.name}' not found - using the 'rest' webhook." + c.reset)
+                logger.warning(c.red + f"🎛  [{self.name.upper()}] Webhook for '{self.name}' not found - using the 'rest' webhook." + c.reset)
             else:
                 raise ValueError(f"No webhook (nor a 'rest' webhook) specified for site {self.name}")
         else:
-            print(f"🗣  [{self.name.upper()}] Using the '{self.name}' webhook.")
+            logger.info(f"🗣  [{self.name.upper()}] Using the '{self.name}' webhook.")
             self.webhook: str = webhook_config[self.name]
 
         if self.webhook.strip() == '':
@@ -172,220 +194,617 @@ class Scraper:
         
         self.useragents: List[str] = self.config['useragents'] if 'useragents' in self.config else ["github.com/rtunazzz/pid-scrapers"]
         
-        # load in proxies if needed
-        self.proxies = load_proxies(proxies_path) if use_proxies else []
-        print(f"🔗 [{self.name.upper()}] Using {len(self.proxies)} proxies.")
-    
-        # Initialize our database in the project's root/data folder
-        if db_path != None:
-            db_path = path.expanduser(db_path)
-            db_folder_path = '/'.join(db_path.split('/')[:-1])
-            if not path.exists(db_folder_path):
-                makedirs(db_folder_path)
-
-            print(f"🪣  [{self.name.upper()}] Using the database '{db_path}'")
-            self.db = DatabaseWrapper(db_path)
-        else: 
-            print(f"🪣  [{self.name.upper()}] Using the (default) database '{data_folder_path}/pids.db'")
-            self.db = DatabaseWrapper(f"{data_folder_path}/pids.db")
+        logger.info(f"🔗 [{self.name.upper()}] Using {len(self.proxy_pool)} proxies.")
+        logger.info(f"🪣  [{self.name.upper()}] Using the database '{self.db.path}'")
 
         # Make sure we have a table for the current site created
         self.db.create_table_safe(site_name.lower())
         
-        # Load in the current pids (from previous scraping sessions)
-        self.current_pids = self.db.get_pids_int(site_name)
-        self._failed_pids: List[int] = []
+        # the current pids (from previous scraping sessions) get loaded once needed, see `current_pids`
+        self._current_pids: Union[PidIndex, None] = None
+        self._current_pids_lock = Lock()
+        # the most recent PIDs found first
+        self._recent_pids = deque(self.db.get_recent_pids(site_name.lower(), self.FRONTIER_HITS), maxlen=self.FRONTIER_HITS)
+
+        # PIDs which still have to be checked from the previous run
+        resumed_pids: List[int] = []
+        if resume:
+            checkpoint = self.db.get_checkpoint(self.name.lower())
+            if checkpoint is None:
+                logger.warning(c.red + f"🔖 [{self.name.upper()}] No progress saved - starting from PID {self.start_pid}" + c.reset)
+            else:
+                low_water, resumed_pids = checkpoint
+                self.start_pid = max(self.start_pid, low_water + 1)
+                logger.info(f"🔖 [{self.name.upper()}] Resuming from PID {self.start_pid} ({len(resumed_pids)} PIDs left to check before that)")
+
+        # PIDs left over from the previous run
+        self._resumed_pids = resumed_pids
 
-        self.pid_generator = self.site.pid_stream(self.start_pid, self.stop_pid)
+        # PIDs not found lately (in previous runs, too), which don't have to be checked again yet
+        self.misses: Union[MissCache, None] = None
+        if miss_ttl > 0:
+            self.misses = MissCache(miss_ttl, miss_max_ttl, self.db.get_misses(self.name, time() - 2 * max(miss_ttl, miss_max_ttl)))
+            logger.info(f"🗓  [{self.name.upper()}] PIDs not found get checked again after {miss_ttl:g}s, doubling up to {self.misses.max_ttl:g}s ({len(self.misses)} PIDs not found lately)")
+        # PIDs handed out first (the frontier, the watch window) - only their misses get remembered, the ones of a whole sweep wouldn't fit into memory
+        self._frontier: Set[int] = set()
 
-        self._build_webhook = lambda pid: self.site.build_webhook(self.embed_hex, self.name, self.footer_text, pid)
+        self.scheduler: Union[PidScheduler, None] = None
+        self.frontier = frontier
+        # in watch mode, the same PIDs get checked over and over - there's no progress to save
+        self._watching = False
+
+        self._build_embed = lambda pid: self.site.build_embed(self.embed_hex, self.name, self.footer_text, pid)
 
     def __del__(self) -> None:
         if not self.debug: return
 
-        if len(self._failed_pids) > 0:
-            print(c.bold + f"[{self.name.upper()}] Failed to check the follwing PIDs:" + c.reset)
-            for pid in self._failed_pids:
-                print(f'{self.site.format_pid(pid)}')
+        scheduler = getattr(self, 'scheduler', None)
+        failed_pids = scheduler.failed() if scheduler is not None else []
+        if len(failed_pids) > 0:
+            logger.debug(c.bold + f"[{self.name.upper()}] Failed to check the follwing PIDs:" + c.reset + ''.join(f'\n{self.site.formatted_for(pid)}' for pid in failed_pids))
+
+    @property
+    def current_pids(self) -> PidIndex:
+        """PIDs found already (in previous runs, too), mapped from the bitmap saved next to the database on first use -
+        so the scraper gets created quickly, even with lots of PIDs in the database (see `DatabaseWrapper.load_index`)."""
+        if self._current_pids is None:
+            with self._current_pids_lock:
+                if self._current_pids is None:
+                    with self.db_lock:
+                        self._current_pids = self.db.load_index(self.name, self.site.max_pid_digits)
+        return self._current_pids
 
     def get_proxy(self) -> Dict:
-        """Gets a random proxy from the proxies loaded.
+        """Picks the best proxy (out of the proxies loaded) for the site's host.
+        The proxy has to be released with `self.proxy_pool.release` once the request is done.
 
         Returns:
-            Dict: Proxy object
+            Dict: Proxy object, empty when not using proxies
         """
-        if len(self.proxies) > 1:
-            return rand_choice(self.proxies)
-        return {}
+        return self.proxy_pool.acquire(self.site.host)
 
     def check_pid(self, pid: int) -> bool:
         """Checks whether or not the `pid` provided exists.
+        Known PIDs get filtered out before they're scheduled, so the PID isn't looked up in the known PIDs again.
 
         Args:
             pid (int): PID to check
 
         Returns:
-            bool: Whether or not the PID is loaded
+            bool: Whether or not the PID is loaded, False when the check failed
         """
-        with self.curr_lock:
-            # check if the pid isn't already loaded
-            if pid in self.current_pids:
-                return True
+        return self._check_pid(pid) or False
+
+    def _check_pid(self, pid: int, url: str = None) -> Union[bool, None]:
+        """Sends a HEAD request, checking whether or not the `pid` provided exists.
 
+        Args:
+            pid (int): PID to check
+            url (str, optional): Image URL of the PID, when rendered already. Defaults to None.
+
+        Returns:
+            Union[bool, None]: Whether or not the PID is loaded, None when the check failed
+        """
         # generate the image URL
-        url = self.site.image_url(pid)
+        if url is None:
+            url = self.site.url_for(pid)
+        proxy = self.get_proxy()
 
         try:
-            if self.debug: 
-                print(f"🧰 [{self.name.upper()}] [{current_thread().name}] Checking {url}")
+            if self.debug:
+                logger.debug(f"🧰 [{self.name.upper()}] [{current_thread().name}] Checking {url}")
+            # wait for our turn, the rate is shared by all threads sending requests to this host
+            wait = self.limiter.reserve()
+            if wait > 0:
+                sleep(wait)
+
             # send a head request to check if the resource exists
-            r = head(url, proxies=self.get_proxy(), headers={"User-Agent": rand_choice(self.useragents)})
-
-            if r.status_code == 200:
-                # 200 = loaded
-                # pid exists, save it
-                with self.print_lock:
-                    print(c.green + f'👀 [{self.name.upper()}] [{current_thread().name}] Found a new pid {pid} ({self.site.format_pid(pid)})' + c.reset)
-                self.current_pids.append(pid)
-                self.send_queue.put(pid)
-                with self.cnt_lock:
-                    self._pids_checked += 1
-                return True
-            elif r.status_code == 404:
-                # 404 = not loaded
-                with self.cnt_lock:
-                    self._pids_checked += 1
-                return False
-            elif r.status_code == 403:
-                print(c.orange + f'⛔️ [{self.name.upper()}] [{current_thread().name}] IP banned' + c.reset)
-            elif r.status_code == 429:
-                with self.print_lock:
-                    print(c.orange + f'🐌 [{self.name.upper()}] [{current_thread().name}] Ratelimited - Sleeping for 100sec' + c.reset)
-                    sleep(self.delay * 100)
-            else:
-                print(f'🧐 [{self.name.upper()}] [{current_thread().name}] [{r.status_code}] Bad status code for pid {pid} ({self.site.format_pid(pid)})')
+            started = monotonic()
+            r = self.sessions.get(self.site.host).head(url, proxies=proxy, headers={"User-Agent": rand_choice(self.useragents)}, timeout=self.TIMEOUT)
+            latency = monotonic() - started
+            self.proxy_pool.release(proxy, self.site.host, latency, r.status_code)
+            metrics.observe('craper_probe_seconds', latency, site=self.name, host=self.site.host)
+
+            return self._handle_status(pid, r.status_code, parse_retry_after(r.headers.get('Retry-After')))
         except exceptions.ProxyError as e:
-            with self.print_lock:
-                print(c.orange + f'🔗 [{self.name.upper()}] [{current_thread().name}] Proxy failed - failed to check pid {pid} ({self.site.format_pid(pid)})' + c.reset)
-                if self.debug:
-                    print(e)
+            self.proxy_pool.release(proxy, self.site.host)
+            metrics.inc('craper_probe_errors_total', site=self.name, host=self.site.host, error='proxy')
+            if should_log(f'{self.name}:proxy', c.orange + f'🔗 [{self.name.upper()}] Proxy failed {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name):
+                logger.warning(c.orange + f'🔗 [{self.name.upper()}] [{current_thread().name}] Proxy failed - failed to check pid {pid} ({self.site.formatted_for(pid)})' + (f' - {e}' if self.debug else '') + c.reset, extra={'site': self.name, 'pid': pid})
         except exceptions.ConnectionError:
-            with self.print_lock:
-                print(c.orange + f'🔗 [{self.name.upper()}] [{current_thread().name}] Failed to connect - failed to check pid {pid} ({self.site.format_pid(pid)})' + c.reset)
-        
-        self._failed_pids.append(pid)
-        return False
+            self.proxy_pool.release(proxy, self.site.host)
+            metrics.inc('craper_probe_errors_total', site=self.name, host=self.site.host, error='connection')
+            if should_log(f'{self.name}:connection', c.orange + f'🔗 [{self.name.upper()}] Failed to connect {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name):
+                logger.warning(c.orange + f'🔗 [{self.name.upper()}] [{current_thread().name}] Failed to connect - failed to check pid {pid} ({self.site.formatted_for(pid)})' + c.reset, extra={'site': self.name, 'pid': pid})
+        except exceptions.RequestException as e:
+            # e.g. a timeout or a malformed response - only this PID fails, not the whole worker
+            self.proxy_pool.release(proxy, self.site.host)
+            metrics.inc('craper_probe_errors_total', site=self.name, host=self.site.host, error='request')
+            if should_log(f'{self.name}:request', c.orange + f'🔗 [{self.name.upper()}] Requests failed {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name):
+                logger.warning(c.orange + f'🔗 [{self.name.upper()}] [{current_thread().name}] Request failed - failed to check pid {pid} ({self.site.formatted_for(pid)})' + (f' - {e}' if self.debug else '') + c.reset, extra={'site': self.name, 'pid': pid})
+
+        return None
+
+    def _handle_status(self, pid: int, status_code: int, retry_after: float = None) -> Union[bool, None]:
+        """Handles the status code of a HEAD request sent for the `pid` provided, shared by all probe engines.
+        Ratelimits (and bans) slow down the host's rate limiter instead of putting the worker to sleep.
 
-    def _send_pid(self, pid: int) -> None:
-        """Sends a webhook for the `pid` passed in.
+        Args:
+            pid (int): PID that was checked
+            status_code (int): Status code of the response
+            retry_after (float, optional): Value of the response's Retry-After header (in seconds). Defaults to None.
+
+        Returns:
+            Union[bool, None]: Whether or not the PID exists, None when the check failed
+        """
+        metrics.inc('craper_probes_total', site=self.name, host=self.site.host, status=str(status_code))
+        if status_code == 200:
+            # 200 = loaded
+            # pid exists, save it
+            logger.info(c.green + f'👀 [{self.name.upper()}] [{current_thread().name}] Found a new pid {pid} ({self.site.formatted_for(pid)})' + c.reset, extra={'site': self.name, 'pid': pid, 'status': status_code})
+            self.current_pids.add(pid)
+            self._recent_pids.appendleft(pid)
+            if self.misses is not None:
+                # new products show up next to each other, the PIDs around this one get checked right away again
+                self.misses.forget(range(pid - self.FRONTIER_RADIUS, pid + self.FRONTIER_RADIUS + 1))
+            self.sender.put(self, pid)
+            metrics.inc('craper_found_total', site=self.name)
+            with self.cnt_lock:
+                self._pids_checked += 1
+                self._pids_found += 1
+            self.limiter.on_success()
+            return True
+        elif status_code == 404:
+            # 404 = not loaded
+            if should_log(f'{self.name}:404', f'🔍 [{self.name.upper()}] {{count:,}} more pids not found in the last {{seconds:.0f}}s', INFO, site=self.name, status=status_code):
+                logger.info(f'🔍 [{self.name.upper()}] [{current_thread().name}] Pid {pid} not found', extra={'site': self.name, 'pid': pid, 'status': status_code})
+            if self.misses is not None and pid in self._frontier:
+                self.misses.miss(pid)
+            with self.cnt_lock:
+                self._pids_checked += 1
+            self.limiter.on_success()
+            return False
+        elif status_code == 403:
+            if should_log(f'{self.name}:403', c.orange + f'⛔️ [{self.name.upper()}] IP banned {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name, status=status_code):
+                logger.warning(c.orange + f'⛔️ [{self.name.upper()}] [{current_thread().name}] IP banned' + c.reset, extra={'site': self.name, 'pid': pid, 'status': status_code})
+            # with proxies, the ban only applies to the proxy used - the proxy pool stops using it instead
+            if len(self.proxy_pool) == 0:
+                self.limiter.on_ratelimit(retry_after)
+        elif status_code == 429:
+            if should_log(f'{self.name}:429', c.orange + f'🐌 [{self.name.upper()}] Ratelimited {{count:,}} more times in the last {{seconds:.0f}}s' + c.reset, WARNING, site=self.name, status=status_code):
+                logger.warning(c.orange + f'🐌 [{self.name.upper()}] [{current_thread().name}] Ratelimited - slowing down to {self.limiter.rate * self.limiter.DECREASE:.1f} requests/s' + c.reset, extra={'site': self.name, 'pid': pid, 'status': status_code})
+            self.limiter.on_ratelimit(retry_after)
+        else:
+            if should_log(f'{self.name}:{status_code}', f'🧐 [{self.name.upper()}] [{status_code}] {{count:,}} more bad status codes in the last {{seconds:.0f}}s', WARNING, site=self.name, status=status_code):
+                logger.warning(f'🧐 [{self.name.upper()}] [{current_thread().name}] [{status_code}] Bad status code for pid {pid} ({self.site.formatted_for(pid)})', extra={'site': self.name, 'pid': pid, 'status': status_code})
+        return None
+
+    def _send_pids(self, pids: List[int]) -> Union[Response, None]:
+        """Sends a webhook for the `pids` passed in, one embed per PID.
+        Discord allows up to 10 embeds in one message.
 
         Args:
-            pid (int): PID to send.
+            pids (List[int]): PIDs to send.
+
+        Returns:
+            Union[Response, None]: Discord's response, None when the webhook couldn't be sent
         """
-        webhook = self._build_webhook(pid)
+        webhook = {
+            'embeds': [self._build_embed(pid) for pid in pids],
+        }
+        started = monotonic()
         try:
-            post(self.webhook + '?wait=true',
+            r = self.sessions.get(urlparse(self.webhook).netloc).post(self.webhook + '?wait=true',
                 headers = { 'Content-Type': 'application/json' },
                 json = webhook
             )
+            metrics.observe('craper_webhook_seconds', monotonic() - started, site=self.name)
+            metrics.inc('craper_webhook_sends_total', site=self.name, status=str(r.status_code))
+            return r
         except Exception as e:
-            with self.print_lock:
-                print(c.red + f'⛔️ [{self.name.upper()}] [ERROR] Failed to send {pid} ({self.site.format_pid(pid)}): {e}' + c.reset)
+            metrics.inc('craper_webhook_sends_total', site=self.name, status='0')
+            logger.error(c.red + f'⛔️ [{self.name.upper()}] [ERROR] Failed to send {", ".join(f"{pid} ({self.site.formatted_for(pid)})" for pid in pids)}: {e}' + c.reset)
+        return None
+
+    def _save_pids(self, pids: List[int]) -> None:
+        """Adds the `pids` provided into the database, all of them at once.
+
+        Args:
+            pids (List[int]): PIDs to save
+        """
+        with self.db_lock:
+            added = self.db.add_many(self.name, self.site.render(pids))
+        logger.info(c.yellow + f'🔌 [{self.name.upper()}] Added {added} products into the database' + c.reset)
 
     def send_all(self) -> None:
-        """Checks if there are any products to save (send) and saves them if there are any.
+        """Blocks until all products found so far are saved (sent).
         """
-        if not self.send_queue.empty():
-            print(f'🪣  [{self.name.upper()}] Adding new products into the database')
+        self.sender.flush()
 
-        while(not self.send_queue.empty()):
-            pid = self.send_queue.get()    
-            self._send_pid(pid)
-            sleep(self.delay)
+    def _scrape(self) -> None:
+        """Keeps checking batches of PIDs from the scheduler until there are no PIDs left.
+        """
+        logger.info(f'🌎 [{self.name.upper()}] [{current_thread().name}] Started scraping')
+
+        self._check_batches()
+
+    def _check_batches(self) -> None:
+        """Checks batches of PIDs from the scheduler until there are no PIDs left.
+        """
+        while True:
+            pids = self.scheduler.next_batch()
+            if len(pids) == 0:
+                break
+
+            # the whole batch counts as failed unless it gets checked - the low-water mark can't move past a batch never marked as done
+            local_failed_pids = pids
+            try:
+                # render the URLs of the whole batch at once
+                local_failed_pids = [pid for pid, url in zip(pids, self.site.urls_for(pids)) if self._check_pid(pid, url) is None]
+
+                # retry the pids which failed in this batch (once), the ones failing again get reported with the batch
+                if len(local_failed_pids) > 0:
+                    logger.info(c.yellow + f'🔁 [{self.name.upper()}] [{current_thread().name}] Retrying to check {c.bold}{len(local_failed_pids)}{c.reset}{c.yellow} (failed) pids' + c.reset)
+                    local_failed_pids = [pid for pid in local_failed_pids if self._check_pid(pid) is None]
+            finally:
+                self.scheduler.done(pids, local_failed_pids)
+
+    def save_checkpoint(self) -> None:
+        """Saves the scraping progress into the database, so the next run can continue from there (see the `resume` argument).
+        """
+        self.save_misses()
+        if self.scheduler is None or self._watching:
+            return
+
+        low_water = self.scheduler.low_water
+        # everything above the low-water mark gets checked again anyway
+        pids = {pid for pid in chain(self.scheduler.failed(), self.scheduler.in_flight()) if pid <= low_water}
+        with self.db_lock:
+            self.db.save_checkpoint(self.name.lower(), low_water, sorted(pids))
+
+        if self.debug:
+            logger.info(f"🔖 [{self.name.upper()}] Saved progress - all PIDs up to {low_water} checked, {len(pids)} left to check before that")
+
+    def save_misses(self) -> None:
+        """Saves the PIDs not found since the last save into the database, so the next run doesn't check them right away either."""
+        if self.misses is None:
+            return
+        entries, dropped = self.misses.take_changes()
+        if len(entries) > 0 or len(dropped) > 0:
             with self.db_lock:
-                print(c.yellow + f'🔌 [{self.name.upper()}] Added {pid} ({self.site.format_pid(pid)}) into the database' + c.reset)
-                self.db.add_data(self.name, int(pid), self.site.format_pid(pid), self.site.image_url(pid))
+                self.db.save_misses(self.name, entries, dropped)
+
+    def _skip_misses(self, pids: Iterable[int]) -> Iterator[int]:
+        """Leaves out the PIDs not found lately, whose TTL isn't over (see `MissCache`)."""
+        for pid in pids:
+            if self.misses.skips(pid):
+                metrics.inc('craper_probes_skipped_total', site=self.name)
+            else:
+                yield pid
 
-    def _scrape(self, pids: List[int]) -> None:
-        """Checks the PIDs passed in as an argument.
+    def _pid_source(self, exclude: List[int] = None) -> Iterator[int]:
+        """Streams the PIDs to check - the PIDs left over from the previous run first, then the PIDs from `start_pid` to `stop_pid`.
+        Known (and `exclude`d) PIDs get subtracted from the PID ranges in bulk, so they never get handed out to a worker.
 
         Args:
-            pids (List[int]): PIDs to check
+            exclude (List[int], optional): PIDs to leave out, e.g. the ones checked by the frontier already. Defaults to None.
+
+        Returns:
+            Iterator[int]: PIDs to check
         """
-        with self.print_lock:
-            print(f'🌎 [{self.name.upper()}] [{current_thread().name}] Scraping a total of {c.bold}{len(pids)}{c.reset} pids')
-        for pid in pids:
-            self.check_pid(pid)
-        
-        # check which pids were we checking in this method call and which failed
-        local_failed_pids = [pid for pid in self._failed_pids if pid in pids]
-        if len(local_failed_pids) > 0:
-            with self.print_lock:
-                print(c.yellow + f'🔁 [{self.name.upper()}] [{current_thread().name}] Retrying to check {c.bold}{len(local_failed_pids)}{c.reset}{c.yellow} (failed) pids' + c.reset)
-            for pid in local_failed_pids:
-                self.check_pid(pid)
+        ranges = self.site.pid_ranges(self.start_pid, self.stop_pid)
+        if exclude:
+            ranges = exclude_pids(ranges, sorted(exclude))
+        # PIDs left over from the previous run, which haven't been found since
+        resumed = [pid for pid in self._resumed_pids if pid not in self.current_pids]
+        pids = chain(resumed, self.current_pids.subtract(ranges))
+        return self._skip_misses(pids) if self.misses is not None else pids
 
-    def scrape(self, num_threads: int, pids_per_thread: int = 100) -> None:
-        """Starts `num_threads` workers, each scraping `pids_per_thread` provided.
+    def _build_scheduler(self, num_workers: int, pids_per_thread: Union[int, None], batch_size: int) -> PidScheduler:
+        """Builds a scheduler, handing out the PIDs from the PID source in batches.
+
+        Args:
+            num_workers (int): Number of workers
+            pids_per_thread (Union[int, None]): When scraping without a stop PID, only `num_workers * pids_per_thread` PIDs get checked. None means no limit.
+            batch_size (int): Number of PIDs handed out to a worker at a time
+
+        Returns:
+            PidScheduler: The scheduler
+        """
+        priority: List[int] = []
+        if self.frontier:
+            priority = frontier_pids(
+                self.current_pids,
+                list(self._recent_pids),
+                self.start_pid,
+                self.stop_pid,
+                self.FRONTIER_AHEAD,
+                self.FRONTIER_RADIUS,
+            )
+            logger.info(c.yellow + f'🎯 [{self.name.upper()}] Checking {len(priority)} PIDs near the newest products first' + c.reset)
+        self._frontier = set(priority)
+
+        # don't check the frontier twice when the sweep gets there
+        pids = self._pid_source(exclude=priority)
+
+        if self.stop_pid == -1 and pids_per_thread is not None:
+            pids = islice(pids, num_workers * pids_per_thread)
+        return PidScheduler(pids, batch_size, low_water=self.start_pid - 1, priority=priority)
+
+    def start(self, num_threads: int, pids_per_thread: int = None, batch_size: int = 20) -> None:
+        """Starts `num_threads` workers, all of them checking PIDs (in batches of `batch_size`) until there are none left.
+        Doesn't wait for the workers to finish, see `join`.
 
         Args:
             num_threads (int): Number of threads to start
-            pids_per_thread (int, optional): Number of PIDs to scrape per thread. Defaults to 100.
+            pids_per_thread (int, optional): When scraping without a stop PID, only `num_threads * pids_per_thread` PIDs get checked. Defaults to None (no limit).
+            batch_size (int, optional): Number of PIDs handed out to a thread at a time. Defaults to 20.
         """
-        num_pids_each = pids_per_thread
-
-        if self.stop_pid != -1:
-            num_pids_each = ceil((self.stop_pid - self.start_pid) / num_threads)
-
-        # create a list with all threads, generate a pid list to check for each of them
-        i = 1
-        for _ in range(num_threads):
-            pids_todo = []
-            for _ in range(num_pids_each):
-                try:
-                    pids_todo.append(next(self.pid_generator))
-                # StopIteration exception is raised when there are no next elements
-                except StopIteration:
-                    continue
-            
-            if len(pids_todo) > 1:
-                t = Thread(
-                    name=f'{i:03}',
-                    target=self._scrape,
-                    args=(pids_todo,)
-                )
-                self.running_threads.append(t)
-                i += 1
-
-        print(c.yellow + f'🚧 [{self.name.upper()}] Starting {len(self.running_threads)} workers (each checking {num_pids_each} products)' + c.reset)
-        
+        self.scheduler = self._build_scheduler(num_threads, pids_per_thread, batch_size)
+
+        for i in range(1, num_threads + 1):
+            t = Thread(
+                name=f'{self.name.upper()}-{i:03}',
+                target=self._scrape,
+                # don't keep the process alive when interrupted, the progress is saved
+                daemon=True,
+            )
+            self.running_threads.append(t)
+
+        logger.info(c.yellow + f'🚧 [{self.name.upper()}] Starting {len(self.running_threads)} workers (checking {batch_size} products at a time)' + c.reset)
+
         # start all threads
         for t in self.running_threads:
             t.start()
 
             # sleep for a small amount just to slow down the spam a little
             sleep(self.delay)
-            
-            # in case we're starting a larger number of threads,
-            # start the sender earlier (every 5 threads),
-            # so we don't have to wait too long for all pids to send in the end
-            if len(self.running_threads) > 20 and len(self.running_threads) % 5 == 0:
-                self.send_all()
-
-        # Keep checking for new pids in queue and sending them as soon as there are
-        # workers alive
-        while(any([t.is_alive() for t in self.running_threads])):
-            self.send_all()
-            sleep(10)
-
-        # wait for all threads to end
-        map(lambda t: t.join(), self.running_threads)
-        print(c.orange + f'🚧 [{self.name.upper()}] All workers finished' + c.reset)
-
-        print(f'💾 [{self.name.upper()}] Saving the rest of the PIDs, please wait')
-        self.send_all()
-        print('-------------------------------------------------------------')
-        
-        # TODO self._pids_checked not accurate due to threading overrides
-        print(c.green + f'✅ [{self.name.upper()}] {c.bold}Scraping done!{c.reset}{c.green} Successfully checked ~{c.bold}{self._pids_checked}{c.reset}{c.green} pids.' + c.reset)
 
+    def join(self, timeout: float = None) -> bool:
+        """Waits (at most `timeout` seconds) for all workers to finish.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            bool: Whether or not all workers finished
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        for t in self.running_threads:
+            t.join(None if deadline is None else max(0, deadline - monotonic()))
+        return not any(t.is_alive() for t in self.running_threads)
+
+    def _print_summary(self) -> None:
+        logger.info(c.green + f'✅ [{self.name.upper()}] {c.bold}Scraping done!{c.reset}{c.green} Successfully checked {c.bold}{self._pids_checked}{c.reset}{c.green} pids.' + c.reset)
+
+    @staticmethod
+    def _start_senders(scrapers: List['Scraper']) -> List[Sender]:
+        """Starts the senders of the `scrapers` provided, which may share one.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers about to run
+
+        Returns:
+            List[Sender]: The senders, each of them once
+        """
+        senders = list({id(s.sender): s.sender for s in scrapers}.values())
+        for sender in senders:
+            sender.start()
+        return senders
+
+    @staticmethod
+    def _stop_senders(scrapers: List['Scraper'], timeout: float = None) -> bool:
+        """Saves & sends the rest of the PIDs found by the `scrapers` provided, stopping their senders.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers which ran
+            timeout (float, optional): Maximum number of seconds to wait for each sender. Defaults to None (no limit).
+
+        Returns:
+            bool: Whether or not all PIDs found were saved in time
+        """
+        logger.info(f'💾 [{", ".join(s.name.upper() for s in scrapers)}] Saving the rest of the PIDs, please wait')
+        senders = list({id(s.sender): s.sender for s in scrapers}.values())
+        return all([sender.stop(timeout) for sender in senders])
+
+    @staticmethod
+    def _print_summaries(scrapers: List['Scraper']) -> None:
+        """Logs the summary of each of the `scrapers` provided, once they're done."""
+        # the count of the aggregated messages (404s, ...) before the summary of the run
+        flush_logs()
+        logger.info('-------------------------------------------------------------')
+
+        for scraper in scrapers:
+            scraper._print_summary()
+
+    @classmethod
+    def scrape_many(cls, scrapers: List['Scraper'], workers: List[int], pids_per_thread: int = None, batch_size: int = 20) -> None:
+        """Runs multiple scrapers at once, `workers[i]` workers for `scrapers[i]`, and waits for all of them to finish.
+        The progress of all scrapers gets saved periodically.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers to run
+            workers (List[int]): Number of workers for each of the scrapers
+            pids_per_thread (int, optional): When scraping without a stop PID, only `workers[i] * pids_per_thread` PIDs get checked by each scraper. Defaults to None (no limit).
+            batch_size (int, optional): Number of PIDs handed out to a worker at a time. Defaults to 20.
+        """
+        cls._start_senders(scrapers)
+        for scraper, n in zip(scrapers, workers):
+            scraper.start(n, pids_per_thread, batch_size)
+
+        # wait for all threads to end, the sender keeps saving pids in the meantime
+        for scraper in scrapers:
+            while not scraper.join(cls.CHECKPOINT_INTERVAL):
+                for s in scrapers:
+                    s.save_checkpoint()
+
+        for scraper in scrapers:
+            scraper.save_checkpoint()
+            logger.info(c.orange + f'🚧 [{scraper.name.upper()}] All workers finished' + c.reset)
+
+        cls._stop_senders(scrapers)
+        cls._print_summaries(scrapers)
+
+    def scrape(self, num_threads: int, pids_per_thread: int = None, batch_size: int = 20) -> None:
+        """Starts `num_threads` workers, all of them checking PIDs (in batches of `batch_size`) until there are none left.
+
+        Args:
+            num_threads (int): Number of threads to start
+            pids_per_thread (int, optional): When scraping without a stop PID, only `num_threads * pids_per_thread` PIDs get checked. Defaults to None (no limit).
+            batch_size (int, optional): Number of PIDs handed out to a thread at a time. Defaults to 20.
+        """
+        self.scrape_many([self], [num_threads], pids_per_thread, batch_size)
+
+    def _watch_scheduler(self, window: int, batch_size: int) -> PidScheduler:
+        """Builds a scheduler for one watch cycle, handing out the PIDs in the window above the highest known PID
+        (and next to the PIDs found recently).
+
+        Args:
+            window (int): Number of PIDs above the highest known PID to check
+            batch_size (int): Number of PIDs handed out to a worker at a time
+
+        Returns:
+            PidScheduler: The scheduler
+        """
+        pids = frontier_pids(self.current_pids, list(self._recent_pids), self.start_pid, self.stop_pid, window, self.FRONTIER_RADIUS)
+        if self.misses is not None:
+            # the PIDs right above the newest product are the most likely to show up next, they get checked every cycle
+            pids = pids[:self.FRONTIER_RADIUS] + list(self._skip_misses(pids[self.FRONTIER_RADIUS:]))
+        self._frontier = set(pids)
+        return PidScheduler(iter(()), batch_size, low_water=self.start_pid - 1, priority=pids)
+
+    @classmethod
+    def _adapt_interval(cls, current: float, found: int, interval: float) -> float:
+        """Picks the number of seconds to wait before the next watch cycle - shorter while products keep showing up, longer when they don't.
+
+        Args:
+            current (float): Number of seconds waited before the last cycle
+            found (int): Number of PIDs found in the last cycle
+            interval (float): The interval configured, the wait stays within 1/4 and 4 times of it
+
+        Returns:
+            float: Number of seconds to wait
+        """
+        if found > 0:
+            return max(interval / 4, current / 2)
+        return min(interval * 4, current * 1.5)
+
+    @classmethod
+    def _watch_cycle(cls, scrapers: List['Scraper'], window: int, batch_size: int) -> Dict[str, int]:
+        """Sets up the next watch cycle for all of the `scrapers` provided.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers watching
+            window (int): Number of PIDs above the highest known PID to check
+            batch_size (int): Number of PIDs handed out to a worker at a time
+
+        Returns:
+            Dict[str, int]: Number of PIDs checked & found so far, to compare with after the cycle
+        """
+        for scraper in scrapers:
+            scraper.scheduler = scraper._watch_scheduler(window, batch_size)
+        return {
+            'checked': sum(s._pids_checked for s in scrapers),
+            'found': sum(s._pids_found for s in scrapers),
+        }
+
+    @classmethod
+    def _watch_cycle_done(cls, scrapers: List['Scraper'], cycle: int, before: Dict[str, int], started: float, wait: float, interval: float) -> float:
+        """Reports a finished watch cycle.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers watching
+            cycle (int): Number of the cycle
+            before (Dict[str, int]): Number of PIDs checked & found before the cycle, as returned by `_watch_cycle`
+            started (float): Time (`time.monotonic`) the cycle started at
+            wait (float): Number of seconds waited before the cycle
+            interval (float): The interval configured
+
+        Returns:
+            float: Number of seconds to wait before the next cycle
+        """
+        checked = sum(s._pids_checked for s in scrapers) - before['checked']
+        found = sum(s._pids_found for s in scrapers) - before['found']
+        wait = cls._adapt_interval(wait, found, interval)
+        for scraper in scrapers:
+            scraper.save_misses()
+        flush_logs()
+        logger.info(c.yellow + f'👁  [{", ".join(s.name.upper() for s in scrapers)}] Cycle {cycle} took {monotonic() - started:.1f}s - checked {checked} pids, found {found}, next one in {wait:.1f}s' + c.reset)
+        return wait
+
+    @classmethod
+    def _start_cycle_workers(cls, scrapers: List['Scraper'], workers: List[int]) -> Tuple[Barrier, Barrier]:
+        """Starts `workers[i]` long-lived threads for `scrapers[i]`, which check all PIDs from the scraper's scheduler once per cycle.
+        A cycle starts once the caller sets up the schedulers and waits on the first barrier, it ends once everyone waits on the second one.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers to start the threads for
+            workers (List[int]): Number of threads for each of the scrapers
+
+        Returns:
+            Tuple[Barrier, Barrier]: Barriers starting & ending a cycle
+        """
+        # workers wait for the next cycle to start, the caller waits for all of them to finish it
+        start_cycle, end_cycle = Barrier(sum(workers) + 1), Barrier(sum(workers) + 1)
+
+        def work(scraper: 'Scraper') -> None:
+            while True:
+                start_cycle.wait()
+                scraper._check_batches()
+                end_cycle.wait()
+
+        for scraper, n in zip(scrapers, workers):
+            for i in range(1, n + 1):
+                t = Thread(name=f'{scraper.name.upper()}-{i:03}', target=work, args=(scraper,), daemon=True)
+                scraper.running_threads.append(t)
+                t.start()
+
+        return start_cycle, end_cycle
+
+    @classmethod
+    def watch_many(cls, scrapers: List['Scraper'], workers: List[int], interval: float = 60, window: int = None, batch_size: int = 20) -> None:
+        """Keeps checking the PIDs above the highest known PID of each of the `scrapers` provided, every `interval` seconds (or so), until interrupted.
+        The workers, connections and known PIDs stay around inbetween the cycles.
+
+        Args:
+            scrapers (List[Scraper]): Scrapers to run
+            workers (List[int]): Number of workers for each of the scrapers
+            interval (float, optional): Number of seconds inbetween cycles, shortened while products keep showing up and lengthened when they don't. Defaults to 60.
+            window (int, optional): Number of PIDs above the highest known PID to check every cycle. Defaults to None (`FRONTIER_AHEAD`).
+            batch_size (int, optional): Number of PIDs handed out to a worker at a time. Defaults to 20.
+        """
+        window = window if window is not None else cls.FRONTIER_AHEAD
+        for scraper in scrapers:
+            scraper._watching = True
+
+        cls._start_senders(scrapers)
+        start_cycle, end_cycle = cls._start_cycle_workers(scrapers, workers)
+        for scraper, n in zip(scrapers, workers):
+            logger.info(c.yellow + f'👁  [{scraper.name.upper()}] Watching {window} PIDs above the newest product with {n} workers' + c.reset)
+
+        wait = interval
+        cycle = 0
+        try:
+            while True:
+                cycle += 1
+                before = cls._watch_cycle(scrapers, window, batch_size)
+                started = monotonic()
+                start_cycle.wait()
+                end_cycle.wait()
+                wait = cls._watch_cycle_done(scrapers, cycle, before, started, wait, interval)
+                sleep(wait)
+        finally:
+            cls._stop_senders(scrapers)
+            for scraper in scrapers:
+                scraper.save_misses()
+
+    def watch(self, num_threads: int, interval: float = 60, window: int = None, batch_size: int = 20) -> None:
+        """Keeps checking the PIDs above the highest known PID every `interval` seconds (or so), with `num_threads` workers, until interrupted.
+
+        Args:
+            num_threads (int): Number of threads to start
+            interval (float, optional): Number of seconds inbetween cycles, shortened while products keep showing up and lengthened when they don't. Defaults to 60.
+            window (int, optional): Number of PIDs above the highest known PID to check every cycle. Defaults to None (`FRONTIER_AHEAD`).
+            batch_size (int, optional): Number of PIDs handed out to a thread at a time. Defaults to 20.
+        """
+        self.watch_many([self], [num_threads], interval, window, batch_size)
@@ -0,0 +1,218 @@
+from queue import Empty, Queue
+from threading import Condition, Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from requests import Response
+
+from craper.utils.colors import TermColors as c
+from craper.utils.log import logger
+
+if TYPE_CHECKING:
+    from craper.scraper import Scraper
+
+
+def ratelimit_wait(r: Response) -> Tuple[bool, float]:
+    """Reads Discord's ratelimit headers from the response provided.
+
+    Args:
+        r (Response): Response to a webhook request
+
+    Returns:
+        Tuple[bool, float]: Whether or not the request should be retried and how long to wait (in seconds) before sending the next one
+    """
+    if r.status_code == 429:
+        return True, float(r.headers.get('Retry-After', 1))
+    if r.headers.get('X-RateLimit-Remaining') == '0':
+        return False, float(r.headers.get('X-RateLimit-Reset-After', 1))
+    return False, 0
+
+
+class Sender:
+    """Saves (and sends) the PIDs found, on its own threads.
+
+    The writer thread sleeps on a condition variable and wakes up as soon as a PID gets put in,
+    saving it into the database right away. Webhooks are then delivered by a separate thread,
+    on its own ratelimited channel, so a slow webhook never holds up saving PIDs.
+
+    The webhook thread packs up to 10 PIDs into one message (one embed each), waiting at most `linger` seconds
+    for more PIDs to arrive. It follows Discord's ratelimit headers instead of sleeping for a fixed delay.
+
+    Args:
+        linger: float
+            Maximum number of seconds a PID waits for other PIDs to be sent with
+
+    Methods:
+        start()
+        put(scraper, pid)
+        flush()
+        stop()
+    """
+    MAX_EMBEDS = 10
+    MAX_RETRIES = 5
+    # number of seconds inbetween attempts to save PIDs, e.g. while the database is locked
+    RETRY_DELAY = 1.0
+
+    def __init__(self, linger: float = 1) -> None:
+        self.linger = linger
+
+        self._cond = Condition()
+        self._pending: List[Tuple['Scraper', int]] = []
+        self._writing = False
+        self._running = False
+
+        self._webhooks: Queue = Queue()
+        self._threads: List[Thread] = []
+
+    def start(self) -> None:
+        """Starts the writer & webhook threads."""
+        if self._running:
+            return
+        self._running = True
+
+        self._threads = [
+            Thread(name='writer', target=self._write, daemon=True),
+            Thread(name='webhooks', target=self._deliver, daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def put(self, scraper: 'Scraper', pid: int) -> None:
+        """Queues the `pid` provided to be saved & sent, waking up the writer.
+
+        Args:
+            scraper (Scraper): Scraper which found the PID
+            pid (int): PID found
+        """
+        with self._cond:
+            self._pending.append((scraper, pid))
+            self._cond.notify_all()
+
+    def _write(self) -> None:
+        """Saves PIDs into the database as soon as there are any, then queues them up for the webhook thread."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pending) > 0 or not self._running)
+                if len(self._pending) == 0:
+                    return
+                pending, self._pending = self._pending, []
+                self._writing = True
+
+            # group the pids by scraper, so each of them gets saved in one transaction
+            by_scraper: Dict['Scraper', List[int]] = {}
+            for scraper, pid in pending:
+                by_scraper.setdefault(scraper, []).append(pid)
+
+            try:
+                for scraper, pids in by_scraper.items():
+                    self._save(scraper, pids)
+                    # sent even when they couldn't be saved - they get found (and sent) again by the next run
+                    for pid in pids:
+                        self._webhooks.put((scraper, pid))
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _save(self, scraper: 'Scraper', pids: List[int]) -> bool:
+        """Saves the `pids` provided into the database, trying up to `MAX_RETRIES` times.
+
+        Args:
+            scraper (Scraper): Scraper which found the PIDs
+            pids (List[int]): PIDs to save
+
+        Returns:
+            bool: Whether or not the PIDs were saved
+        """
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            try:
+                scraper._save_pids(pids)
+                return True
+            except Exception as e:
+                logger.error(c.red + f'⛔️ [{scraper.name.upper()}] [ERROR] Failed to save {len(pids)} pids (attempt {attempt}/{self.MAX_RETRIES}): {e}' + c.reset)
+                if attempt < self.MAX_RETRIES:
+                    sleep(self.RETRY_DELAY)
+
+        logger.error(c.red + f'⛔️ [{scraper.name.upper()}] [ERROR] Gave up saving {", ".join(str(pid) for pid in pids)}' + c.reset)
+        return False
+
+    def _deliver(self) -> None:
+        """Sends webhooks for the PIDs saved, up to `MAX_EMBEDS` PIDs at a time."""
+        stopping = False
+        while not stopping:
+            item = self._webhooks.get()
+            if item is None:
+                self._webhooks.task_done()
+                return
+
+            # wait (a little) for more pids, so they can be sent in one message
+            batch = [item]
+            deadline = monotonic() + self.linger
+            while len(batch) < self.MAX_EMBEDS:
+                try:
+                    item = self._webhooks.get(timeout=max(0, deadline - monotonic()))
+                except Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # one message per scraper (webhook)
+            by_scraper: Dict['Scraper', List[int]] = {}
+            for scraper, pid in batch:
+                by_scraper.setdefault(scraper, []).append(pid)
+
+            for scraper, pids in by_scraper.items():
+                self._post(scraper, pids)
+
+            for _ in range(len(batch) + stopping):
+                self._webhooks.task_done()
+
+    def _post(self, scraper: 'Scraper', pids: List[int]) -> None:
+        """Sends one webhook for the `pids` provided, waiting for (and retrying after) ratelimits.
+
+        Args:
+            scraper (Scraper): Scraper which found the PIDs
+            pids (List[int]): PIDs to send
+        """
+        for _ in range(self.MAX_RETRIES):
+            r = scraper._send_pids(pids)
+            if r is None:
+                return
+
+            retry, wait = ratelimit_wait(r)
+            sleep(wait)
+            if not retry:
+                return
+
+    def flush(self) -> None:
+        """Blocks until all PIDs put in so far are saved and sent."""
+        if not self._running:
+            return
+
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._pending) == 0 and not self._writing)
+        self._webhooks.join()
+
+    def stop(self, timeout: float = None) -> bool:
+        """Saves & sends all PIDs left, then stops the writer & webhook threads.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait for the PIDs left. Defaults to None (no limit).
+
+        Returns:
+            bool: Whether or not all PIDs put in were saved in time
+        """
+        if not self._running:
+            return True
+
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._threads[0].join(timeout)
+
+        self._webhooks.put(None)
+        self._threads[1].join(None if deadline is None else max(0, deadline - monotonic()))
+        return not self._threads[0].is_alive()
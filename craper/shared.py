@@ -0,0 +1,90 @@
+from json import loads
+from os import makedirs, path
+from pathlib import Path
+from threading import Lock
+from typing import Dict
+
+from craper.db import DatabaseWrapper
+from craper.sender import Sender
+from craper.utils import load_proxies, ProxyPool, SessionPool
+
+
+class SharedResources:
+    """Resources which can be shared by multiple scrapers running in the same process -
+    the config, database (and its writer), connection pools and proxies.
+
+    Args:
+        config: Dict
+            Parsed config.json file
+        db: DatabaseWrapper
+            Database where found PIDs are saved
+        sessions: SessionPool
+            Keep-alive connections, per host
+        proxy_pool: ProxyPool
+            Proxies (and their health)
+        sender: Sender
+            Saves & sends the PIDs found
+
+    Methods:
+        create(use_proxies, db_path, db_synchronous, pool_size)
+    """
+    def __init__(self, config: Dict, db: DatabaseWrapper, sessions: SessionPool, proxy_pool: ProxyPool, sender: Sender) -> None:
+        self.config = config
+        self.db = db
+        self.db_lock = Lock()
+        self.sessions = sessions
+        self.proxy_pool = proxy_pool
+        self.sender = sender
+
+    @classmethod
+    def create(
+        cls,
+        use_proxies: bool = False,
+        db_path: str = None,
+        db_synchronous: str = 'NORMAL',
+        pool_size: int = 10,
+    ) -> 'SharedResources':
+        """Loads the config (and proxies) from the config folder and opens the database.
+
+        Args:
+            use_proxies (bool, optional): Whether or not to load proxies. Defaults to False.
+            db_path (str, optional): Path to a database where to save found PIDs. Defaults to None (data/pids.db).
+            db_synchronous (str, optional): SQLite's synchronous level (OFF, NORMAL, FULL or EXTRA). Defaults to 'NORMAL'.
+            pool_size (int, optional): Maximum number of (keep-alive) connections per host. Defaults to 10.
+
+        Raises:
+            FileNotFoundError: When the config.json file isn't found in the config folder
+
+        Returns:
+            SharedResources: The resources
+        """
+        # Get the absotule path of the current file
+        absolute_path = Path(__file__).parent.absolute()
+        data_folder_path = f"{absolute_path}/data"
+
+        # create a data/ folder if it doesn't exist
+        if not path.exists(data_folder_path):
+            makedirs(data_folder_path)
+
+        config_path = f"{absolute_path}/config/config.json"
+        if not path.exists(config_path):
+            raise FileNotFoundError(f"File 'config.json' not found in: {absolute_path}/config")
+
+        # Load in config
+        with open(config_path) as config_f:
+            config = loads(config_f.read())
+
+        # load in proxies if needed
+        proxies_path = f'{absolute_path}/config/proxies.txt'
+        proxy_pool = ProxyPool(load_proxies(proxies_path) if use_proxies else [])
+
+        # Initialize our database in the project's root/data folder
+        if db_path != None:
+            db_path = path.expanduser(db_path)
+            db_folder_path = '/'.join(db_path.split('/')[:-1])
+            if not path.exists(db_folder_path):
+                makedirs(db_folder_path)
+        else:
+            db_path = f"{data_folder_path}/pids.db"
+
+        return cls(config, DatabaseWrapper(db_path, db_synchronous), SessionPool(pool_size), proxy_pool, Sender())
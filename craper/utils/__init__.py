@@ -1,2 +1,7 @@
 from craper.utils.colors import TermColors
 from craper.utils.utils import load_proxies
+from craper.utils.sessions import SessionPool
+from craper.utils.ratelimit import RateLimiter, get_limiter, parse_retry_after
+from craper.utils.proxy_pool import ProxyPool
+from craper.utils.metrics import Metrics, metrics, serve_metrics
+from craper.utils.log import Aggregator, flush_logs, forward_logs, logger, receive_logs, setup_logging, should_log, stop_logging
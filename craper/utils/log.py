@@ -0,0 +1,183 @@
+import logging
+import re
+import sys
+from atexit import register
+from json import dumps
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, List, Union
+
+logger = logging.getLogger('craper')
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*m')
+# fields passed in the `extra` of a logging call which end up in the JSON lines
+FIELDS = ('site', 'pid', 'status')
+
+_listener: QueueListener = None
+# whether the logs of this process get written by another one, see `forward_logs`
+_forwarding = False
+
+
+class Aggregator:
+    """Aggregates repeated messages (404s, proxy errors, ...) on the threads logging them - only the first message
+    with the same key gets logged every `interval` seconds, the rest of them only get counted (no log records get created).
+    Once the interval is over, their count gets logged instead of them.
+
+    Args:
+        interval: float
+            Number of seconds the messages get aggregated for
+
+    Methods:
+        should_log(key, summary, level, **fields)
+        flush(force)
+    """
+    def __init__(self, interval: float = 10) -> None:
+        self.interval = interval
+        self._lock = Lock()
+        # key -> [start of the window, number of messages counted, summary, level, fields]
+        self._windows: Dict[str, List] = {}
+
+    def should_log(self, key: str, summary: str, level: int = logging.INFO, **fields) -> bool:
+        """Counts a message, deciding whether or not to log it.
+
+        Args:
+            key (str): Identifies the messages aggregated together, e.g. 'footpatrol:404'
+            summary (str): Message logged instead of the rest of them, formatted with their `count` and the number of `seconds`, e.g. '{count:,} more 404s in the last {seconds:.0f}s'
+            level (int, optional): Level of the message (and the summary). Defaults to logging.INFO.
+            **fields: Fields of the summary (for the JSON lines), e.g. site='footpatrol'
+
+        Returns:
+            bool: Whether or not to log the message - False when it only got counted
+        """
+        if not logger.isEnabledFor(level):
+            return False
+
+        now = monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and now - window[0] < self.interval:
+                window[1] += 1
+                return False
+            self._windows[key] = [now, 0, summary, level, fields]
+
+        if window is not None and window[1] > 0:
+            self._log_summary(window, now)
+        return True
+
+    def _log_summary(self, window: List, now: float) -> None:
+        started, count, summary, level, fields = window
+        logger.log(level, summary.format(count=count, seconds=now - started), extra=fields)
+
+    def flush(self, force: bool = False) -> None:
+        """Logs the count of the messages aggregated so far.
+
+        Args:
+            force (bool, optional): Whether to log the count before the interval is over. Defaults to False.
+        """
+        now = monotonic()
+        with self._lock:
+            over = [key for key, window in self._windows.items() if force or now - window[0] >= self.interval]
+            windows = [self._windows.pop(key) for key in over]
+        for window in windows:
+            if window[1] > 0:
+                self._log_summary(window, now)
+
+
+aggregator = Aggregator()
+should_log = aggregator.should_log
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as JSON lines, without the terminal colors."""
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': _ANSI.sub('', record.getMessage()),
+        }
+        for field in FIELDS:
+            if hasattr(record, field):
+                line[field] = getattr(record, field)
+        return dumps(line, ensure_ascii=False)
+
+
+def setup_logging(level: Union[int, str] = logging.INFO, json_lines: bool = False, path: str = None, interval: float = 10) -> None:
+    """Sends the logs of all scrapers through a queue to a background thread, which writes them -
+    logging never blocks the threads checking PIDs on console (or file) I/O.
+    Does nothing when the logging is set up already.
+
+    Args:
+        level (Union[int, str], optional): Lowest level logged. Defaults to logging.INFO.
+        json_lines (bool, optional): Whether to log JSON lines instead of (colored) text. Defaults to False.
+        path (str, optional): Path to a file to log into. Defaults to None (stdout).
+        interval (float, optional): Number of seconds repeated messages get aggregated for. Defaults to 10.
+    """
+    global _listener
+    if _listener is not None or _forwarding:
+        return
+    aggregator.interval = interval
+
+    handler = logging.FileHandler(path, encoding='utf-8') if path is not None else logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_lines else logging.Formatter('%(message)s'))
+
+    queue = SimpleQueue()
+    _listener = QueueListener(queue, handler)
+    logger.handlers = [QueueHandler(queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener.start()
+
+
+def forward_logs(queue: Any, level: Union[int, str] = logging.INFO, interval: float = 10) -> None:
+    """Sends the logs of this (worker) process into the `queue` provided, to be written by the process
+    which set up the logging (see `receive_logs`). Any later `setup_logging` call does nothing.
+
+    Args:
+        queue (Any): A `multiprocessing` queue
+        level (Union[int, str], optional): Lowest level logged. Defaults to logging.INFO.
+        interval (float, optional): Number of seconds repeated messages get aggregated for. Defaults to 10.
+    """
+    global _forwarding
+    _forwarding = True
+    aggregator.interval = interval
+    logger.handlers = [QueueHandler(queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def receive_logs(queue: Any) -> QueueListener:
+    """Writes the logs other processes send into the `queue` provided (see `forward_logs`), like the ones of this process.
+
+    Args:
+        queue (Any): A `multiprocessing` queue
+
+    Returns:
+        QueueListener: Background thread receiving the logs, stopped with its `stop` method
+    """
+    class Relay(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            logger.handle(record)
+
+    listener = QueueListener(queue, Relay())
+    listener.start()
+    return listener
+
+
+def flush_logs() -> None:
+    """Logs the count of the messages aggregated so far, e.g. before printing the summary of a run."""
+    aggregator.flush(force=True)
+
+
+@register
+def stop_logging() -> None:
+    """Writes all logs left in the queue (and the count of the aggregated ones), stops the background thread."""
+    global _listener
+    if _listener is None:
+        return
+    flush_logs()
+    _listener.stop()
+    _listener = None
+    logger.handlers = []
@@ -0,0 +1,229 @@
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from threading import Lock, Thread
+from typing import Dict, List, Tuple, Union
+
+# label names & values of one series, e.g. (('site', 'footpatrol'), ('status', '200'))
+Labels = Tuple[Tuple[str, str], ...]
+
+HELP = {
+    'craper_probes_total': 'HEAD requests sent to check a PID, by status code',
+    'craper_probes_skipped_total': 'PIDs not checked, because they weren\'t found lately (see --miss-ttl)',
+    'craper_probe_errors_total': 'HEAD requests which failed (proxy or connection errors)',
+    'craper_found_total': 'New PIDs found',
+    'craper_webhook_sends_total': 'Webhooks sent, by status code (0 when the request failed)',
+    'craper_probe_seconds': 'Response time of the HEAD requests',
+    'craper_webhook_seconds': 'Response time of the webhook POST requests',
+}
+
+
+class Metrics:
+    """Thread-safe registry of counters and latency histograms, labelled by site, host, status, ...
+
+    Rendered in the Prometheus text format (for the /metrics endpoint) or as a dict (for the end-of-run summary).
+
+    Args:
+        buckets: Tuple[float, ...]
+            Upper bounds of the histogram buckets (in seconds), in ascending order
+
+    Methods:
+        inc(name, value, **labels)
+        observe(name, seconds, **labels)
+        take(exclude)
+        merge(taken)
+        reset()
+        render()
+        summary()
+    """
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        # per series: count of every bucket (+ one for the samples above the highest bucket), sum, count
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increments a counter.
+
+        Args:
+            name (str): Name of the counter
+            value (float, optional): Value to add. Defaults to 1.
+            **labels (str): Labels of the series, e.g. site='footpatrol'
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Adds a sample into a histogram.
+
+        Args:
+            name (str): Name of the histogram
+            seconds (float): The sample
+            **labels (str): Labels of the series, e.g. site='footpatrol'
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            hist = series[key]
+            hist[bisect_left(self.buckets, seconds)] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+
+    def take(self, exclude: Tuple[str, ...] = ()) -> Dict:
+        """Takes all counters and histograms recorded so far out of the registry, e.g. to be merged into the registry
+        of another process (see `merge`).
+
+        Args:
+            exclude (Tuple[str, ...], optional): Names of the metrics to drop instead. Defaults to ().
+
+        Returns:
+            Dict: The counters & histograms, as lists of [name, labels, value] (picklable)
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+        return {
+            'counters': [[name, labels, value] for name, series in counters.items() if name not in exclude for labels, value in series.items()],
+            'histograms': [[name, labels, hist] for name, series in histograms.items() if name not in exclude for labels, hist in series.items()],
+        }
+
+    def merge(self, taken: Dict) -> None:
+        """Adds the counters and histograms taken out of another registry (with the same buckets) into this one.
+
+        Args:
+            taken (Dict): As returned by `take`
+        """
+        with self._lock:
+            for name, labels, value in taken.get('counters', []):
+                series = self._counters.setdefault(name, {})
+                key = tuple(map(tuple, labels))
+                series[key] = series.get(key, 0) + value
+            for name, labels, hist in taken.get('histograms', []):
+                series = self._histograms.setdefault(name, {})
+                key = tuple(map(tuple, labels))
+                if key not in series:
+                    series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+                series[key] = [a + b for a, b in zip(series[key], hist)]
+
+    def reset(self) -> None:
+        """Drops all counters and histograms."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = labels + extra
+        if len(pairs) == 0:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f'# HELP {name} {HELP.get(name, name)}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{self._format_labels(labels)} {value:g}')
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f'# HELP {name} {HELP.get(name, name)}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ('+Inf',), hist):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{self._format_labels(labels, (("le", str(bound)),))} {cumulative}')
+                    lines.append(f'{name}_sum{self._format_labels(labels)} {hist[-2]:g}')
+                    lines.append(f'{name}_count{self._format_labels(labels)} {hist[-1]}')
+        return '\n'.join(lines) + '\n'
+
+    def _quantile(self, hist: List[float], q: float) -> Union[float, None]:
+        """Estimates a quantile of a histogram - the upper bound of the bucket it falls into,
+        None when it's above the highest bucket (JSON has no infinity)."""
+        rank = q * hist[-1]
+        cumulative = 0
+        for bound, count in zip(self.buckets, hist):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return None
+
+    def summary(self) -> Dict:
+        """Summarises all metrics, e.g. for a JSON report at the end of a run.
+
+        Returns:
+            Dict: Counters (a value per series) & histograms (count, mean and estimated quantiles per series)
+        """
+        with self._lock:
+            counters = {
+                name: [dict(labels, value=value) for labels, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [
+                    dict(
+                        labels,
+                        count=hist[-1],
+                        mean=round(hist[-2] / hist[-1], 6) if hist[-1] > 0 else None,
+                        p50=self._quantile(hist, 0.5),
+                        p90=self._quantile(hist, 0.9),
+                        p99=self._quantile(hist, 0.99),
+                    )
+                    for labels, hist in sorted(series.items())
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {'counters': counters, 'histograms': histograms}
+
+
+# the registry all scrapers in the process report to
+metrics = Metrics()
+
+
+def serve_metrics(address: Tuple[str, int], registry: Metrics = metrics) -> ThreadingHTTPServer:
+    """Serves the metrics on http://<host>:<port>/metrics (and /metrics.json), on a background thread.
+
+    Args:
+        address (Tuple[str, int]): Host & port to listen on
+        registry (Metrics, optional): Metrics to serve. Defaults to the process-wide registry.
+
+    Returns:
+        ThreadingHTTPServer: The server, stopped with its `shutdown` method
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == '/metrics':
+                body, content_type = registry.render().encode(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = dumps(registry.summary()).encode(), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            # scrapes every few seconds shouldn't flood the console
+            pass
+
+    server = ThreadingHTTPServer(address, MetricsHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,159 @@
+from random import sample
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Tuple
+
+
+class ProxyStats:
+    """Health of one proxy, used for requests to one host.
+
+    Attributes:
+        latency: float
+            Moving average of the response time (in seconds)
+        error_rate: float
+            Moving average of failed requests (0 - 1)
+        errors: int
+            Number of failed requests in a row
+        bans: int
+            Number of bans in a row
+        blocked_until: float
+            Time (`time.monotonic`) until which the proxy shouldn't be used
+        in_flight: int
+            Number of requests currently being sent through the proxy
+    """
+    # weight of the newest sample in the moving averages
+    ALPHA = 0.2
+
+    def __init__(self) -> None:
+        self.latency = 1.0
+        self.error_rate = 0.0
+        self.errors = 0
+        self.bans = 0
+        self.blocked_until = 0.0
+        self.in_flight = 0
+
+    def score(self) -> float:
+        """Lower is better - fast, healthy proxies with not many requests in flight."""
+        return self.latency * (self.in_flight + 1) * (1 + 10 * self.error_rate)
+
+    def update(self, latency: float = None, failed: bool = False) -> None:
+        """Adds the result of a request into the moving averages."""
+        self.error_rate += self.ALPHA * (failed - self.error_rate)
+        if latency is not None:
+            self.latency += self.ALPHA * (latency - self.latency)
+
+
+class ProxyPool:
+    """Pool of proxies, which keeps track of how each of them performs for each host.
+
+    Proxies which fail multiple requests in a row get quarantined, proxies which get banned (403) by a host
+    don't get used for that host for a while, the cool-off doubling with every ban in a row.
+    Out of the rest, the fastest, healthiest and least loaded proxies get picked.
+
+    Args:
+        proxies: List[Dict]
+            Proxies, as returned by `load_proxies`
+        quarantine: float
+            Number of seconds a failing proxy doesn't get used for
+        ban_cooloff: float
+            Number of seconds a (first time) banned proxy doesn't get used for
+
+    Methods:
+        acquire(host)
+        release(proxy, host, latency, status_code)
+        summary(host)
+    """
+    # number of failed requests in a row, after which a proxy gets quarantined
+    MAX_ERRORS = 3
+    MAX_BAN_COOLOFF = 6 * 3600
+
+    def __init__(self, proxies: List[Dict], quarantine: float = 60, ban_cooloff: float = 600) -> None:
+        self.proxies = proxies
+        self.quarantine = quarantine
+        self.ban_cooloff = ban_cooloff
+
+        self._lock = Lock()
+        self._stats: Dict[Tuple[str, str], ProxyStats] = {}
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def _get_stats(self, proxy: Dict, host: str) -> ProxyStats:
+        key = (proxy.get('http'), host)
+        if key not in self._stats:
+            self._stats[key] = ProxyStats()
+        return self._stats[key]
+
+    def acquire(self, host: str) -> Dict:
+        """Picks a proxy to send a request to the `host` provided with.
+        Every proxy acquired has to be released with the `release` method once the request is done.
+
+        Args:
+            host (str): Hostname the request is sent to
+
+        Returns:
+            Dict: Proxy object, empty when there are no proxies in the pool
+        """
+        if len(self.proxies) == 0:
+            return {}
+
+        with self._lock:
+            now = monotonic()
+            available = [p for p in self.proxies if self._get_stats(p, host).blocked_until <= now]
+
+            if len(available) == 0:
+                # all proxies are blocked, use the one which will be available the soonest
+                proxy = min(self.proxies, key=lambda p: self._get_stats(p, host).blocked_until)
+            else:
+                # pick the better of two random proxies, so requests don't all flock to the same one
+                candidates = sample(available, min(2, len(available)))
+                proxy = min(candidates, key=lambda p: self._get_stats(p, host).score())
+
+            self._get_stats(proxy, host).in_flight += 1
+            return proxy
+
+    def release(self, proxy: Dict, host: str, latency: float = None, status_code: int = None) -> None:
+        """Reports how a request sent with the `proxy` provided went.
+
+        Args:
+            proxy (Dict): Proxy the request was sent with (as returned by `acquire`)
+            host (str): Hostname the request was sent to
+            latency (float, optional): Response time in seconds. Defaults to None.
+            status_code (int, optional): Status code of the response, None when the request failed. Defaults to None.
+        """
+        if len(proxy) == 0:
+            return
+
+        with self._lock:
+            stats = self._get_stats(proxy, host)
+            stats.in_flight = max(0, stats.in_flight - 1)
+            now = monotonic()
+
+            if status_code is None:
+                stats.update(failed=True)
+                stats.errors += 1
+                if stats.errors >= self.MAX_ERRORS:
+                    stats.blocked_until = now + self.quarantine
+                    stats.errors = 0
+            elif status_code == 403:
+                stats.update(latency, failed=True)
+                stats.blocked_until = now + min(self.MAX_BAN_COOLOFF, self.ban_cooloff * 2 ** stats.bans)
+                stats.bans += 1
+            else:
+                stats.update(latency)
+                stats.errors = 0
+                if status_code != 429:
+                    stats.bans = 0
+
+    def summary(self, host: str) -> Tuple[int, int]:
+        """Counts the proxies which can be used for the `host` provided.
+
+        Args:
+            host (str): Hostname
+
+        Returns:
+            Tuple[int, int]: Number of available proxies, number of all proxies
+        """
+        with self._lock:
+            now = monotonic()
+            return sum(self._get_stats(p, host).blocked_until <= now for p in self.proxies), len(self.proxies)
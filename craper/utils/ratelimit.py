@@ -0,0 +1,134 @@
+from threading import Lock
+from time import monotonic
+from typing import Dict, Union
+
+
+class RateLimiter:
+    """Token bucket, shared by all workers sending requests to one host, which adapts its rate (AIMD-style)
+    to the responses the host sends back.
+
+    Every 429/403 halves the rate (multiplicative decrease) and, when the host sends a Retry-After header, pauses the bucket for that long.
+    Every successful response raises it back a little (additive increase), up to `max_rate` - by a step relative to the rate
+    the last ratelimit left us with, which the host accepted, so the rate creeps back up instead of overshooting again right away.
+
+    Args:
+        rate: float
+            Initial number of requests per second
+        min_rate: float
+            The rate never drops below this number, lowered to the initial rate when it's higher
+        max_rate: float
+            The rate never raises above this number, defaults to the initial rate
+        burst: float
+            Maximum number of tokens the bucket can hold
+
+    Methods:
+        reserve()
+        on_success()
+        on_ratelimit(retry_after)
+
+    Raises:
+        ValueError
+            When the rate isn't greater than 0
+    """
+    # the rate raises by RECOVERY * (the rate after the last ratelimit) requests/s every second (without ratelimits) - halved, it's back up in ~20s
+    RECOVERY = 0.05
+    DECREASE = 0.5
+    # ratelimits reported by workers within this many seconds of each other only cut the rate once
+    COOLDOWN = 1.0
+
+    def __init__(self, rate: float = 1000, min_rate: float = 0.5, max_rate: float = None, burst: float = None) -> None:
+        if rate <= 0:
+            raise ValueError('The rate has to be greater than 0.')
+
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max(max_rate, rate) if max_rate is not None else rate
+        self.burst = burst if burst is not None else max(1, rate)
+
+        self._lock = Lock()
+        self._tokens = self.burst
+        self._updated = monotonic()
+        self._paused_until = 0.0
+        self._decreased = 0.0
+        # rate the host accepted after the last ratelimit, the increase is relative to it
+        self._safe_rate = self.rate
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Takes a token out of the bucket. Doesn't block, the caller is expected to wait
+        the number of seconds returned (with `time.sleep` or `asyncio.sleep`) before sending the request.
+
+        Returns:
+            float: Number of seconds to wait before sending the request
+        """
+        with self._lock:
+            now = monotonic()
+            self._refill(now)
+            self._tokens -= 1
+
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def on_success(self) -> None:
+        """Slowly raises the rate, after the host answered without ratelimiting us."""
+        with self._lock:
+            # `rate` successes a second, each adds 1/rate-th of the step
+            self.rate = min(self.max_rate, self.rate + self.RECOVERY * self._safe_rate / self.rate)
+
+    def on_ratelimit(self, retry_after: float = None) -> None:
+        """Halves the rate (and pauses the bucket for `retry_after` seconds) after the host ratelimited (or banned) us.
+
+        Args:
+            retry_after (float, optional): Number of seconds the host asked us to wait. Defaults to None.
+        """
+        with self._lock:
+            now = monotonic()
+            self._refill(now)
+            if now - self._decreased >= self.COOLDOWN:
+                self.rate = max(self.min_rate, self.rate * self.DECREASE)
+                self._safe_rate = self.rate
+                self._decreased = now
+            # don't let the tokens saved up before the ratelimit go through all at once
+            self._tokens = min(self._tokens, 0)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+def parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    """Parses the value of a Retry-After header.
+
+    Args:
+        value (Union[str, None]): Value of the header
+
+    Returns:
+        Union[float, None]: Number of seconds to wait, None when the header is missing (or isn't a number)
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = Lock()
+
+def get_limiter(host: str, rate: float = 1000) -> RateLimiter:
+    """Gets the rate limiter shared by all requests sent to the `host` provided, creating one if it doesn't exist yet.
+
+    Args:
+        host (str): Hostname
+        rate (float, optional): Number of requests per second, when the limiter gets created - it never goes above it. Defaults to 1000.
+
+    Raises:
+        ValueError: When the rate isn't greater than 0
+
+    Returns:
+        RateLimiter: Rate limiter for the host
+    """
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(rate)
+        return _limiters[host]
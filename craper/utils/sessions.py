@@ -0,0 +1,60 @@
+from threading import Lock
+from typing import Dict
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """Keeps one keep-alive session per host, so requests reuse warm (TCP & TLS) connections instead of
+    opening a new one for every request.
+
+    Each session keeps up to `pool_size` idle connections to its host. Proxied connections are pooled
+    separately for every proxy (by urllib3's proxy managers), so they get reused as well.
+
+    Args:
+        pool_size: int
+            Maximum number of connections kept alive per host (and per proxy)
+
+    Methods:
+        get(host)
+        close()
+    """
+    def __init__(self, pool_size: int = 10) -> None:
+        self.pool_size = pool_size
+
+        self._sessions: Dict[str, Session] = {}
+        self._lock = Lock()
+
+    def _create_session(self) -> Session:
+        s = Session()
+        # keeps up to `pool_size` connections alive, doesn't block when all of them are in use - just opens a new one
+        adapter = HTTPAdapter(pool_maxsize=self.pool_size)
+        s.mount('http://', adapter)
+        s.mount('https://', adapter)
+        return s
+
+    def get(self, host: str) -> Session:
+        """Gets a session for the `host` provided, creating one if it doesn't exist yet.
+
+        Args:
+            host (str): Hostname the session is used for
+
+        Returns:
+            Session: Session with a connection pool for the host
+        """
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._create_session()
+                    self._sessions[host] = session
+        return session
+
+    def close(self) -> None:
+        """Closes all sessions (and their connections)."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from aiohttp import ClientPayloadError
+from benchmarks.mock_cdn import MockCDN
+from craper.async_scraper import AsyncScraper
+from craper.db import DatabaseWrapper
+from craper.models import load_site
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool
+
+class FailingSession:
+    """Session whose requests fail with the exception provided"""
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    def head(self, *args, **kwargs):
+        raise self.error
+
+class TestAsyncScraperMethods(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.cdn = MockCDN(hit_rate=0.05, latency=0.005, jitter=0, webhook_latency=0).start()
+        self.cdn.redirect(load_site('footpatrol'))
+        config = {'webhooks': {'footpatrol': f'{self.cdn.url}/webhook'}}
+        shared = SharedResources(config, DatabaseWrapper(path.join(self.tmp.name, 'pids.db')), SessionPool(20), ProxyPool([]), Sender())
+        self.scraper = AsyncScraper('footpatrol', 1, 400, delay=0, pool_size=20, shared=shared)
+
+    def tearDown(self):
+        self.cdn.stop()
+        del self.scraper
+        self.tmp.cleanup()
+
+    def test_scrape(self):
+        self.scraper.scrape(20, batch_size=10)
+        hits = [pid for pid in range(1, 401) if self.cdn.is_hit(self.scraper.site.uri_for(pid))]
+        self.assertGreater(len(hits), 0)
+        self.assertEqual(self.scraper._pids_checked, 400)
+        self.assertEqual(sorted(self.scraper.db.iter_pids('footpatrol')), hits)
+        self.assertEqual(self.scraper.db.get_checkpoint('footpatrol'), (400, []))
+
+    def test_errors(self):
+        # a failing request only fails its PID, instead of aborting the run
+        for error in (ClientPayloadError('truncated'), asyncio.TimeoutError()):
+            self.assertIsNone(asyncio.run(self.scraper._check_pid_async(FailingSession(error), 1)))
+
+if __name__ == '__main__':
+    unittest.main()
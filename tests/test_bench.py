@@ -0,0 +1,16 @@
+import unittest
+from benchmarks.bench import run
+from benchmarks.mock_cdn import MockCDN
+
+class TestBenchmark(unittest.TestCase):
+    def test_run(self):
+        # a short run of each engine, so the benchmark keeps working
+        for engine in ('threads', 'async'):
+            results = run('footpatrol', 300, 20, engine, cdn=MockCDN(hit_rate=0.05, latency=0.002, jitter=0, webhook_latency=0))
+            self.assertEqual(results['checked'], 300)
+            self.assertEqual(results['found'], results['statuses']['200'])
+            self.assertGreater(results['found'], 0)
+            self.assertGreater(results['pids_per_sec'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,18 @@ class TestCourirMethods(unittest.TestCase):
         self.assertEqual(Courir.format_pid('01488941'), '1488941')
         self.assertEqual(Courir.format_pid('001488941'), '1488941')
     
+    def test_pid_stream(self):
+        self.assertEqual(list(Courir.pid_stream(1, 5)), [1, 2, 3, 4, 5])
+        self.assertEqual(list(Courir.pid_ranges(9999990)), [range(9999990, 10000000)])
+        self.assertEqual(list(Courir.pid_stream(10, 5)), [])
+
+    def test_fast_path(self):
+        self.assertEqual(Courir.url_for(1488941), Courir.image_url('001488941'))
+        self.assertEqual(Courir.uri_for(1488941), Courir.image_uri('001488941'))
+        self.assertEqual(Courir.formatted_for(1488941), Courir.format_pid('001488941'))
+        self.assertEqual(Courir.urls_for([1488941, 1488942]), [Courir.image_url(1488941), Courir.image_url(1488942)])
+        self.assertEqual(Courir.render([1488941]), [(1488941, '1488941', Courir.image_url(1488941))])
+
     def test_build_webhook(self):
         c = Courir()
         
@@ -0,0 +1,88 @@
+import unittest
+from os import path, remove
+from tempfile import TemporaryDirectory
+from craper.db import DatabaseWrapper
+
+class TestDatabaseWrapperMethods(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.db = DatabaseWrapper(path.join(self.tmp.name, 'pids.db'))
+        self.db.create_table_safe('solebox')
+
+    def tearDown(self):
+        del self.db
+        self.tmp.cleanup()
+
+    def test_add_data(self):
+        self.assertTrue(self.db.add_data('solebox', 1929255, '01929255', "https://www.solebox.com/it's.jpg"))
+        self.assertFalse(self.db.add_data('solebox', 1929255, '01929255', "https://www.solebox.com/it's.jpg"))
+        self.assertEqual(self.db.get_pids_int('solebox'), [1929255])
+
+    def test_add_many(self):
+        self.db.add_data('solebox', 2, '00000002', 'url2')
+        added = self.db.add_many('solebox', [(1, '00000001', 'url1'), (2, '00000002', 'url2'), (3, '00000003', 'url3')])
+        self.assertEqual(added, 2)
+        self.assertEqual(sorted(self.db.iter_pids('solebox')), [1, 2, 3])
+
+    def test_checkpoint(self):
+        self.assertIsNone(self.db.get_checkpoint('solebox'))
+        self.db.save_checkpoint('solebox', 1500, [1200, 1100])
+        self.assertEqual(self.db.get_checkpoint('solebox'), (1500, [1100, 1200]))
+        self.db.save_checkpoint('solebox', 2000, [])
+        self.assertEqual(self.db.get_checkpoint('solebox'), (2000, []))
+        self.assertIsNone(self.db.get_checkpoint('snipes'))
+
+    def test_get_recent_pids(self):
+        self.db.add_many('solebox', [(1, '00000001', 'url1'), (5, '00000005', 'url5')])
+        self.db.add_many('solebox', [(3, '00000003', 'url3')])
+        self.assertEqual(self.db.get_recent_pids('solebox', 2), [3, 5])
+
+    def test_load_index(self):
+        self.db.add_many('solebox', [(1, '01', 'url1'), (5, '05', 'url5'), (150, '150', 'url150')])
+        index = self.db.load_index('solebox', 2)
+        self.assertEqual(list(index), [1, 5, 150])
+        self.assertEqual((len(index), index.max()), (3, 150))
+        self.assertTrue(path.exists(path.join(self.tmp.name, 'pids.db.solebox.bitmap')))
+
+        # PIDs saved afterwards end up in the bitmap, PIDs only added to the index don't
+        index.add(7)
+        self.db.add_data('solebox', 9, '09', 'url9')
+        other = DatabaseWrapper(path.join(self.tmp.name, 'pids.db'))
+        self.assertEqual(list(other.load_index('solebox', 2)), [1, 5, 9, 150])
+
+        # rows added without updating the bitmap get it rebuilt
+        with other._connection:
+            other._connection.execute("INSERT INTO solebox VALUES (11, '11', 'url11', 0)")
+        del other
+        self.assertEqual(list(DatabaseWrapper(path.join(self.tmp.name, 'pids.db')).load_index('solebox', 2)), [1, 5, 9, 11, 150])
+
+        # so do the last row deleted, or deleted & replaced (at the same highest rowid)
+        other = DatabaseWrapper(path.join(self.tmp.name, 'pids.db'))
+        with other._connection:
+            other._connection.execute("DELETE FROM solebox WHERE productId = 11")
+            other._connection.execute("INSERT INTO solebox VALUES (12, '12', 'url12', 0)")
+        self.assertEqual(list(DatabaseWrapper(path.join(self.tmp.name, 'pids.db')).load_index('solebox', 2)), [1, 5, 9, 12, 150])
+        with other._connection:
+            other._connection.execute("DELETE FROM solebox WHERE productId = 12")
+        self.assertEqual(list(DatabaseWrapper(path.join(self.tmp.name, 'pids.db')).load_index('solebox', 2)), [1, 5, 9, 150])
+
+        # rows deleted inbetween would take reading the whole table to notice, deleting the bitmap gets it rebuilt
+        with other._connection:
+            other._connection.execute("DELETE FROM solebox WHERE productId = 5")
+        del other
+        remove(path.join(self.tmp.name, 'pids.db.solebox.bitmap'))
+        self.assertEqual(list(DatabaseWrapper(path.join(self.tmp.name, 'pids.db')).load_index('solebox', 2)), [1, 9, 150])
+
+    def test_misses(self):
+        self.db.save_misses('solebox', [(1, 100.0, 1), (2, 200.0, 3)])
+        self.db.save_misses('solebox', [(2, 300.0, 4)], dropped=[1])
+        self.assertEqual(self.db.get_misses('solebox'), [(2, 300.0, 4)])
+        self.assertEqual(self.db.get_misses('solebox', since=400), [])
+        self.assertEqual(self.db.get_misses('snipes'), [])
+
+    def test_synchronous(self):
+        with self.assertRaises(ValueError):
+            DatabaseWrapper(path.join(self.tmp.name, 'other.db'), 'SOMETIMES')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import socket
+import unittest
+from multiprocessing import get_context
+from os import path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+from benchmarks.mock_cdn import MockCDN, redirect_site
+from craper.db import DatabaseWrapper
+from craper.distributed import Coordinator, LeaseTable, ReportSender, Worker
+from craper.models import load_site
+from craper.scheduler import PidScheduler
+from craper.scraper import Scraper
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool
+
+AUTHKEY = b'secret'
+
+class MockWorker(Worker):
+    """Worker checking the PIDs on a `MockCDN`, without a config.json"""
+    def __init__(self, address, cdn_url, db_path):
+        super().__init__(address, AUTHKEY, num_threads=5, batch_size=20)
+        self.cdn_url = cdn_url
+        self.db_path = db_path
+
+    def _scraper(self, site_name):
+        redirect_site(load_site(site_name), self.cdn_url)
+        config = {'webhooks': {site_name: f'{self.cdn_url}/webhook'}}
+        shared = SharedResources(config, DatabaseWrapper(self.db_path), SessionPool(5), ProxyPool([]), ReportSender())
+        # the PIDs found get reported instead of saved
+        return Scraper(site_name, delay=0, shared=shared)
+
+def run_worker(address, cdn_url, db_path):
+    """Entry point of the worker processes"""
+    MockWorker(address, cdn_url, db_path).run()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class TestLeaseTableMethods(unittest.TestCase):
+    def test_complete(self):
+        leases = LeaseTable(PidScheduler(iter(range(1, 21)), batch_size=10), timeout=60)
+        first, second = leases.acquire(1), leases.acquire(2)
+        self.assertEqual(first.pids, list(range(1, 11)))
+        self.assertIsNone(leases.acquire(1))
+        self.assertFalse(leases.finished())
+
+        self.assertTrue(leases.complete(second.id))
+        self.assertEqual(leases.scheduler.low_water, 0)
+        self.assertTrue(leases.complete(first.id))
+        self.assertEqual(leases.scheduler.low_water, 20)
+        self.assertTrue(leases.finished())
+        self.assertFalse(leases.complete(first.id))
+
+    def test_release(self):
+        leases = LeaseTable(PidScheduler(iter(range(1, 21)), batch_size=10), timeout=60)
+        lost = leases.acquire(1)
+        self.assertEqual(leases.release(1), 1)
+        # the PIDs of a disconnected worker get handed out again
+        again = leases.acquire(2)
+        self.assertEqual(again.pids, lost.pids)
+        self.assertNotEqual(again.id, lost.id)
+
+    def test_expiry(self):
+        leases = LeaseTable(PidScheduler(iter(range(1, 11)), batch_size=10), timeout=0.05)
+        late = leases.acquire(1)
+        sleep(0.1)
+        self.assertFalse(leases.renew(late.id))
+        self.assertEqual(leases.acquire(2).pids, late.pids)
+
+        # a late report still counts
+        self.assertTrue(leases.complete(late.id))
+        self.assertEqual(leases.scheduler.low_water, 10)
+
+    def test_prune_expired(self):
+        leases = LeaseTable(PidScheduler(iter(range(1, 11)), batch_size=10), timeout=0.05)
+        dead = leases.acquire(1)
+        sleep(0.1)
+        # the lease of a dead worker gets handed out again, and completed - the expired one goes away with it
+        again = leases.acquire(2)
+        self.assertTrue(leases.complete(again.id))
+        self.assertEqual(leases._expired, {})
+        self.assertFalse(leases.complete(dead.id))
+        self.assertIsNone(leases.acquire(3))
+        self.assertTrue(leases.finished())
+
+    def test_authkey(self):
+        # messages get unpickled, there's no default key
+        self.assertRaises(ValueError, Worker(('127.0.0.1', 6000)).run)
+
+class TestCoordinatorMethods(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.cdn = MockCDN(hit_rate=0.02, latency=0.002, jitter=0, webhook_latency=0).start()
+        self.cdn.redirect(load_site('footpatrol'))
+        config = {'webhooks': {'footpatrol': f'{self.cdn.url}/webhook'}}
+        shared = SharedResources(config, DatabaseWrapper(path.join(self.tmp.name, 'pids.db')), SessionPool(1), ProxyPool([]), Sender(linger=0))
+        self.scraper = Scraper('footpatrol', 1, 3000, delay=0, shared=shared)
+
+    def tearDown(self):
+        self.cdn.stop()
+        del self.scraper
+        self.tmp.cleanup()
+
+    def test_serve(self):
+        address = ('127.0.0.1', free_port())
+        coordinator = Coordinator(self.scraper, address, AUTHKEY, lease_size=250)
+        serving = Thread(target=coordinator.serve)
+        serving.start()
+
+        context = get_context('spawn')
+        workers = [
+            context.Process(target=run_worker, args=(address, self.cdn.url, path.join(self.tmp.name, f'worker{i}.db')), daemon=True)
+            for i in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        serving.join(60)
+        for worker in workers:
+            worker.join(10)
+
+        self.assertFalse(serving.is_alive())
+        self.assertEqual([worker.exitcode for worker in workers], [0, 0])
+        hits = [pid for pid in range(1, 3001) if self.cdn.is_hit(self.scraper.site.uri_for(pid))]
+        self.assertGreater(len(hits), 0)
+        self.assertEqual(sorted(self.scraper.db.iter_pids('footpatrol')), hits)
+        self.assertEqual(self.scraper.scheduler.low_water, 3000)
+        self.assertEqual(self.scraper.db.get_checkpoint('footpatrol'), (3000, []))
+
+if __name__ == '__main__':
+    unittest.main()
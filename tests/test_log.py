@@ -0,0 +1,32 @@
+import logging
+import unittest
+from json import loads
+from craper.utils.log import Aggregator, JsonFormatter
+
+class TestLogMethods(unittest.TestCase):
+    def test_aggregator(self):
+        aggregator = Aggregator(interval=60)
+        with self.assertLogs('craper', level='INFO') as logs:
+            # only the first message gets logged, the rest of them get counted
+            self.assertTrue(aggregator.should_log('snipes:404', '{count:,} more 404s', site='snipes'))
+            for _ in range(1233):
+                self.assertFalse(aggregator.should_log('snipes:404', '{count:,} more 404s', site='snipes'))
+            self.assertTrue(aggregator.should_log('onygo:404', '{count:,} more 404s', site='onygo'))
+
+            aggregator.flush()
+            self.assertEqual(logs.output, [])
+            aggregator.flush(force=True)
+            # a new window starts after the flush
+            self.assertTrue(aggregator.should_log('snipes:404', '{count:,} more 404s', site='snipes'))
+        self.assertEqual(logs.output, ['INFO:craper:1,233 more 404s'])
+        self.assertEqual(logs.records[0].site, 'snipes')
+
+    def test_json_formatter(self):
+        record = logging.makeLogRecord({'msg': '\x1b[38;5;118m👀 Found a new pid 5\x1b[0m', 'levelname': 'INFO', 'site': 'snipes', 'pid': 5})
+        line = loads(JsonFormatter().format(record))
+        self.assertEqual(line['message'], '👀 Found a new pid 5')
+        self.assertEqual((line['level'], line['site'], line['pid']), ('INFO', 'snipes', 5))
+        self.assertNotIn('status', line)
+
+if __name__ == '__main__':
+    unittest.main()
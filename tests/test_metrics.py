@@ -0,0 +1,48 @@
+import unittest
+from craper.utils import Metrics
+
+class TestMetricsMethods(unittest.TestCase):
+    def test_counters(self):
+        m = Metrics()
+        m.inc('craper_probes_total', site='snipes', status='404')
+        m.inc('craper_probes_total', site='snipes', status='404')
+        m.inc('craper_probes_total', site='snipes', status='200')
+        self.assertEqual(m.summary()['counters']['craper_probes_total'], [
+            {'site': 'snipes', 'status': '200', 'value': 1},
+            {'site': 'snipes', 'status': '404', 'value': 2},
+        ])
+        self.assertIn('craper_probes_total{site="snipes",status="404"} 2', m.render())
+
+    def test_histograms(self):
+        m = Metrics(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 0.5, 5):
+            m.observe('craper_probe_seconds', seconds, site='snipes')
+        rendered = m.render()
+        # buckets are cumulative, the last one counts all samples
+        self.assertIn('craper_probe_seconds_bucket{site="snipes",le="0.1"} 1', rendered)
+        self.assertIn('craper_probe_seconds_bucket{site="snipes",le="1.0"} 3', rendered)
+        self.assertIn('craper_probe_seconds_bucket{site="snipes",le="+Inf"} 4', rendered)
+        self.assertIn('craper_probe_seconds_count{site="snipes"} 4', rendered)
+
+        summary = m.summary()['histograms']['craper_probe_seconds'][0]
+        self.assertEqual(summary['count'], 4)
+        self.assertEqual(summary['p50'], 1.0)
+        self.assertIsNone(summary['p99'])
+
+    def test_take_merge(self):
+        worker, coordinator = Metrics(buckets=(0.1, 1.0)), Metrics(buckets=(0.1, 1.0))
+        coordinator.inc('craper_probes_total', site='snipes', status='404')
+        worker.inc('craper_probes_total', site='snipes', status='404')
+        worker.inc('craper_found_total', site='snipes')
+        worker.observe('craper_probe_seconds', 0.5, site='snipes')
+
+        coordinator.merge(worker.take(exclude=('craper_found_total',)))
+        summary = coordinator.summary()
+        self.assertEqual(summary['counters']['craper_probes_total'][0]['value'], 2)
+        self.assertNotIn('craper_found_total', summary['counters'])
+        self.assertEqual(summary['histograms']['craper_probe_seconds'][0]['count'], 1)
+        # taken out of the worker's registry
+        self.assertEqual(worker.summary(), {'counters': {}, 'histograms': {}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+import unittest
+from craper.models import SITES, load_site, site_names
+
+class TestSiteRegistry(unittest.TestCase):
+    def test_load_site(self):
+        for name in SITES:
+            self.assertEqual(load_site(name).__name__, SITES[name].partition(':')[2])
+        self.assertEqual(load_site('Footpatrol'), load_site('footpatrol'))
+        self.assertRaises(ValueError, load_site, 'notasite')
+
+    def test_site_names(self):
+        self.assertTrue(set(SITES).issubset(site_names()))
+
+    def test_import_all(self):
+        namespace = {}
+        exec('from craper.models import *', namespace)
+        self.assertEqual(namespace['Snipes'], load_site('snipes'))
+        self.assertTrue({SITES[name].partition(':')[2] for name in SITES}.issubset(namespace))
+
+    def test_lazy_imports(self):
+        # the help of the CLI (and importing the package) shouldn't import any models or HTTP clients
+        code = "import sys, craper.__main__; print(sorted(m for m in ('requests', 'aiohttp', 'sqlite3', 'craper.models.mesh') if m in sys.modules))"
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), '[]')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from craper.db import DatabaseWrapper
+from craper.orchestrator import Orchestrator
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool
+
+class TestOrchestratorMethods(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        config = {'webhooks': {'rest': 'http://127.0.0.1:9/webhook'}}
+        self.shared = SharedResources(config, DatabaseWrapper(path.join(self.tmp.name, 'pids.db')), SessionPool(10), ProxyPool([]), Sender())
+
+    def tearDown(self):
+        del self.shared
+        self.tmp.cleanup()
+
+    def orchestrator(self, sites, weights=None):
+        return Orchestrator(sites, weights, delay=0, shared=self.shared)
+
+    def test_split(self):
+        orchestrator = self.orchestrator(['footpatrol', 'size', 'snipes'], [1, 1, 1])
+        self.assertEqual(orchestrator.split(10), [4, 3, 3])
+        self.assertEqual(orchestrator.split(2), [1, 1, 1])
+
+        orchestrator = self.orchestrator(['footpatrol', 'size', 'snipes'], [2, 1, 0.01])
+        self.assertEqual(orchestrator.split(60), [39, 20, 1])
+        for workers in range(3, 100):
+            shares = orchestrator.split(workers)
+            self.assertEqual(sum(shares), workers)
+            self.assertGreaterEqual(min(shares), 1)
+
+        self.assertRaises(ValueError, self.orchestrator, ['footpatrol', 'size'], [1, 0])
+        self.assertRaises(ValueError, self.orchestrator, ['footpatrol', 'size'], [1])
+
+    def test_shared(self):
+        footpatrol, size, snipes = self.orchestrator(['footpatrol', 'size', 'snipes']).scrapers
+        for resource in ('db', 'db_lock', 'sender', 'sessions', 'proxy_pool'):
+            self.assertIs(getattr(footpatrol, resource), getattr(snipes, resource))
+        # one limiter (and keep-alive session) per host, the mesh sites live on the same one
+        self.assertIs(footpatrol.limiter, size.limiter)
+        self.assertIsNot(footpatrol.limiter, snipes.limiter)
+        self.assertIs(footpatrol.sessions.get(footpatrol.site.host), size.sessions.get(size.site.host))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from craper.db import PidIndex, SharedPidIndex
+
+class TestPidIndexMethods(unittest.TestCase):
+    def test_contains(self):
+        index = PidIndex.from_pids(7, [1, 8, 1929255, 9999999])
+        self.assertIn(1, index)
+        self.assertIn(8, index)
+        self.assertIn(1929255, index)
+        self.assertIn(9999999, index)
+        self.assertNotIn(2, index)
+        self.assertNotIn(1929256, index)
+    
+    def test_add(self):
+        index = PidIndex(6)
+        self.assertTrue(index.add(123456))
+        self.assertFalse(index.add(123456))
+        self.assertIn(123456, index)
+        self.assertEqual(len(index), 1)
+
+    def test_overflow(self):
+        index = PidIndex.from_pids(2, [5, 150])
+        self.assertIn(150, index)
+        self.assertNotIn(151, index)
+        self.assertEqual(len(index), 2)
+    
+    def test_iter(self):
+        index = PidIndex.from_pids(3, [999, 7, 1500, 8, 0])
+        self.assertEqual(list(index), [0, 7, 8, 999, 1500])
+    
+    def test_max(self):
+        index = PidIndex(7)
+        self.assertEqual(index.max(), -1)
+        index.add(1929255)
+        index.add(15)
+        self.assertEqual(index.max(), 1929255)
+
+    def test_missing_ranges(self):
+        index = PidIndex.from_pids(2, [3, 4, 9, 16, 150])
+        self.assertEqual(list(index.missing_ranges(1, 20)), [range(1, 3), range(5, 9), range(10, 16), range(17, 20)])
+        self.assertEqual(list(index.missing_ranges(4, 10)), [range(5, 9)])
+        # PIDs beyond the bitmap
+        self.assertEqual(list(index.missing_ranges(95, 160)), [range(95, 150), range(151, 160)])
+        self.assertEqual(list(PidIndex(2).missing_ranges(5, 5)), [])
+
+    def test_subtract(self):
+        index = PidIndex.from_pids(4, [2, 5, 6, 1000])
+        self.assertEqual(list(index.subtract([range(1, 8), range(999, 1002)])), [1, 3, 4, 7, 999, 1001])
+
+    def test_share(self):
+        index = PidIndex.from_pids(4, [2, 5])
+        view = SharedPidIndex(4, index.share())
+        try:
+            self.assertIn(5, view)
+            self.assertNotIn(6, view)
+            # PIDs added to the shared index show up in the view, not the other way around
+            index.add(6)
+            self.assertIn(6, view)
+            self.assertTrue(view.add(7))
+            self.assertFalse(view.add(2))
+            self.assertIn(7, view)
+            self.assertNotIn(7, index)
+        finally:
+            view.close()
+            index.unshare()
+        self.assertEqual(list(index), [2, 5, 6])
+        self.assertTrue(index.add(9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+from os import path
+from tempfile import TemporaryDirectory
+from benchmarks.mock_cdn import MockCDN, redirect_site
+from craper.db import DatabaseWrapper
+from craper.models import load_site
+from craper.pool import ProcessPool, ProcessWorker
+from craper.scraper import Scraper
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool
+
+class InterruptedPool(ProcessPool):
+    """Pool without processes, interrupted (like with Ctrl+C) once a few leases are out"""
+    def _workers_alive(self) -> bool:
+        for _ in range(3):
+            self.leases.acquire(1)
+        raise KeyboardInterrupt
+
+class MockProcessWorker(ProcessWorker):
+    """Process checking the PIDs on a `MockCDN`, without a config.json"""
+    def _scraper(self, site_name):
+        cdn_url = self.kwargs.pop('cdn_url')
+        redirect_site(load_site(site_name), cdn_url)
+        config = {'webhooks': {site_name: f'{cdn_url}/webhook'}}
+        self.kwargs['shared'] = SharedResources(config, DatabaseWrapper(self.kwargs.pop('db_path')), SessionPool(5), ProxyPool([]), Sender())
+        return super()._scraper(site_name)
+
+class TestProcessPoolMethods(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.cdn = MockCDN(hit_rate=0.02, latency=0.002, jitter=0, webhook_latency=0).start()
+        self.cdn.redirect(load_site('footpatrol'))
+        config = {'webhooks': {'footpatrol': f'{self.cdn.url}/webhook'}}
+        shared = SharedResources(config, DatabaseWrapper(path.join(self.tmp.name, 'pids.db')), SessionPool(1), ProxyPool([]), Sender(linger=0))
+        self.scraper = Scraper('footpatrol', 1, 50_000, delay=0, shared=shared)
+
+    def tearDown(self):
+        self.cdn.stop()
+        del self.scraper
+        self.tmp.cleanup()
+
+    def test_serve(self):
+        self.scraper.stop_pid = 3000
+        pool = ProcessPool(
+            self.scraper, 2, num_threads=5, batch_size=20, lease_size=250, worker_class=MockProcessWorker,
+            cdn_url=self.cdn.url, db_path=path.join(self.tmp.name, 'pids.db'), delay=0,
+        )
+        pool.serve()
+
+        hits = [pid for pid in range(1, 3001) if self.cdn.is_hit(self.scraper.site.uri_for(pid))]
+        self.assertGreater(len(hits), 0)
+        self.assertEqual(sorted(self.scraper.db.iter_pids('footpatrol')), hits)
+        self.assertEqual(self.scraper.db.get_checkpoint('footpatrol'), (3000, []))
+        self.assertRaises(FileNotFoundError, SharedMemory, pool._index_name)
+
+    def test_interrupt(self):
+        # known PIDs ahead of the sweep, the scheduler is in the middle of scanning the shared bitmap
+        for pid in (2500, 30_000):
+            self.scraper.current_pids.add(pid)
+        pool = InterruptedPool(self.scraper, 0, lease_size=1000)
+
+        with self.assertRaises(KeyboardInterrupt):
+            pool.serve()
+        self.assertEqual(self.scraper.db.get_checkpoint('footpatrol')[0], 0)
+        self.assertRaises(FileNotFoundError, SharedMemory, pool._index_name)
+        self.assertTrue(30_000 in self.scraper.current_pids)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+from craper.utils import RateLimiter, get_limiter, parse_retry_after
+import craper.utils.ratelimit as ratelimit
+
+class TestRateLimiterMethods(unittest.TestCase):
+    def test_reserve(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertEqual(limiter.reserve(), 0)
+        # the bucket is empty, the next request has to wait for a token (1/10 s)
+        self.assertAlmostEqual(limiter.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(limiter.reserve(), 0.2, places=2)
+
+    def test_on_ratelimit(self):
+        limiter = RateLimiter(rate=10)
+        limiter.on_ratelimit()
+        self.assertEqual(limiter.rate, 5)
+        # within the cooldown, the rate only gets cut once
+        limiter.on_ratelimit()
+        self.assertEqual(limiter.rate, 5)
+
+    def test_retry_after(self):
+        limiter = RateLimiter(rate=10)
+        limiter.on_ratelimit(retry_after=30)
+        self.assertGreater(limiter.reserve(), 29)
+
+    def test_on_success(self):
+        limiter = RateLimiter(rate=10, max_rate=10.05)
+        limiter.on_success()
+        self.assertAlmostEqual(limiter.rate, 10.05)
+        limiter.on_ratelimit()
+        limiter.on_ratelimit()
+        self.assertGreaterEqual(limiter.rate, limiter.min_rate)
+
+    def test_max_rate(self):
+        # the rate configured is the ceiling, the rate climbs back to it after a ratelimit
+        limiter = RateLimiter(rate=5000)
+        limiter.on_success()
+        self.assertEqual(limiter.rate, 5000)
+        limiter.on_ratelimit()
+        # ~20s worth of successful requests
+        for _ in range(75_000):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 5000)
+
+        self.assertRaises(ValueError, RateLimiter, 0)
+        self.assertRaises(ValueError, RateLimiter, -1)
+
+    def test_converges(self):
+        # a host which answers 20 requests/s and ratelimits the rest, 5 minutes in steps of 0.1s
+        clock = [0.0]
+        with mock.patch.object(ratelimit, 'monotonic', lambda: clock[0]):
+            limiter = RateLimiter(rate=1000)
+            sent = ratelimited = carry = 0
+            rates = []
+            for _ in range(3000):
+                clock[0] += 0.1
+                carry += limiter.rate * 0.1
+                n = int(carry)
+                carry -= n
+                for i in range(n):
+                    if i < 2:
+                        limiter.on_success()
+                    else:
+                        limiter.on_ratelimit()
+                # past the first minute, the rate should have settled
+                if clock[0] > 60:
+                    sent += n
+                    ratelimited += max(0, n - 2)
+                    rates.append(limiter.rate)
+
+        self.assertLess(ratelimited / sent, 0.02)
+        self.assertLess(max(rates), 25)
+        self.assertGreater(sum(rates) / len(rates), 10)
+
+    def test_get_limiter(self):
+        self.assertIs(get_limiter('www.snipes.com'), get_limiter('www.snipes.com'))
+        self.assertIsNot(get_limiter('www.snipes.com'), get_limiter('www.solebox.com'))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120)
+        self.assertEqual(parse_retry_after('1.5'), 1.5)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'))
+
+if __name__ == '__main__':
+    unittest.main()
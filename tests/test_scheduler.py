@@ -0,0 +1,117 @@
+import unittest
+from threading import Thread
+from craper.db import PidIndex
+from craper.scheduler import MissCache, PidScheduler, exclude_pids, frontier_pids
+
+class TestPidSchedulerMethods(unittest.TestCase):
+    def test_next_batch(self):
+        scheduler = PidScheduler(iter(range(1, 26)), batch_size=10)
+        self.assertEqual(scheduler.next_batch(), list(range(1, 11)))
+        self.assertEqual(scheduler.next_batch(), list(range(11, 21)))
+        self.assertFalse(scheduler.exhausted)
+        self.assertEqual(scheduler.next_batch(), list(range(21, 26)))
+        self.assertTrue(scheduler.exhausted)
+        self.assertEqual(scheduler.next_batch(), [])
+
+    def test_batch_size(self):
+        with self.assertRaises(ValueError):
+            PidScheduler(iter(range(10)), batch_size=0)
+
+    def test_low_water(self):
+        scheduler = PidScheduler(iter(range(1, 101)), batch_size=10, low_water=0)
+        self.assertEqual(scheduler.low_water, 0)
+
+        first, second, third = scheduler.next_batch(), scheduler.next_batch(), scheduler.next_batch()
+        scheduler.done(second)
+        self.assertEqual(scheduler.low_water, 0)
+        self.assertEqual(sorted(scheduler.in_flight()), first + third)
+
+        scheduler.done(first)
+        self.assertEqual(scheduler.low_water, 20)
+        scheduler.done(third)
+        self.assertEqual(scheduler.low_water, 30)
+        self.assertEqual(scheduler.in_flight(), [])
+
+    def test_failed(self):
+        scheduler = PidScheduler(iter(range(1, 101)), batch_size=10)
+        first, second = scheduler.next_batch(), scheduler.next_batch()
+        scheduler.done(second, [15, 12])
+        scheduler.done(first, [3])
+        # failed PIDs don't hold the low-water mark back, they get saved with the checkpoint instead
+        self.assertEqual(scheduler.low_water, 20)
+        self.assertEqual(scheduler.failed(), [3, 12, 15])
+
+    def test_threads(self):
+        scheduler = PidScheduler(iter(range(10000)), batch_size=7)
+        checked = []
+
+        def worker():
+            while True:
+                batch = scheduler.next_batch()
+                if len(batch) == 0:
+                    break
+                checked.extend(batch)
+
+        threads = [Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(checked), list(range(10000)))
+
+    def test_priority(self):
+        scheduler = PidScheduler(iter(range(1, 21)), batch_size=10, low_water=0, priority=[505, 501, 502])
+        priority = scheduler.next_batch()
+        self.assertEqual(priority, [505, 501, 502])
+        scheduler.done(priority)
+        # prioritised PIDs don't move the low-water mark
+        self.assertEqual(scheduler.low_water, 0)
+
+        self.assertEqual(scheduler.next_batch(), list(range(1, 11)))
+        self.assertEqual(scheduler.low_water, 0)
+
+    def test_frontier_pids(self):
+        known = PidIndex.from_pids(4, [100, 200, 203])
+        self.assertEqual(frontier_pids(known, [100], ahead=3, radius=2), [204, 205, 206, 101, 99, 102, 98])
+        # known PIDs are left out, the range is respected
+        self.assertEqual(frontier_pids(known, [200], start=199, stop=205, ahead=3, radius=3), [204, 205, 201, 199, 202])
+        # empty database, or a start above the highest known PID
+        self.assertEqual(frontier_pids(PidIndex(4), [], ahead=3), [1, 2, 3])
+        self.assertEqual(frontier_pids(known, [], start=1000, ahead=3), [1000, 1001, 1002])
+
+    def test_exclude_pids(self):
+        ranges = [range(1, 10), range(20, 25)]
+        self.assertEqual(list(exclude_pids(ranges, [0, 1, 5, 6, 9, 12, 24, 30])), [range(2, 5), range(7, 9), range(20, 24)])
+        self.assertEqual(list(exclude_pids(ranges, [])), ranges)
+
+class TestMissCacheMethods(unittest.TestCase):
+    def test_backoff(self):
+        cache = MissCache(ttl=10, max_ttl=30)
+        self.assertFalse(cache.skips(5, now=0))
+        cache.miss(5, now=0)
+        self.assertTrue(cache.skips(5, now=9))
+        self.assertFalse(cache.skips(5, now=10))
+        # every miss in a row doubles the TTL, up to max_ttl
+        cache.miss(5, now=10)
+        self.assertTrue(cache.skips(5, now=29))
+        self.assertFalse(cache.skips(5, now=30))
+        cache.miss(5, now=30)
+        cache.miss(5, now=60)
+        self.assertFalse(cache.skips(5, now=90))
+
+    def test_forget(self):
+        cache = MissCache(10, entries=[(5, 0, 1), (6, 0, 1)])
+        cache.forget(range(4, 6))
+        self.assertFalse(cache.skips(5, now=1))
+        self.assertTrue(cache.skips(6, now=1))
+
+    def test_take_changes(self):
+        cache = MissCache(10, max_ttl=20, entries=[(1, 0, 1), (2, 0, 1)])
+        cache.miss(3, now=50)
+        cache.forget([2])
+        # entry 1 expired long ago
+        self.assertEqual(cache.take_changes(now=50), ([(3, 50, 1)], [1, 2]))
+        self.assertEqual(cache.take_changes(now=50), ([], []))
+
+if __name__ == '__main__':
+    unittest.main()
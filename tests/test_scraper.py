@@ -0,0 +1,63 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from requests import exceptions
+from craper.db import DatabaseWrapper
+from craper.scheduler import PidScheduler
+from craper.scraper import Scraper
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool
+
+class FailingSession:
+    """Session whose requests fail with the exception provided"""
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+        self.kwargs = {}
+
+    def head(self, *args, **kwargs):
+        self.kwargs = kwargs
+        raise self.error
+
+class FailingSessionPool(SessionPool):
+    def __init__(self, session: FailingSession) -> None:
+        super().__init__(1)
+        self.session = session
+
+    def get(self, host: str) -> FailingSession:
+        return self.session
+
+class TestScraperMethods(unittest.TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.session = FailingSession(exceptions.ReadTimeout('read timed out'))
+        config = {'webhooks': {'footpatrol': 'http://127.0.0.1:9/webhook'}}
+        shared = SharedResources(config, DatabaseWrapper(path.join(self.tmp.name, 'pids.db')), FailingSessionPool(self.session), ProxyPool([]), Sender())
+        self.scraper = Scraper('footpatrol', 1, 100, delay=0, shared=shared)
+
+    def tearDown(self):
+        del self.scraper
+        self.tmp.cleanup()
+
+    def test_errors(self):
+        # a failing request only fails its PID, instead of killing the worker
+        for error in (exceptions.ReadTimeout('read timed out'), exceptions.ChunkedEncodingError('truncated'), exceptions.ConnectionError()):
+            self.session.error = error
+            self.assertIsNone(self.scraper._check_pid(1))
+        self.assertEqual(self.session.kwargs['timeout'], Scraper.TIMEOUT)
+
+    def test_batch_done(self):
+        # even when a worker dies, its batch gets reported - the low-water mark doesn't stay pinned below it
+        def check_pid(pid, url=None):
+            raise RuntimeError('unexpected')
+        self.scraper._check_pid = check_pid
+        self.scraper.scheduler = PidScheduler(iter(range(1, 11)), batch_size=5)
+
+        with self.assertRaises(RuntimeError):
+            self.scraper._check_batches()
+        self.assertEqual(self.scraper.scheduler.in_flight(), [])
+        self.assertEqual(self.scraper.scheduler.failed(), [1, 2, 3, 4, 5])
+        self.assertEqual(self.scraper.scheduler.low_water, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from threading import Event
+from requests import Response
+from craper.sender import Sender, ratelimit_wait
+
+class FakeScraper:
+    name = 'fake'
+
+    def __init__(self):
+        self.saved = []
+        self.sent = []
+
+    def _save_pids(self, pids):
+        self.saved.append(list(pids))
+
+    def _send_pids(self, pids):
+        self.sent.extend(pids)
+
+class TestSenderMethods(unittest.TestCase):
+    def test_flush(self):
+        scraper = FakeScraper()
+        sender = Sender(linger=0)
+        sender.start()
+        for pid in range(5):
+            sender.put(scraper, pid)
+        sender.flush()
+        self.assertEqual(sorted(pid for pids in scraper.saved for pid in pids), list(range(5)))
+        self.assertEqual(scraper.sent, list(range(5)))
+        sender.stop()
+
+    def test_stop(self):
+        scraper = FakeScraper()
+        sender = Sender(linger=0)
+        sender.start()
+        for pid in range(100):
+            sender.put(scraper, pid)
+        sender.stop()
+        self.assertEqual(sorted(pid for pids in scraper.saved for pid in pids), list(range(100)))
+        self.assertEqual(scraper.sent, list(range(100)))
+
+    def test_save_error(self):
+        scraper = FakeScraper()
+        failures = [2]
+        def save_pids(pids):
+            # e.g. sqlite3.OperationalError: database is locked
+            if failures[0] > 0:
+                failures[0] -= 1
+                raise RuntimeError('database is locked')
+            scraper.saved.append(list(pids))
+        scraper._save_pids = save_pids
+
+        sender = Sender(linger=0)
+        sender.RETRY_DELAY = 0
+        sender.start()
+        sender.put(scraper, 1)
+        sender.flush()
+        self.assertEqual(scraper.saved, [[1]])
+
+        # the writer keeps going after giving up on a batch
+        failures[0] = Sender.MAX_RETRIES
+        sender.put(scraper, 2)
+        sender.flush()
+        sender.put(scraper, 3)
+        sender.stop()
+        self.assertEqual(scraper.saved, [[1], [3]])
+        self.assertEqual(scraper.sent, [1, 2, 3])
+
+    def test_stop_timeout(self):
+        scraper = FakeScraper()
+        release = Event()
+        scraper._save_pids = lambda pids: release.wait()
+        sender = Sender(linger=0)
+        sender.start()
+        sender.put(scraper, 1)
+        # the writer is stuck saving, stop gives up after the timeout
+        self.assertFalse(sender.stop(timeout=0.1))
+        release.set()
+
+        sender = Sender(linger=0)
+        sender.start()
+        sender.put(FakeScraper(), 1)
+        self.assertTrue(sender.stop(timeout=5))
+
+    def test_batching(self):
+        scraper = FakeScraper()
+        scraper.batches = []
+        scraper._send_pids = lambda pids: scraper.batches.append(list(pids))
+        sender = Sender(linger=0.5)
+        sender.start()
+        for pid in range(25):
+            sender.put(scraper, pid)
+        sender.stop()
+        self.assertEqual([pid for pids in scraper.batches for pid in pids], list(range(25)))
+        self.assertTrue(all(len(pids) <= Sender.MAX_EMBEDS for pids in scraper.batches))
+        self.assertLess(len(scraper.batches), 25)
+
+    def test_ratelimit_wait(self):
+        r = Response()
+        r.status_code = 429
+        r.headers['Retry-After'] = '2.5'
+        self.assertEqual(ratelimit_wait(r), (True, 2.5))
+
+        r = Response()
+        r.status_code = 200
+        r.headers['X-RateLimit-Remaining'] = '0'
+        r.headers['X-RateLimit-Reset-After'] = '0.75'
+        self.assertEqual(ratelimit_wait(r), (False, 0.75))
+
+        r.headers['X-RateLimit-Remaining'] = '4'
+        self.assertEqual(ratelimit_wait(r), (False, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from threading import Thread
+from craper.utils import SessionPool
+
+class TestSessionPoolMethods(unittest.TestCase):
+    def test_get(self):
+        pool = SessionPool(pool_size=25)
+        sessions = []
+        threads = [Thread(target=lambda: sessions.append(pool.get('i1.adis.ws'))) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # one session (and adapter) per host, reused by all threads
+        self.assertEqual(len({id(s) for s in sessions}), 1)
+        session = sessions[0]
+        self.assertIs(session.get_adapter('https://i1.adis.ws/i/jpl/fp_000001_a'), session.get_adapter('https://i1.adis.ws/i/jpl/fp_000002_a'))
+        self.assertIsNot(pool.get('www.snipes.com'), session)
+
+    def test_pool_size(self):
+        pool = SessionPool(pool_size=25)
+        adapter = pool.get('i1.adis.ws').get_adapter('https://i1.adis.ws/')
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 25)
+
+    def test_close(self):
+        pool = SessionPool()
+        session = pool.get('i1.adis.ws')
+        pool.close()
+        self.assertIsNot(pool.get('i1.adis.ws'), session)
+
+if __name__ == '__main__':
+    unittest.main()
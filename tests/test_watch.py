@@ -0,0 +1,34 @@
+import unittest
+from os import path
+from tempfile import TemporaryDirectory
+from craper.db import DatabaseWrapper
+from craper.scraper import Scraper
+from craper.sender import Sender
+from craper.shared import SharedResources
+from craper.utils import ProxyPool, SessionPool
+
+class TestWatchMethods(unittest.TestCase):
+    def test_adapt_interval(self):
+        # products showing up - check more often, but not more than 4 times as often as configured
+        self.assertEqual(Scraper._adapt_interval(60, 3, 60), 30)
+        self.assertEqual(Scraper._adapt_interval(20, 1, 60), 15)
+        # nothing new - back off, up to 4 times the interval configured
+        self.assertEqual(Scraper._adapt_interval(60, 0, 60), 90)
+        self.assertEqual(Scraper._adapt_interval(200, 0, 60), 240)
+
+    def test_misses(self):
+        with TemporaryDirectory() as tmp:
+            config = {'webhooks': {'footpatrol': 'http://127.0.0.1:9/webhook'}}
+            shared = SharedResources(config, DatabaseWrapper(path.join(tmp, 'pids.db')), SessionPool(1), ProxyPool([]), Sender())
+            scraper = Scraper('footpatrol', delay=0, miss_ttl=60, shared=shared)
+            scraper.current_pids.add(1000)
+
+            # misses of a sweep don't get remembered, the ones of the watch window do
+            scraper._handle_status(10, 404)
+            scraper._watch_scheduler(100, 20)
+            scraper._handle_status(1090, 404)
+            self.assertEqual(len(scraper.misses), 1)
+            self.assertTrue(scraper.misses.skips(1090))
+
+if __name__ == '__main__':
+    unittest.main()